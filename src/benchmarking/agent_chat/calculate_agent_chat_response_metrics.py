@@ -1,23 +1,49 @@
+import argparse
+import contextvars
+import functools
 import itertools
 import logging
 import random
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Callable, Optional, Sequence, TypeVar
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
 
 from src.benchmarking.agent_chat.deserialize_agent_chat import ChatDataset
 from src.benchmarking.baseline import DialogueBaseline
+from src.benchmarking.checkpoint import BenchmarkCheckpoint, dialogue_fingerprint
+from src.benchmarking.context_builder import ContextBuilder, ContextPolicy
 from src.benchmarking.llm_evaluation import (
     ComparisonResult,
     LLMChatAgentEvaluation,
     SingleChatAgentResult,
 )
+from src.benchmarking.pairwise_tournament import Match, PairwiseTournament
+from src.summarize_algorithms.core.llm_cache import LLMResponseCache
 from src.summarize_algorithms.core.models import Session
+from src.summarize_algorithms.core.usage import UsageLedger, dialogue_scope
 from src.summarize_algorithms.memory_bank.dialogue_system import (
     MemoryBankDialogueSystem,
 )
 from src.summarize_algorithms.recsum.dialogue_system import RecsumDialogueSystem
 
+T = TypeVar("T")
+
+PAIRWISE_CRITERIA = ["correctness", "clarity", "context_handling"]
+
+SYSTEM_ATTRIBUTES = [
+    "base_recsum",
+    "rag_recsum",
+    "base_memory_bank",
+    "rag_memory_bank",
+    "full_baseline",
+    "last_baseline",
+]
+
 
 @dataclass
 class SingleResult:
@@ -37,11 +63,35 @@ class PairwiseResult:
 
 
 class CalculateAgentChatResponseMetrics:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        llm_cache: Optional[LLMResponseCache] = None,
+        embeddings: Optional[Embeddings] = None,
+        max_workers: int = 8,
+        adaptive_pairwise: bool = False,
+        checkpoint_path: Optional[str] = None,
+        resume: bool = False,
+        llm: Optional[BaseChatModel] = None,
+        dataset: Optional[ChatDataset] = None,
+        baseline_context_builder: Optional[ContextBuilder] = None,
+    ) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+
         self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers
+        self.adaptive_pairwise = adaptive_pairwise
+        self.checkpoint = (
+            BenchmarkCheckpoint(checkpoint_path, resume)
+            if checkpoint_path is not None
+            else None
+        )
 
-        self.dataset = ChatDataset.from_file()
-        self.llm_scorer = LLMChatAgentEvaluation()
+        self.dataset = dataset if dataset is not None else ChatDataset.from_file()
+        self.usage_ledger = UsageLedger()
+        self.llm_scorer = LLMChatAgentEvaluation(
+            llm=llm, llm_cache=llm_cache, usage_ledger=self.usage_ledger
+        )
         self.message_count = 0
 
         self.base_recsum_single_result = SingleResult()
@@ -53,18 +103,58 @@ class CalculateAgentChatResponseMetrics:
 
         self.pairwise_result = PairwiseResult()
 
-        self.base_recsum = RecsumDialogueSystem(embed_code=False, embed_tool=False)
-        self.rag_recsum = RecsumDialogueSystem(embed_code=True, embed_tool=True)
+        self.base_recsum = RecsumDialogueSystem(
+            embed_code=False,
+            embed_tool=False,
+            llm=llm,
+            embed_model=embeddings,
+            llm_cache=llm_cache,
+            system_name="base_recsum",
+            usage_ledger=self.usage_ledger,
+        )
+        self.rag_recsum = RecsumDialogueSystem(
+            embed_code=True,
+            embed_tool=True,
+            llm=llm,
+            embed_model=embeddings,
+            llm_cache=llm_cache,
+            system_name="rag_recsum",
+            usage_ledger=self.usage_ledger,
+        )
 
         self.base_memory_bank = MemoryBankDialogueSystem(
-            embed_code=False, embed_tool=False
+            embed_code=False,
+            embed_tool=False,
+            llm=llm,
+            embed_model=embeddings,
+            llm_cache=llm_cache,
+            system_name="base_memory_bank",
+            usage_ledger=self.usage_ledger,
         )
         self.rag_memory_bank = MemoryBankDialogueSystem(
-            embed_code=True, embed_tool=True
+            embed_code=True,
+            embed_tool=True,
+            llm=llm,
+            embed_model=embeddings,
+            llm_cache=llm_cache,
+            system_name="rag_memory_bank",
+            usage_ledger=self.usage_ledger,
         )
 
-        self.full_baseline = DialogueBaseline("FullBaseline")
-        self.last_baseline = DialogueBaseline("LastBaseline")
+        self.full_baseline = DialogueBaseline(
+            "FullBaseline",
+            llm=llm,
+            llm_cache=llm_cache,
+            usage_ledger=self.usage_ledger,
+            context_builder=baseline_context_builder,
+        )
+        self.last_baseline = DialogueBaseline(
+            "LastBaseline",
+            llm=llm,
+            llm_cache=llm_cache,
+            usage_ledger=self.usage_ledger,
+            context_builder=baseline_context_builder,
+        )
 
         self.path_to_save = Path("/Users/mikhailkharlamov/Documents/RecapKt/src/benchmarking/agent_chat/results")
 
@@ -72,7 +162,41 @@ class CalculateAgentChatResponseMetrics:
         dialogue = self.dataset.sessions
         for i in range(len(dialogue)):
             self.logger.info(f"Processing dialogue {i + 1}/{len(dialogue)}")
-            self._process(dialogue[: i + 1], i + 1)
+            self._process_with_checkpoint(dialogue[: i + 1], i + 1)
+
+    @property
+    def _checkpoint_fields(self) -> list[str]:
+        return [
+            "base_recsum_single_result",
+            "rag_recsum_single_result",
+            "base_memory_bank_single_result",
+            "rag_memory_bank_single_result",
+            "full_sessions_baseline_single_result",
+            "last_session_baseline_single_result",
+            "pairwise_result",
+            "message_count",
+        ] + [
+            f"{system}.{counter}"
+            for system in SYSTEM_ATTRIBUTES
+            for counter in ["prompt_tokens", "completion_tokens", "embedding_tokens", "total_cost"]
+        ]
+
+    def _process_with_checkpoint(self, sessions: list[Session], iteration: int) -> None:
+        if self.checkpoint is None:
+            with dialogue_scope(str(iteration)):
+                self._process(sessions, iteration)
+            return
+
+        unit = dialogue_fingerprint(sessions)
+        if self.checkpoint.is_completed(unit):
+            self.logger.info(f"Restoring iteration {iteration} from checkpoint")
+            self.checkpoint.restore(unit, self)
+            return
+
+        before = self.checkpoint.capture(self, self._checkpoint_fields)
+        with dialogue_scope(str(iteration)):
+            self._process(sessions, iteration)
+        self.checkpoint.record(unit, self, self._checkpoint_fields, before, iteration=iteration)
 
     def _process(self, sessions: list[Session], iteration: int) -> None:
         last_session = sessions[-1]
@@ -88,136 +212,134 @@ class CalculateAgentChatResponseMetrics:
         for i in range(len(sessions)):
             dialogue_context += f"Session: {i}" + str(sessions[i]) + "\n\n"
 
-        self.logger.info("Started computing base recsum response")
-        base_recsum_response = self.base_recsum.process_dialogue(
-            sessions, query
-        ).response
-        self.logger.info("Started computing rag recsum response")
-        rag_recsum_response = self.rag_recsum.process_dialogue(sessions, query).response
-        self.logger.info("Started computing base memory bank response")
-        base_memory_bank_response = self.base_memory_bank.process_dialogue(
-            sessions, query
-        ).response
-        self.logger.info("Started computing rag memory bank response")
-        rag_memory_bank_response = self.rag_memory_bank.process_dialogue(
-            sessions, query
-        ).response
-        self.logger.info("Started computing full session baseline response")
-        full_sessions_baseline_response = self.full_baseline.process_dialogue(
-            sessions, query, iteration
-        )
-        self.logger.info("Started computing last session baseline response")
-        last_session_baseline_response = self.last_baseline.process_dialogue(
-            [sessions[-1]], query, iteration
-        )
-
-        self.logger.info("Started computing base recsum single response score")
-        base_recsum_single_score = self.llm_scorer.evaluate_single(
-            dialogue_context=dialogue_context, assistant_answer=base_recsum_response
-        )
-        self.logger.info("Started computing rag recsum single response score")
-        rag_recsum_single_score = self.llm_scorer.evaluate_single(
-            dialogue_context=dialogue_context, assistant_answer=rag_recsum_response
-        )
-        self.logger.info("Started computing base memory bank single response score")
-        base_memory_bank_single_score = self.llm_scorer.evaluate_single(
-            dialogue_context=dialogue_context,
-            assistant_answer=base_memory_bank_response,
-        )
-        self.logger.info("Started computing rag memory bank single response score")
-        rag_memory_bank_single_score = self.llm_scorer.evaluate_single(
-            dialogue_context=dialogue_context, assistant_answer=rag_memory_bank_response
-        )
-        self.logger.info("Started computing full session single response score")
-        full_sessions_baseline_single_score = self.llm_scorer.evaluate_single(
-            dialogue_context=dialogue_context,
-            assistant_answer=full_sessions_baseline_response,
-        )
-        self.logger.info("Started computing last session single response score")
-        last_session_baseline_single_score = self.llm_scorer.evaluate_single(
-            dialogue_context=dialogue_context,
-            assistant_answer=last_session_baseline_response,
-        )
+        systems: list[tuple[str, Callable[[], str], SingleResult]] = [
+            (
+                "base_recsum",
+                lambda: self.base_recsum.process_dialogue(sessions, query).response,
+                self.base_recsum_single_result,
+            ),
+            (
+                "rag_recsum",
+                lambda: self.rag_recsum.process_dialogue(sessions, query).response,
+                self.rag_recsum_single_result,
+            ),
+            (
+                "base_memory_bank",
+                lambda: self.base_memory_bank.process_dialogue(sessions, query).response,
+                self.base_memory_bank_single_result,
+            ),
+            (
+                "rag_memory_bank",
+                lambda: self.rag_memory_bank.process_dialogue(sessions, query).response,
+                self.rag_memory_bank_single_result,
+            ),
+            (
+                "full_baseline",
+                lambda: self.full_baseline.process_dialogue(sessions, query, iteration),
+                self.full_sessions_baseline_single_result,
+            ),
+            (
+                "last_baseline",
+                lambda: self.last_baseline.process_dialogue([sessions[-1]], query, iteration),
+                self.last_session_baseline_single_result,
+            ),
+        ]
 
+        def respond_and_score(
+            name: str, respond: Callable[[], str]
+        ) -> tuple[str, SingleChatAgentResult]:
+            self.logger.info(f"Started computing {name} response")
+            response = respond()
+            self.logger.info(f"Started computing {name} single response score")
+            score = self.llm_scorer.evaluate_single(
+                dialogue_context=dialogue_context, assistant_answer=response
+            )
+            return response, score
 
-        self._single_eval_update(
-            self.base_recsum_single_result, base_recsum_single_score
-        )
-        self._single_eval_update(self.rag_recsum_single_result, rag_recsum_single_score)
-        self._single_eval_update(
-            self.base_memory_bank_single_result, base_memory_bank_single_score
-        )
-        self._single_eval_update(
-            self.rag_memory_bank_single_result, rag_memory_bank_single_score
-        )
-        self._single_eval_update(
-            self.full_sessions_baseline_single_result,
-            full_sessions_baseline_single_score,
-        )
-        self._single_eval_update(
-            self.last_session_baseline_single_result, last_session_baseline_single_score
+        system_results = self._run_concurrently(
+            [functools.partial(respond_and_score, name, respond) for name, respond, _ in systems]
         )
 
-        variants = [
-            base_recsum_response,
-            rag_recsum_response,
-            base_memory_bank_response,
-            rag_memory_bank_response,
-            full_sessions_baseline_response,
-            last_session_baseline_response,
-        ]
-        pairs = list(itertools.combinations(variants, 2))
+        for (_, _, single_result), (_, single_score) in zip(systems, system_results):
+            self._single_eval_update(single_result, single_score)
 
-        random.shuffle(pairs)
+        names = [name for name, _, _ in systems]
+        responses = {
+            name: response for name, (response, _) in zip(names, system_results)
+        }
+        judge = functools.partial(self._judge_pairs, dialogue_context, responses)
 
         self.logger.info("Started evaluate_pairwise")
-        for var1, var2 in pairs:
-            pairwise_score = self.llm_scorer.evaluate_pairwise(
-                dialogue_context=dialogue_context, first_answer=var1, second_answer=var2
-            )
-
-            mapping = {
-                base_recsum_response: "base_recsum",
-                rag_recsum_response: "rag_recsum",
-                base_memory_bank_response: "base_memory_bank",
-                rag_memory_bank_response: "rag_memory_bank",
-                full_sessions_baseline_response: "full_baseline",
-                last_session_baseline_response: "last_baseline",
-            }
+        if self.adaptive_pairwise:
+            matches = PairwiseTournament(names, judge).run()
+        else:
+            pairs = list(itertools.combinations(names, 2))
+            random.shuffle(pairs)
+            matches = [
+                Match(first, second, outcomes)
+                for (first, second), outcomes in zip(pairs, judge(pairs))
+            ]
+
+        for match in matches:
+            self._pairwise_eval_update(match.first, match.second, match.outcomes)
 
-            alg1 = mapping[var1]
-            alg2 = mapping[var2]
-
-            for criterion in ["correctness", "clarity", "context_handling"]:
-                self.logger.info(f"Criterion: {criterion}")
-
-                result = getattr(pairwise_score, criterion)
+        self.message_count += 1
 
-                if result == ComparisonResult.OPTION_1_BETTER:
-                    setattr(
-                        self.pairwise_result,
-                        alg1,
-                        getattr(self.pairwise_result, alg1) + 1,
-                    )
-                elif result == ComparisonResult.OPTION_2_BETTER:
-                    setattr(
-                        self.pairwise_result,
-                        alg2,
-                        getattr(self.pairwise_result, alg2) + 1,
-                    )
-                elif result == ComparisonResult.DRAW:
-                    setattr(
-                        self.pairwise_result,
-                        alg1,
-                        getattr(self.pairwise_result, alg1) + 1,
-                    )
-                    setattr(
-                        self.pairwise_result,
-                        alg2,
-                        getattr(self.pairwise_result, alg2) + 1,
-                    )
+    def _run_concurrently(self, tasks: Sequence[Callable[[], T]]) -> list[T]:
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, task) for task in tasks
+            ]
+            return [future.result() for future in futures]
+
+    def _judge_pairs(
+        self, dialogue_context: str, responses: dict[str, str], pairs: list[tuple[str, str]]
+    ) -> list[list[ComparisonResult]]:
+        scores = self._run_concurrently(
+            [
+                functools.partial(
+                    self.llm_scorer.evaluate_pairwise,
+                    dialogue_context=dialogue_context,
+                    first_answer=responses[first],
+                    second_answer=responses[second],
+                )
+                for first, second in pairs
+            ]
+        )
+        return [
+            [getattr(score, criterion) for criterion in PAIRWISE_CRITERIA]
+            for score in scores
+        ]
 
-        self.message_count += 1
+    def _pairwise_eval_update(
+        self, alg1: str, alg2: str, outcomes: Sequence[ComparisonResult]
+    ) -> None:
+        for criterion, result in zip(PAIRWISE_CRITERIA, outcomes):
+            self.logger.info(f"Criterion: {criterion}")
+
+            if result == ComparisonResult.OPTION_1_BETTER:
+                setattr(
+                    self.pairwise_result,
+                    alg1,
+                    getattr(self.pairwise_result, alg1) + 1,
+                )
+            elif result == ComparisonResult.OPTION_2_BETTER:
+                setattr(
+                    self.pairwise_result,
+                    alg2,
+                    getattr(self.pairwise_result, alg2) + 1,
+                )
+            elif result == ComparisonResult.DRAW:
+                setattr(
+                    self.pairwise_result,
+                    alg1,
+                    getattr(self.pairwise_result, alg1) + 1,
+                )
+                setattr(
+                    self.pairwise_result,
+                    alg2,
+                    getattr(self.pairwise_result, alg2) + 1,
+                )
 
     @staticmethod
     def _single_eval_update(result: SingleResult, score: SingleChatAgentResult) -> None:
@@ -225,6 +347,9 @@ class CalculateAgentChatResponseMetrics:
         result.clarity.append(score.clarity_score)
         result.context_handling.append(score.context_handling_score)
 
+    def latency_summary(self) -> dict[str, dict[str, dict[str, float]]]:
+        return {system: getattr(self, system).latency_summary() for system in SYSTEM_ATTRIBUTES}
+
     def print_results(self) -> None:
         def avg(lst: list[int]) -> float:
             return sum(lst) / len(lst) if lst else 0
@@ -292,12 +417,54 @@ class CalculateAgentChatResponseMetrics:
                 f"{name:<25} | {algo.prompt_tokens:<15} | {algo.completion_tokens:<18} | {algo.total_cost:<12.5f}"  # type: ignore
             )
 
+        print("\n===Token Usage by Node ===")
+        print(
+            f"{'System / node':<40} | {'Calls':>6} | {'Prompt':>10} | {'Completion':>10} | "
+            f"{'Embedding':>10} | {'Cost ($)':>10}"
+        )
+        print("-" * 100)
+        for key, usage in self.usage_ledger.report(["system", "node"]).items():
+            print(
+                f"{key:<40} | {usage.calls:>6} | {usage.prompt_tokens:>10} | {usage.completion_tokens:>10} | "
+                f"{usage.embedding_tokens:>10} | {usage.cost:>10.5f}"
+            )
+
+        print("\n===Latency (ms) ===")
+        print(f"{'Algorithm':<25} | {'Stage':<28} | {'Calls':>6} | {'p50':>9} | {'p95':>9} | {'p99':>9}")
+        print("-" * 98)
+        for system, stages in self.latency_summary().items():
+            for stage, stats in stages.items():
+                if "p50_ms" in stats:
+                    print(
+                        f"{system:<25} | {stage:<28} | {stats['calls']:>6} | {stats['p50_ms']:>9.2f} | "
+                        f"{stats['p95_ms']:>9.2f} | {stats['p99_ms']:>9.2f}"
+                    )
+
         print("\n===Processed Messages ===")
         print(f"Total messages processed: {self.message_count}")
 
 
 def main() -> None:
-    metric_calculator = CalculateAgentChatResponseMetrics()
+    parser = argparse.ArgumentParser(description="Calculate agent chat response metrics.")
+    parser.add_argument("--checkpoint", default="checkpoints/agent_chat_metrics.jsonl")
+    parser.add_argument("--resume", action="store_true")
+    parser.add_argument("--max-workers", type=int, default=8)
+    parser.add_argument("--adaptive-pairwise", action="store_true")
+    parser.add_argument("--baseline-max-tokens", type=int, default=None)
+    parser.add_argument(
+        "--baseline-policy",
+        choices=[policy.value for policy in ContextPolicy],
+        default=ContextPolicy.FULL.value,
+    )
+    args = parser.parse_args()
+
+    metric_calculator = CalculateAgentChatResponseMetrics(
+        max_workers=args.max_workers,
+        adaptive_pairwise=args.adaptive_pairwise,
+        checkpoint_path=args.checkpoint,
+        resume=args.resume,
+        baseline_context_builder=ContextBuilder(args.baseline_max_tokens, args.baseline_policy),
+    )
 
     logger = logging.getLogger()
     logger.info("Starting Agent Chat metrics calculation...")
@@ -1,7 +1,8 @@
 import json
+import textwrap
 
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator, Optional, TextIO
 
 
 class ChatSessionCombiner:
@@ -12,7 +13,7 @@ class ChatSessionCombiner:
     ) -> None:
         self.file_list = file_list
         self.output_file = output_file
-        self.combined_data: list[dict[str, Any]] = []
+        self.session_ids: list[str] = []
 
     @staticmethod
     def _extract_session_id(file_name: str) -> str:
@@ -39,30 +40,41 @@ class ChatSessionCombiner:
         session_id = self._extract_session_id(file_name)
         return {"session_id": session_id, "messages": data}
 
-    def process_files(self) -> None:
-        self.combined_data = []
+    @staticmethod
+    def _write_entry(f: TextIO, entry: dict[str, Any], is_first: bool) -> None:
+        f.write("\n" if is_first else ",\n")
+        serialized = json.dumps(entry, ensure_ascii=False, indent=4)
+        f.write(textwrap.indent(serialized, " " * 4))
 
+    def _iter_session_entries(self) -> Iterator[dict[str, Any]]:
         for file_name in self.file_list:
             data = self._load_chat_file(file_name)
 
             if data is not None:
-                session_entry = self._create_session_entry(file_name, data)
-                self.combined_data.append(session_entry)
-        self.save_combined_data()
+                yield self._create_session_entry(file_name, data)
+
+    def process_files(self) -> None:
+        self.save_combined_data(self._iter_session_entries())
+
+    def save_combined_data(self, entries: Optional[Iterable[dict[str, Any]]] = None) -> None:
+        self.session_ids = []
 
-    def save_combined_data(self) -> None:
         try:
             with open(self.output_file, "w", encoding="utf-8") as f:
-                json.dump(self.combined_data, f, ensure_ascii=False, indent=4)
+                f.write("[")
+                for session_entry in entries if entries is not None else self._iter_session_entries():
+                    self._write_entry(f, session_entry, not self.session_ids)
+                    self.session_ids.append(session_entry["session_id"])
+                f.write("\n]" if self.session_ids else "]")
             print(f"Files have been successfully combined into {self.output_file}")
         except Exception as e:
             print(f"Error saving the {self.output_file} file: {e}")
 
     def get_session_count(self) -> int:
-        return len(self.combined_data)
+        return len(self.session_ids)
 
     def get_session_ids(self) -> list[str]:
-        return [session["session_id"] for session in self.combined_data]
+        return list(self.session_ids)
 
 
 def main() -> None:
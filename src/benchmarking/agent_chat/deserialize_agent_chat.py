@@ -1,7 +1,10 @@
+import hashlib
 import json
+import os
 import re
 
-from typing import Any, Iterator
+from pathlib import Path
+from typing import Any, Iterator, Optional, TextIO
 
 from src.summarize_algorithms.core.models import (
     BaseBlock,
@@ -10,6 +13,74 @@ from src.summarize_algorithms.core.models import (
     ToolCallBlock,
 )
 
+CACHE_VERSION = 2
+BLOCK_TYPES = {block.__name__: block for block in (BaseBlock, CodeBlock, ToolCallBlock)}
+WHITESPACE = " \t\r\n"
+
+
+class JSONArrayStream:
+    def __init__(self, file: TextIO, chunk_size: int = 1 << 20) -> None:
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+
+    def _fill(self, size: int) -> bool:
+        chunk = self.file.read(size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.position :] + chunk
+        self.position = 0
+        return True
+
+    def _next_char(self) -> Optional[str]:
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._fill(self.chunk_size):
+                return None
+
+    def _decode_value(self) -> Any:
+        if self._next_char() is None:
+            raise ValueError("Unexpected end of JSON array")
+
+        read_size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self._fill(read_size):
+                    raise
+            else:
+                if end < len(self.buffer) or not self._fill(read_size):
+                    self.position = end
+                    return value
+            read_size = max(self.chunk_size, len(self.buffer))
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._next_char() != "[":
+            raise ValueError("Expected a JSON array")
+        self.position += 1
+        if self._next_char() == "]":
+            return
+
+        while True:
+            yield self._decode_value()
+            char = self._next_char()
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' but found {char!r}")
+            self.position += 1
+
+
+def iter_json_array(file_name: str, chunk_size: int = 1 << 20) -> Iterator[Any]:
+    with open(file_name, encoding="utf-8") as f:
+        yield from JSONArrayStream(f, chunk_size)
+
 
 class MessageProcessor:
     CODE_PATTERN = re.compile(r"```(?:[a-zA-Z0-9]*)\n(.*?)```", re.DOTALL)
@@ -104,46 +175,122 @@ class ChatDataset:
     def total_messages(self) -> int:
         return sum(len(session) for session in self._sessions)
 
-    @classmethod
-    def from_file(
-        cls,
-        file_name: str = "/Users/mikhailkharlamov/Documents/RecapKt/src/benchmarking/agent_chat/"
-        "combined_chat_history_sessions.json",
-    ) -> "ChatDataset":
+    @staticmethod
+    def _build_session(session_data: dict[str, Any]) -> Session:
         processor = MessageProcessor()
-        sessions = []
+        result_blocks = []
+        messages = session_data.get("messages", [])
+        message_idx = 0
+
+        while message_idx < len(messages):
+            message = messages[message_idx]
+
+            if message["type"] == "USER":
+                result_blocks.extend(processor.process_message(message))
+                message_idx += 1
+
+            elif message["type"] == "ASSISTANT":
+                if message_idx + 1 == len(messages):
+                    result_blocks.append(
+                        BaseBlock(role=message["type"], content=message["content"])
+                    )
+                    message_idx += 1
+                elif "tool_calls" in message:
+                    tool_blocks = processor.process_tool_calls(
+                        [message, messages[message_idx + 1]]
+                    )
+                    result_blocks.extend(tool_blocks)
+                    message_idx += 2
+                else:
+                    result_blocks.extend(processor.process_message(message))
+                    message_idx += 1
 
-        with open(file_name, encoding="utf-8") as f:
-            data = json.load(f)
+        return Session(messages=result_blocks)
 
-        for session_data in data:
-            result_blocks = []
-            messages = session_data.get("messages", [])
-            message_idx = 0
+    @classmethod
+    def iter_sessions(cls, file_name: str, chunk_size: int = 1 << 20) -> Iterator[Session]:
+        for session_data in iter_json_array(file_name, chunk_size):
+            yield cls._build_session(session_data)
+
+    @staticmethod
+    def _cache_key(file_name: str) -> dict[str, Any]:
+        stat = os.stat(file_name)
+        return {
+            "version": CACHE_VERSION,
+            "source": str(Path(file_name).resolve()),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+        }
+
+    @staticmethod
+    def _cache_path(file_name: str, cache_dir: str) -> Path:
+        digest = hashlib.sha256(str(Path(file_name).resolve()).encode("utf-8")).hexdigest()
+        return Path(cache_dir) / f"{digest[:16]}.jsonl"
+
+    @staticmethod
+    def _encode_session(session: Session) -> str:
+        return json.dumps(
+            [{"type": type(block).__name__, **vars(block)} for block in session],
+            ensure_ascii=False,
+        )
+
+    @staticmethod
+    def _decode_session(line: str) -> Session:
+        blocks = []
+        for block in json.loads(line):
+            block_type = BLOCK_TYPES[block.pop("type")]
+            blocks.append(block_type(**block))
+        return Session(messages=blocks)
+
+    @staticmethod
+    def _cache_is_valid(cache_path: Path, key: dict[str, Any]) -> bool:
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                return bool(json.loads(f.readline()) == key)
+        except (OSError, ValueError):
+            return False
 
-            while message_idx < len(messages):
-                message = messages[message_idx]
+    @classmethod
+    def _read_cache(cls, cache_path: Path) -> Iterator[Session]:
+        with open(cache_path, encoding="utf-8") as f:
+            next(f)
+            for line in f:
+                yield cls._decode_session(line)
 
-                if message["type"] == "USER":
-                    result_blocks.extend(processor.process_message(message))
-                    message_idx += 1
+    @classmethod
+    def _parse_and_cache(
+        cls, file_name: str, cache_path: Path, key: dict[str, Any]
+    ) -> Iterator[Session]:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(key) + "\n")
+                for session in cls.iter_sessions(file_name):
+                    f.write(cls._encode_session(session) + "\n")
+                    yield session
+            tmp_path.replace(cache_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    @classmethod
+    def stream_sessions(
+        cls, file_name: str, cache_dir: Optional[str] = ".cache/chat_dataset"
+    ) -> Iterator[Session]:
+        if cache_dir is None:
+            return cls.iter_sessions(file_name)
+
+        key = cls._cache_key(file_name)
+        cache_path = cls._cache_path(file_name, cache_dir)
+        if cls._cache_is_valid(cache_path, key):
+            return cls._read_cache(cache_path)
+        return cls._parse_and_cache(file_name, cache_path, key)
 
-                elif message["type"] == "ASSISTANT":
-                    if message_idx + 1 == len(messages):
-                        result_blocks.append(
-                            BaseBlock(role=message["type"], content=message["content"])
-                        )
-                        message_idx += 1
-                    elif "tool_calls" in message:
-                        tool_blocks = processor.process_tool_calls(
-                            [message, messages[message_idx + 1]]
-                        )
-                        result_blocks.extend(tool_blocks)
-                        message_idx += 2
-                    else:
-                        result_blocks.extend(processor.process_message(message))
-                        message_idx += 1
-
-            sessions.append(Session(messages=result_blocks))
-
-        return cls(sessions)
+    @classmethod
+    def from_file(
+        cls,
+        file_name: str = "/Users/mikhailkharlamov/Documents/RecapKt/src/benchmarking/agent_chat/"
+        "combined_chat_history_sessions.json",
+        cache_dir: Optional[str] = ".cache/chat_dataset",
+    ) -> "ChatDataset":
+        return cls(list(cls.stream_sessions(file_name, cache_dir)))
@@ -1,9 +1,9 @@
 import os
+import threading
 
 from typing import Any, List, Optional
 
 from dotenv import load_dotenv
-from langchain_community.callbacks import get_openai_callback
 from langchain_core.language_models import BaseChatModel
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import Runnable
@@ -11,55 +11,93 @@ from langchain_openai import ChatOpenAI
 from pydantic import SecretStr
 
 from src.benchmarking.baseline_logger import BaselineLogger
+from src.benchmarking.context_builder import ContextBuilder
 from src.benchmarking.prompts import BASELINE_PROMPT
-from src.summarize_algorithms.core.models import OpenAIModels, Session
+from src.summarize_algorithms.core.instrumentation import Instrumentation
+from src.summarize_algorithms.core.llm_cache import LLMResponseCache
+from src.summarize_algorithms.core.models import OpenAIModels, Session, WorkflowNode
+from src.summarize_algorithms.core.usage import (
+    RESPONSE_NODE,
+    UsageCallbackHandler,
+    UsageLedger,
+    current_dialogue,
+)
 
 
 class DialogueBaseline:
-    def __init__(self, system_name: str, llm: Optional[BaseChatModel] = None) -> None:
+    def __init__(
+        self,
+        system_name: str,
+        llm: Optional[BaseChatModel] = None,
+        llm_cache: Optional[LLMResponseCache] = None,
+        usage_ledger: Optional[UsageLedger] = None,
+        context_builder: Optional[ContextBuilder] = None,
+    ) -> None:
         load_dotenv()
 
         self.system_name = system_name
+        self.usage_ledger = usage_ledger
+        self.context_builder = context_builder or ContextBuilder()
 
-        api_key: str | None = os.getenv("OPENAI_API_KEY")
-        if api_key is not None:
-            self.llm = llm or ChatOpenAI(
+        if llm is None:
+            api_key: str | None = os.getenv("OPENAI_API_KEY")
+            if api_key is None:
+                raise ValueError("OPENAI_API_KEY environment variable is not loaded")
+            llm = ChatOpenAI(
                 model=OpenAIModels.GPT_5_MINI.value,
                 api_key=SecretStr(api_key)
             )
-        else:
-            raise ValueError("OPENAI_API_KEY environment variable is not loaded")
+        self.llm = llm
+        self.instrumentation = Instrumentation()
+        self._instrumentation_handler = self.instrumentation.callback_handler()
 
         self.prompt_template = BASELINE_PROMPT
         self.chain = self._build_chain()
+        if llm_cache is not None:
+            self.chain = llm_cache.wrap(self.chain, self.llm, self.prompt_template)
         self.prompt_tokens = 0
         self.completion_tokens = 0
+        self.embedding_tokens = 0
         self.total_cost = 0.0
+        self._usage_lock = threading.Lock()
 
         self.baseline_logger = BaselineLogger()
 
+    def _record_usage(self, usage: UsageCallbackHandler) -> None:
+        total = usage.total()
+        with self._usage_lock:
+            self.prompt_tokens += total.prompt_tokens
+            self.completion_tokens += total.completion_tokens
+            self.embedding_tokens += total.embedding_tokens
+            self.total_cost += total.cost
+
+        if self.usage_ledger is not None:
+            self.usage_ledger.record_call(self.system_name, current_dialogue("default"), usage)
+
+    def latency_summary(self) -> dict[str, dict[str, float]]:
+        return self.instrumentation.summary()
+
     def _build_chain(self) -> Runnable[dict[str, Any], str]:
         return self.prompt_template | self.llm | StrOutputParser()
 
     def process_dialogue(self, sessions: List[Session], query: str, iteration: int | None = None) -> str:
-        context_messages = []
-        for session in sessions:
-            for message in session.messages:
-                context_messages.append(f"{message.role}: {message.content}")
-        context = "\n".join(context_messages)
-        with get_openai_callback() as cb:
-            result = self.chain.invoke({"context": context, "query": query})
-
-            self.prompt_tokens += cb.prompt_tokens
-            self.completion_tokens += cb.completion_tokens
-            self.total_cost += cb.total_cost
+        with self.instrumentation.timed("build_context"):
+            context = self.context_builder.build(sessions)
+        usage = UsageCallbackHandler(RESPONSE_NODE)
+        with self.instrumentation.timed(WorkflowNode.GENERATE_RESPONSE.value):
+            result = self.chain.invoke(
+                {"context": context, "query": query},
+                config={"callbacks": [self._instrumentation_handler, usage]},
+            )
+        self._record_usage(usage)
 
         if iteration is not None:
-            self.baseline_logger.log_iteration(
-                system_name=self.system_name,
-                query=query,
-                iteration=iteration,
-                sessions=sessions
-            )
+            with self.instrumentation.timed("log_iteration"):
+                self.baseline_logger.log_iteration(
+                    system_name=self.system_name,
+                    query=query,
+                    iteration=iteration,
+                    sessions=sessions
+                )
 
         return result
@@ -1,19 +1,25 @@
-import json
 import logging
-import os
 
 from datetime import datetime
-from pathlib import Path
-from typing import Any
+from typing import Optional
 
-from src.summarize_algorithms.core.models import DialogueState, Session
+from src.benchmarking.jsonl_writer import RUN_ID, get_writer
+from src.benchmarking.memory_logger import SessionLog
+from src.summarize_algorithms.core.models import Session
 
 
 class BaselineLogger:
-    def __init__(self, logs_dir: str = "logs/baseline") -> None:
-        os.makedirs(logs_dir, exist_ok=True)
-        self.log_dir = Path(logs_dir)
+    def __init__(
+        self,
+        logs_dir: str = "logs/baseline",
+        run_id: Optional[str] = None,
+        max_bytes: int = 64 * 1024 * 1024,
+        compress: bool = False,
+    ) -> None:
+        self.writer = get_writer(logs_dir, run_id or RUN_ID, max_bytes, compress)
+        self.log_dir = self.writer.log_dir
         self.logger = logging.getLogger(__name__)
+        self._sessions = SessionLog()
 
     def log_iteration(
             self,
@@ -22,32 +28,17 @@ class BaselineLogger:
             iteration: int,
             sessions: list[Session]
     ) -> None:
-        self.logger.info(f"Logging iteration {iteration} to {self.log_dir}")
+        self.logger.debug(f"Queueing iteration {iteration} for {self.writer.path}")
 
-        record = {
+        session_offset, new_sessions = self._sessions.new_sessions(system_name, sessions)
+        self.writer.write({
             "timestamp": datetime.now().isoformat(),
             "iteration": iteration,
             "system": system_name,
             "query": query,
-            "sessions": [s.to_dict() for s in sessions],
-        }
-
-        with open(self.log_dir / (system_name + str(iteration) + ".jsonl"), "a", encoding="utf-8") as f:
-            f.write(json.dumps(record, ensure_ascii=False, indent=4))
-            f.write("\n")
-
-        self.logger.info(f"Saved successfully iteration {iteration} to {self.log_dir}")
-
-    @staticmethod
-    def _serialize_memories(state: DialogueState) -> dict[str, Any]:
-        result = {}
-        for name in ["text_memory_storage", "code_memory_storage", "tool_memory_storage"]:
-            storage = getattr(state, name, None)
-            if storage is not None:
-                result[name] = storage.__dict__()
-
-        text_memory = getattr(state, "text_memory", None)
-        if text_memory is not None:
-            result["text_memory"] = text_memory
+            "session_offset": session_offset,
+            "sessions": new_sessions,
+        })
 
-        return result
+    def flush(self) -> None:
+        self.writer.flush()
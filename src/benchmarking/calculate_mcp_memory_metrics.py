@@ -1,3 +1,4 @@
+import argparse
 import random
 
 from datetime import datetime
@@ -23,10 +24,21 @@ from src.summarize_algorithms.memory_bank.dialogue_system import (
 class CalculateMCPMemoryMetrics(CalculateMCPMetrics):
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
-        self.memory_bank = MemoryBankDialogueSystem(max_session_id=4)
+        self.memory_bank = MemoryBankDialogueSystem(
+            llm=self.llm,
+            max_session_id=4,
+            embed_model=self.embeddings,
+            llm_cache=self.llm_cache,
+            system_name="memory_bank",
+            usage_ledger=self.usage_ledger,
+        )
 
-        self.semantic_scorer = SemanticSimilarity(use_tokenizer=False)
-        self.llm_scorer = LLMMemoryEvaluation()
+        self.semantic_scorer = SemanticSimilarity(
+            use_tokenizer=False, embeddings=self.embeddings, usage_ledger=self.usage_ledger
+        )
+        self.llm_scorer = LLMMemoryEvaluation(
+            llm=self.llm, llm_cache=self.llm_cache, usage_ledger=self.usage_ledger
+        )
 
         self.session_count = 0
 
@@ -41,8 +53,11 @@ class CalculateMCPMemoryMetrics(CalculateMCPMetrics):
             metadata={
                 "timestamp": datetime.now().isoformat(),
                 "n_samples": self.n_samples,
+                "seed": self.seed,
                 "message_count": self.session_count,
                 "version": "1.0",
+                "latency": self._latency_metadata(),
+                "usage": self.usage_ledger.to_dict(),
             },
             recsum_results=SystemResults(
                 semantic_precision=MetricStats.from_values(
@@ -86,10 +101,25 @@ class CalculateMCPMemoryMetrics(CalculateMCPMetrics):
         for i, dialogue in enumerate(dialogues):
             print(f"Processing dialogue {i + 1}/{len(dialogues)}")
 
-            self._process_dialogue(dialogue, i)
+            self._process_dialogue_with_checkpoint(dialogue, i)
 
+        self._update_semantic_scores(self._semantic_inputs)
         self._is_calculated = True
 
+    def _latency_metadata(self) -> dict[str, Any]:
+        return {**super()._latency_metadata(), "memory_bank": self.memory_bank.latency_summary()}
+
+    @property
+    def _checkpoint_fields(self) -> list[str]:
+        return super()._checkpoint_fields + [
+            "_memory_bank_llm_data",
+            "session_count",
+            "memory_bank.prompt_tokens",
+            "memory_bank.completion_tokens",
+            "memory_bank.embedding_tokens",
+            "memory_bank.total_cost",
+        ]
+
     def _process_dialogue(self, dialogue: list, dialogue_index: int) -> None:
         ideal_session_memory = self.dataset._memory[dialogue_index]
 
@@ -118,9 +148,7 @@ class CalculateMCPMemoryMetrics(CalculateMCPMetrics):
             )
             ideal_memory = ideal_session_memory[i].memory
 
-            self._update_semantic_scores(
-                recsum_memory, memory_bank_memory, ideal_memory
-            )
+            self._semantic_inputs.append((recsum_memory, memory_bank_memory, ideal_memory))
             self._update_llm_single_scores(
                 recsum_memory, memory_bank_memory, ideal_memory
             )
@@ -131,24 +159,24 @@ class CalculateMCPMemoryMetrics(CalculateMCPMetrics):
             self.session_count += 1
 
     def _update_semantic_scores(
-        self,
-        recsum_memory: list[str],
-        memory_bank_memory: list[str],
-        ideal_memory: list[str],
+        self, semantic_inputs: list[tuple[list[str], list[str], list[str]]]
     ) -> None:
-        recsum_score = self.semantic_scorer.compute_similarity(
-            recsum_memory, ideal_memory
+        scores = self.semantic_scorer.compute_similarity_many(
+            [
+                (memory, ideal_memory)
+                for recsum_memory, memory_bank_memory, ideal_memory in semantic_inputs
+                for memory in (recsum_memory, memory_bank_memory)
+            ]
         )
-        self._recsum_semantic_data.recall.append(recsum_score.recall)
-        self._recsum_semantic_data.precision.append(recsum_score.precision)
-        self._recsum_semantic_data.f1.append(recsum_score.f1)
 
-        memory_bank_score = self.semantic_scorer.compute_similarity(
-            memory_bank_memory, ideal_memory
-        )
-        self._memory_bank_semantic_data.recall.append(memory_bank_score.recall)
-        self._memory_bank_semantic_data.precision.append(memory_bank_score.precision)
-        self._memory_bank_semantic_data.f1.append(memory_bank_score.f1)
+        for recsum_score, memory_bank_score in zip(scores[::2], scores[1::2]):
+            self._recsum_semantic_data.recall.append(recsum_score.recall)
+            self._recsum_semantic_data.precision.append(recsum_score.precision)
+            self._recsum_semantic_data.f1.append(recsum_score.f1)
+
+            self._memory_bank_semantic_data.recall.append(memory_bank_score.recall)
+            self._memory_bank_semantic_data.precision.append(memory_bank_score.precision)
+            self._memory_bank_semantic_data.f1.append(memory_bank_score.f1)
 
     def _update_llm_single_scores(
         self,
@@ -211,7 +239,15 @@ class CalculateMCPMemoryMetrics(CalculateMCPMetrics):
 
 
 def main() -> None:
-    metric_calculator = CalculateMCPMemoryMetrics(1)
+    parser = argparse.ArgumentParser(description="Calculate MCP memory metrics.")
+    parser.add_argument("--checkpoint", default="checkpoints/mcp_memory_metrics.jsonl")
+    parser.add_argument("--resume", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    metric_calculator = CalculateMCPMemoryMetrics(
+        1, checkpoint_path=args.checkpoint, resume=args.resume, seed=args.seed
+    )
 
     print("Starting MCP metrics calculation...")
     metric_calculator.calculate()
@@ -1,3 +1,4 @@
+import argparse
 import random
 
 from datetime import datetime
@@ -19,9 +20,18 @@ from src.benchmarking.semantic_similarity import SemanticSimilarity
 class CalculateMCPResponseMetrics(CalculateMCPMetrics):
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
-        self.baseline = DialogueBaseline("dialog_baseline")
-        self.semantic_scorer = SemanticSimilarity()
-        self.llm_scorer = LLMResponseEvaluation()
+        self.baseline = DialogueBaseline(
+            "dialog_baseline",
+            llm=self.llm,
+            llm_cache=self.llm_cache,
+            usage_ledger=self.usage_ledger,
+        )
+        self.semantic_scorer = SemanticSimilarity(
+            embeddings=self.embeddings, usage_ledger=self.usage_ledger
+        )
+        self.llm_scorer = LLMResponseEvaluation(
+            llm=self.llm, llm_cache=self.llm_cache, usage_ledger=self.usage_ledger
+        )
 
         self.message_count = 0
 
@@ -36,8 +46,11 @@ class CalculateMCPResponseMetrics(CalculateMCPMetrics):
             metadata={
                 "timestamp": datetime.now().isoformat(),
                 "n_samples": self.n_samples,
+                "seed": self.seed,
                 "message_count": self.message_count,
                 "version": "1.0",
+                "latency": self._latency_metadata(),
+                "usage": self.usage_ledger.to_dict(),
             },
             recsum_results=SystemResults(
                 semantic_precision=MetricStats.from_values(
@@ -81,9 +94,25 @@ class CalculateMCPResponseMetrics(CalculateMCPMetrics):
         for i, dialogue in enumerate(dialogues):
             print(f"Processing dialogue {i + 1}/{len(dialogues)}")
 
-            self._process_dialogue(dialogue, i)
+            self._process_dialogue_with_checkpoint(dialogue, i)
+
+        self._update_semantic_scores(self._semantic_inputs)
         self._is_calculated = True
 
+    def _latency_metadata(self) -> dict[str, Any]:
+        return {**super()._latency_metadata(), "baseline": self.baseline.latency_summary()}
+
+    @property
+    def _checkpoint_fields(self) -> list[str]:
+        return super()._checkpoint_fields + [
+            "_baseline_llm_data",
+            "message_count",
+            "baseline.prompt_tokens",
+            "baseline.completion_tokens",
+            "baseline.embedding_tokens",
+            "baseline.total_cost",
+        ]
+
     def _process_dialogue(self, dialogue: list, dialogue_index: int) -> None:
         ideal_response = dialogue[-1].messages.pop()
 
@@ -96,8 +125,8 @@ class CalculateMCPResponseMetrics(CalculateMCPMetrics):
             ).response
             baseline_response = self.baseline.process_dialogue(dialogue, query.content, self.message_count)
 
-            self._update_semantic_scores(
-                recsum_response, baseline_response, ideal_response.content
+            self._semantic_inputs.append(
+                (recsum_response, baseline_response, ideal_response.content)
             )
 
             context = str(dialogue[-1])
@@ -111,22 +140,23 @@ class CalculateMCPResponseMetrics(CalculateMCPMetrics):
                 context, memory, recsum_response, baseline_response
             )
 
-    def _update_semantic_scores(
-        self, recsum_response: str, baseline_response: str, ideal_response: str
-    ) -> None:
-        recsum_score = self.semantic_scorer.compute_similarity(
-            recsum_response, ideal_response
+    def _update_semantic_scores(self, semantic_inputs: list[tuple[str, str, str]]) -> None:
+        scores = self.semantic_scorer.compute_similarity_many(
+            [
+                (response, ideal_response)
+                for recsum_response, baseline_response, ideal_response in semantic_inputs
+                for response in (recsum_response, baseline_response)
+            ]
         )
-        self._recsum_semantic_data.recall.append(recsum_score.recall)
-        self._recsum_semantic_data.precision.append(recsum_score.precision)
-        self._recsum_semantic_data.f1.append(recsum_score.f1)
 
-        baseline_score = self.semantic_scorer.compute_similarity(
-            baseline_response, ideal_response
-        )
-        self._baseline_semantic_data.recall.append(baseline_score.recall)
-        self._baseline_semantic_data.precision.append(baseline_score.precision)
-        self._baseline_semantic_data.f1.append(baseline_score.f1)
+        for recsum_score, baseline_score in zip(scores[::2], scores[1::2]):
+            self._recsum_semantic_data.recall.append(recsum_score.recall)
+            self._recsum_semantic_data.precision.append(recsum_score.precision)
+            self._recsum_semantic_data.f1.append(recsum_score.f1)
+
+            self._baseline_semantic_data.recall.append(baseline_score.recall)
+            self._baseline_semantic_data.precision.append(baseline_score.precision)
+            self._baseline_semantic_data.f1.append(baseline_score.f1)
 
     def _update_llm_single_scores(
         self, recsum_response: str, baseline_response: str, context: str, memory: str
@@ -181,7 +211,15 @@ class CalculateMCPResponseMetrics(CalculateMCPMetrics):
 
 
 def main() -> None:
-    metric_calculator = CalculateMCPResponseMetrics()
+    parser = argparse.ArgumentParser(description="Calculate MCP response metrics.")
+    parser.add_argument("--checkpoint", default="checkpoints/mcp_response_metrics.jsonl")
+    parser.add_argument("--resume", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    metric_calculator = CalculateMCPResponseMetrics(
+        checkpoint_path=args.checkpoint, resume=args.resume, seed=args.seed
+    )
 
     print("Starting MCP metrics calculation...")
     metric_calculator.calculate()
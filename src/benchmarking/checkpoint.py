@@ -0,0 +1,113 @@
+import copy
+import dataclasses
+import hashlib
+import json
+import os
+
+from pathlib import Path
+from typing import Any, Sequence
+
+from src.summarize_algorithms.core.models import Session
+
+
+def dialogue_fingerprint(sessions: Sequence[Session]) -> str:
+    digest = hashlib.sha256()
+    for session in sessions:
+        digest.update(session.fingerprint().encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _resolve(owner: Any, path: str) -> tuple[Any, str]:
+    *parents, name = path.split(".")
+    for parent in parents:
+        owner = getattr(owner, parent)
+    return owner, name
+
+
+def _plain(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return copy.deepcopy(value)
+
+
+def _delta(before: Any, after: Any) -> Any:
+    if isinstance(after, list):
+        return after[len(before) :]
+    if isinstance(after, dict):
+        return {key: _delta(before.get(key, type(value)()), value) for key, value in after.items()}
+    return after - before
+
+
+def _merge(current: Any, delta: Any) -> Any:
+    if isinstance(current, list):
+        current.extend(delta)
+        return current
+    if isinstance(current, dict):
+        for key, value in delta.items():
+            current[key] = _merge(current.get(key, type(value)()), value)
+        return current
+    return current + delta
+
+
+class BenchmarkCheckpoint:
+    def __init__(self, path: str, resume: bool = False) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.records: dict[str, dict[str, Any]] = {}
+
+        if resume and self.path.exists():
+            self._load()
+        else:
+            self.path.write_text("", encoding="utf-8")
+
+    def _load(self) -> None:
+        data = self.path.read_bytes()
+        complete = data[: data.rfind(b"\n") + 1]
+        for line in complete.decode("utf-8", errors="replace").splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self.records[record["unit"]] = record
+
+        if len(complete) < len(data):
+            with open(self.path, "r+b") as f:
+                f.truncate(len(complete))
+
+    def is_completed(self, unit: str) -> bool:
+        return unit in self.records
+
+    @staticmethod
+    def capture(owner: Any, fields: Sequence[str]) -> dict[str, Any]:
+        snapshot = {}
+        for path in fields:
+            parent, name = _resolve(owner, path)
+            snapshot[path] = _plain(getattr(parent, name))
+        return snapshot
+
+    def record(
+        self, unit: str, owner: Any, fields: Sequence[str], before: dict[str, Any], **extra: Any
+    ) -> None:
+        after = self.capture(owner, fields)
+        record = {
+            "unit": unit,
+            **extra,
+            "delta": {path: _delta(before[path], after[path]) for path in fields},
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.records[unit] = record
+
+    def restore(self, unit: str, owner: Any) -> None:
+        for path, delta in self.records[unit]["delta"].items():
+            parent, name = _resolve(owner, path)
+            value = getattr(parent, name)
+            if dataclasses.is_dataclass(value):
+                for field_name, field_delta in delta.items():
+                    setattr(
+                        value, field_name, _merge(getattr(value, field_name), field_delta)
+                    )
+            else:
+                setattr(parent, name, _merge(value, delta))
@@ -0,0 +1,128 @@
+import bisect
+import itertools
+import threading
+
+from collections import OrderedDict
+from enum import Enum
+from typing import Optional, Sequence
+
+import tiktoken
+
+from src.summarize_algorithms.core.models import Session
+from src.summarize_algorithms.core.tokenization import get_encoding
+
+
+class ContextPolicy(Enum):
+    FULL = "full"
+    SLIDING = "sliding"
+    HEAD_TAIL = "head_tail"
+
+
+class ContextBuilder:
+    OMISSION_MARKER = "[...]"
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        policy: ContextPolicy | str = ContextPolicy.FULL,
+        encoding_name: str = "cl100k_base",
+        head_fraction: float = 0.5,
+        max_cached_sessions: int = 4096,
+    ) -> None:
+        if max_tokens is not None and max_tokens < 1:
+            raise ValueError("max_tokens must be at least 1.")
+        if not 0 <= head_fraction <= 1:
+            raise ValueError("head_fraction must be between 0 and 1.")
+
+        self.max_tokens = max_tokens
+        self.policy = ContextPolicy(policy)
+        self.encoding_name = encoding_name
+        self.head_fraction = head_fraction
+        self.max_cached_sessions = max_cached_sessions
+        self._cache: OrderedDict[str, tuple[list[str], list[int]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def tokenizer(self) -> tiktoken.Encoding:
+        return get_encoding(self.encoding_name)
+
+    @staticmethod
+    def _lines(session: Session) -> list[str]:
+        return [f"{message.role}: {message.content}" for message in session.messages]
+
+    def _session_tokens(self, session: Session) -> tuple[list[str], list[int]]:
+        key = session.fingerprint()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        lines = self._lines(session)
+        counts = [len(ids) + 1 for ids in self.tokenizer.encode_batch(lines, disallowed_special=())]
+        with self._lock:
+            self._cache[key] = (lines, counts)
+            while len(self._cache) > self.max_cached_sessions:
+                self._cache.popitem(last=False)
+        return lines, counts
+
+    def count_tokens(self, sessions: Sequence[Session]) -> int:
+        return sum(sum(self._session_tokens(session)[1]) for session in sessions)
+
+    def _truncate(self, line: str, max_tokens: int, keep_end: bool) -> str:
+        if max_tokens <= 0:
+            return ""
+        ids = self.tokenizer.encode(line, disallowed_special=())
+        ids = ids[-max_tokens:] if keep_end else ids[:max_tokens]
+        return self.tokenizer.decode(ids, errors="ignore")
+
+    def _head(self, lines: list[str], counts: list[int], budget: int, partial: bool = True) -> list[str]:
+        totals = list(itertools.accumulate(counts))
+        end = bisect.bisect_right(totals, budget)
+        head = lines[:end]
+        if partial and end < len(lines):
+            used = totals[end - 1] if end else 0
+            truncated = self._truncate(lines[end], budget - used - 1, keep_end=False)
+            if truncated:
+                head.append(truncated)
+        return head
+
+    def _tail(self, lines: list[str], counts: list[int], budget: int) -> list[str]:
+        totals = list(itertools.accumulate(reversed(counts)))
+        size = bisect.bisect_right(totals, budget)
+        tail = lines[len(lines) - size:]
+        if size < len(lines):
+            used = totals[size - 1] if size else 0
+            truncated = self._truncate(lines[len(lines) - size - 1], budget - used - 1, keep_end=True)
+            if truncated:
+                tail.insert(0, truncated)
+        return tail
+
+    def _truncate_lines(self, lines: list[str], counts: list[int], max_tokens: int) -> list[str]:
+        if self.policy is ContextPolicy.FULL:
+            return self._head(lines, counts, max_tokens)
+        if self.policy is ContextPolicy.SLIDING:
+            return self._tail(lines, counts, max_tokens)
+
+        budget = max_tokens - len(self.tokenizer.encode(self.OMISSION_MARKER)) - 1
+        if budget <= 0:
+            return self._tail(lines, counts, max_tokens)
+        head = self._head(lines, counts, int(budget * self.head_fraction), partial=False)
+        head_tokens = sum(counts[: len(head)])
+        tail = self._tail(lines[len(head):], counts[len(head):], budget - head_tokens)
+        return head + [self.OMISSION_MARKER] + tail
+
+    def build(self, sessions: Sequence[Session]) -> str:
+        if self.max_tokens is None:
+            return "\n".join(line for session in sessions for line in self._lines(session))
+
+        lines: list[str] = []
+        counts: list[int] = []
+        for session in sessions:
+            session_lines, session_counts = self._session_tokens(session)
+            lines += session_lines
+            counts += session_counts
+
+        if sum(counts) <= self.max_tokens:
+            return "\n".join(lines)
+        return "\n".join(self._truncate_lines(lines, counts, self.max_tokens))
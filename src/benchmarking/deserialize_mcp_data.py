@@ -1,9 +1,13 @@
 import random
+import shutil
 
 from dataclasses import dataclass, field
-from typing import Any
+from pathlib import Path
+from typing import Any, Optional
 
-from datasets import load_dataset
+import numpy as np
+
+from datasets import Dataset, load_dataset
 
 from src.summarize_algorithms.core.models import BaseBlock, Session
 
@@ -24,32 +28,92 @@ class MCPDataset:
     data_name = "nayohan/multi_session_chat"
 
     def __init__(
-        self, n_samples: int, session_length: int = 3, shuffle: bool = True
+        self,
+        n_samples: int,
+        session_length: int = 3,
+        shuffle: bool = True,
+        seed: Optional[int] = None,
+        cache_dir: Optional[str] = ".cache/mcp_dataset",
     ) -> None:
         self.n_samples = n_samples
         self.session_length = min(session_length, 3)
         self.shuffle = shuffle
+        self.seed = seed
+        self.cache_dir = cache_dir
         self._sessions: list[list[Session]] = []
         self._memory: list[list[SessionMemory]] = []
         self._is_initialized = False
 
+    @classmethod
+    def from_dialogues(
+        cls, sessions: list[list[Session]], memory: list[list[SessionMemory]]
+    ) -> "MCPDataset":
+        if len(sessions) != len(memory):
+            raise ValueError("Each dialogue must have its ideal memory.")
+
+        dataset = cls(len(sessions), shuffle=False, cache_dir=None)
+        dataset._sessions = sessions
+        dataset._memory = memory
+        dataset._is_initialized = True
+        return dataset
+
+    @property
+    def cache_path(self) -> Optional[Path]:
+        if self.cache_dir is None or (self.shuffle and self.seed is None):
+            return None
+
+        selection = f"seed{self.seed}" if self.shuffle else "head"
+        name = (
+            f"{self.data_name.replace('/', '__')}-test"
+            f"-len{self.session_length}-n{self.n_samples}-{selection}"
+        )
+        return Path(self.cache_dir) / name
+
+    def _select_indices(self, dataset: Dataset) -> list[int]:
+        session_ids = dataset.with_format("numpy", columns=["session_id"])[:]["session_id"]
+        zero_sessions_idx = (
+            np.flatnonzero(session_ids == self.session_length) - self.session_length
+        ).tolist()
+
+        if self.shuffle:
+            return random.Random(self.seed).sample(zero_sessions_idx, self.n_samples)
+        return zero_sessions_idx[: self.n_samples]
+
+    def _load_rows(self) -> Dataset:
+        cache_path = self.cache_path
+        if cache_path is not None and cache_path.exists():
+            return Dataset.load_from_disk(str(cache_path))
+
+        dataset = load_dataset(self.data_name, split="test")
+        rows = dataset.select(
+            [
+                idx + offset
+                for idx in self._select_indices(dataset)
+                for offset in range(self.session_length + 1)
+            ]
+        ).flatten_indices()
+
+        if cache_path is not None:
+            tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            rows.save_to_disk(str(tmp_path))
+            tmp_path.replace(cache_path)
+
+        return rows
+
     def _initialize_data(self) -> None:
         if self._is_initialized:
             return
 
-        dataset = load_dataset(self.data_name, split="test")
-        zero_sessions_idx = [
-            i - self.session_length
-            for i, ex in enumerate(dataset)
-            if ex["session_id"] == self.session_length
-        ]
-        if self.shuffle:
-            selected_indices = random.sample(zero_sessions_idx, self.n_samples)
-        else:
-            selected_indices = zero_sessions_idx[: self.n_samples]
-
-        for idx in selected_indices:
-            self._process_dialogue(dataset[idx : idx + self.session_length + 1])
+        columns = self._load_rows().to_dict()
+        dialogue_size = self.session_length + 1
+        for start in range(0, len(columns["session_id"]), dialogue_size):
+            self._process_dialogue(
+                {
+                    name: values[start : start + dialogue_size]
+                    for name, values in columns.items()
+                }
+            )
 
         self._is_initialized = True
 
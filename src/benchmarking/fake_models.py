@@ -0,0 +1,214 @@
+import asyncio
+import functools
+import hashlib
+import random
+import re
+import threading
+import time
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Sequence
+
+import numpy as np
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+VOCABULARY = (
+    "user assistant session memory summary code tool call response query context "
+    "python kotlin function class test build error fix refactor module import "
+    "database request cache index vector search latency token model prompt file"
+).split()
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+@dataclass
+class BackendStats:
+    calls: int = 0
+    items: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(
+        self, seconds: float, items: int, prompt_tokens: int = 0, completion_tokens: int = 0
+    ) -> None:
+        with self._lock:
+            self.calls += 1
+            self.items += items
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.seconds += seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = self.items = self.prompt_tokens = self.completion_tokens = 0
+            self.seconds = 0.0
+
+
+def fake_text(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(max(n_words, 1)))
+
+
+def fake_json_value(schema: dict[str, Any], rng: random.Random, n_words: int) -> Any:
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if "anyOf" in schema:
+        options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+        return fake_json_value(options[0] if options else {}, rng, n_words)
+
+    kind = schema.get("type", "string")
+    if kind == "object":
+        return {
+            name: fake_json_value(property_schema, rng, n_words)
+            for name, property_schema in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [fake_json_value(schema.get("items", {}), rng, n_words) for _ in range(rng.randint(1, 3))]
+    if kind == "integer":
+        return rng.randint(schema.get("minimum", 0), schema.get("maximum", 100))
+    if kind == "number":
+        return rng.uniform(schema.get("minimum", 0.0), schema.get("maximum", 1.0))
+    if kind == "boolean":
+        return rng.random() < 0.5
+    return fake_text(rng, n_words)
+
+
+class FakeChatModel(BaseChatModel):
+    model_name: str = "fake-chat-model"
+    latency: float = 0.0
+    prompt_tokens: Optional[int] = None
+    completion_tokens: int = 32
+    seed: int = 0
+
+    _stats: BackendStats = PrivateAttr(default_factory=BackendStats)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    @property
+    def stats(self) -> BackendStats:
+        return self._stats
+
+    def bind_tools(
+        self,
+        tools: Sequence[dict[str, Any] | type | Callable | BaseTool],
+        *,
+        tool_choice: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Runnable[LanguageModelInput, BaseMessage]:
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _respond(self, messages: list[BaseMessage], tools: Optional[list[dict[str, Any]]]) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        rng = random.Random(f"{self.seed}:{prompt}")
+        prompt_tokens = self.prompt_tokens if self.prompt_tokens is not None else len(prompt.split())
+
+        if tools:
+            function = tools[0]["function"]
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": function["name"],
+                        "args": fake_json_value(function.get("parameters", {}), rng, self.completion_tokens),
+                        "id": f"call_{rng.getrandbits(32):08x}",
+                    }
+                ],
+            )
+        else:
+            message = AIMessage(content=fake_text(rng, self.completion_tokens))
+
+        token_usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": prompt_tokens + self.completion_tokens,
+        }
+        message.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": self.completion_tokens,
+            "total_tokens": prompt_tokens + self.completion_tokens,
+        }
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={"token_usage": token_usage, "model_name": self.model_name},
+        )
+
+    def _finish(self, started: float, result: ChatResult) -> ChatResult:
+        token_usage = (result.llm_output or {})["token_usage"]
+        self._stats.record(
+            time.perf_counter() - started,
+            1,
+            token_usage["prompt_tokens"],
+            token_usage["completion_tokens"],
+        )
+        return result
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        started = time.perf_counter()
+        if self.latency > 0:
+            time.sleep(self.latency)
+        return self._finish(started, self._respond(messages, kwargs.get("tools")))
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        started = time.perf_counter()
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        return self._finish(started, self._respond(messages, kwargs.get("tools")))
+
+
+@functools.lru_cache(maxsize=65536)
+def _hash_token(token: str, size: int) -> tuple[int, float]:
+    value = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+    return value % size, 1.0 if value >> 63 else -1.0
+
+
+class HashingEmbeddings(Embeddings):
+    def __init__(self, size: int = 256, latency: float = 0.0) -> None:
+        self.size = size
+        self.latency = latency
+        self.stats = BackendStats()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        started = time.perf_counter()
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        vectors = np.zeros((len(texts), self.size), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in TOKEN_PATTERN.findall(text.lower()) or [text]:
+                column, sign = _hash_token(token, self.size)
+                vectors[row, column] += sign
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+
+        self.stats.record(time.perf_counter() - started, len(texts))
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
@@ -0,0 +1,205 @@
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Optional
+
+RUN_ID = f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+
+_writers: dict[tuple[Path, str, bool], "BackgroundJSONLWriter"] = {}
+_writers_lock = threading.Lock()
+
+
+class BackgroundJSONLWriter:
+    def __init__(
+        self,
+        log_dir: str | Path,
+        run_id: str = RUN_ID,
+        max_bytes: int = 64 * 1024 * 1024,
+        compress: bool = False,
+        batch_size: int = 256,
+        max_queue_size: int = 10_000,
+    ) -> None:
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1.")
+
+        self.log_dir = Path(log_dir).resolve()
+        self.run_id = run_id
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.batch_size = batch_size
+        self.logger = logging.getLogger(__name__)
+
+        self._queue: queue.Queue[Optional[tuple[dict[str, Any], Optional[bytes]]]] = queue.Queue(
+            max_queue_size
+        )
+        self._file: Optional[IO[str]] = None
+        self._payload_file: Optional[IO[bytes]] = None
+        self._payload_bytes = 0
+        self._part = 0
+        self._bytes_written = 0
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name=f"jsonl-writer-{run_id}", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def path(self) -> Path:
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        name = self.run_id if self._part == 0 else f"{self.run_id}.{self._part}"
+        return self.log_dir / (name + suffix)
+
+    @property
+    def payload_path(self) -> Path:
+        return self.log_dir / f"{self.run_id}.bin"
+
+    def write(self, record: dict[str, Any], payload: Optional[bytes] = None) -> None:
+        with self._close_lock:
+            if self._closed:
+                raise ValueError("Cannot write to a closed writer.")
+            self._queue.put((record, payload))
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def close(self) -> None:
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def __enter__(self) -> "BackgroundJSONLWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _open(self) -> IO[str]:
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        if self.compress:
+            return gzip.open(self.path, "at", encoding="utf-8")
+        return open(self.path, "a", encoding="utf-8")
+
+    def _rotate(self, file: IO[str]) -> IO[str]:
+        file.close()
+        self._part += 1
+        self._bytes_written = 0
+        self._file = self._open()
+        return self._file
+
+    def _open_payload(self) -> IO[bytes]:
+        if self._payload_file is None:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            self._payload_file = open(self.payload_path, "ab")
+            self._payload_bytes = os.fstat(self._payload_file.fileno()).st_size
+        return self._payload_file
+
+    def _write_payloads(self, items: list[tuple[dict[str, Any], Optional[bytes]]]) -> None:
+        payloads = [(record, payload) for record, payload in items if payload]
+        if not payloads:
+            return
+
+        payload_file = self._open_payload()
+        offset = self._payload_bytes
+        try:
+            for record, payload in payloads:
+                record["payload"] = {
+                    "file": self.payload_path.name,
+                    "offset": offset,
+                    "nbytes": len(payload),
+                }
+                payload_file.write(payload)
+                offset += len(payload)
+            payload_file.flush()
+        except Exception:
+            for record, _ in payloads:
+                record.pop("payload", None)
+            self._payload_file = None
+            payload_file.close()
+            raise
+        self._payload_bytes = offset
+
+    def _write_batch(self, items: list[tuple[dict[str, Any], Optional[bytes]]]) -> None:
+        file = self._file if self._file is not None else self._open()
+        self._file = file
+
+        self._write_payloads(items)
+        for record, _ in items:
+            line = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str) + "\n"
+            size = len(line.encode("utf-8"))
+            if self._bytes_written and self._bytes_written + size > self.max_bytes:
+                file = self._rotate(file)
+            file.write(line)
+            self._bytes_written += size
+        file.flush()
+
+    def _drain(
+        self, first: tuple[dict[str, Any], Optional[bytes]]
+    ) -> tuple[list[tuple[dict[str, Any], Optional[bytes]]], bool]:
+        items = [first]
+        while len(items) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return items, True
+            items.append(item)
+        return items, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                self._queue.task_done()
+                break
+
+            items, stopping = self._drain(first)
+            try:
+                self._write_batch(items)
+            except Exception:
+                self.logger.exception(f"Failed to write {len(items)} records to {self.path}")
+            finally:
+                for _ in range(len(items) + int(stopping)):
+                    self._queue.task_done()
+
+        for file in (self._file, self._payload_file):
+            if file is not None:
+                file.close()
+        self._file = None
+        self._payload_file = None
+
+
+def get_writer(
+    log_dir: str | Path,
+    run_id: str = RUN_ID,
+    max_bytes: int = 64 * 1024 * 1024,
+    compress: bool = False,
+) -> BackgroundJSONLWriter:
+    key = (Path(log_dir).resolve(), run_id, compress)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or writer._closed:
+            writer = BackgroundJSONLWriter(log_dir, run_id, max_bytes, compress)
+            _writers[key] = writer
+        return writer
+
+
+@atexit.register
+def close_writers() -> None:
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
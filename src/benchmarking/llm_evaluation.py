@@ -2,12 +2,12 @@ import os
 
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Any, Generic, Optional, TypeVar
+from typing import Any, Generic, Optional, Sequence, TypeVar
 
 from dotenv import load_dotenv
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnableSerializable
+from langchain_core.runnables import Runnable, RunnableSerializable
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field, SecretStr
 
@@ -19,7 +19,14 @@ from src.benchmarking.prompts import (
     SINGLE_EVALUATION_MEMORY_PROMPT,
     SINGLE_EVALUATION_RESPONSE_PROMPT,
 )
+from src.summarize_algorithms.core.llm_cache import LLMResponseCache
 from src.summarize_algorithms.core.models import OpenAIModels
+from src.summarize_algorithms.core.usage import (
+    JUDGE_NODE,
+    UsageCallbackHandler,
+    UsageLedger,
+    current_dialogue,
+)
 
 
 class ComparisonResult(Enum):
@@ -81,20 +88,42 @@ PairwiseResultType = TypeVar("PairwiseResultType", bound=BaseModel)
 
 
 class BaseLLMEvaluation(Generic[SingleResultType, PairwiseResultType], ABC):
-    def __init__(self, llm: Optional[BaseChatModel] = None) -> None:
+    def __init__(
+        self,
+        llm: Optional[BaseChatModel] = None,
+        llm_cache: Optional[LLMResponseCache] = None,
+        usage_ledger: Optional[UsageLedger] = None,
+        system_name: str = JUDGE_NODE,
+    ) -> None:
         load_dotenv()
 
-        api_key: str | None = os.getenv("OPENAI_API_KEY")
-        if api_key is not None:
-            self.llm = llm or ChatOpenAI(
+        self.usage_ledger = usage_ledger
+        self.system_name = system_name
+        if llm is None:
+            api_key: str | None = os.getenv("OPENAI_API_KEY")
+            if api_key is None:
+                raise ValueError("OPENAI_API_KEY environment variable is not loaded")
+            llm = ChatOpenAI(
                 model=OpenAIModels.GPT_5_MINI.value,
                 api_key=SecretStr(api_key))
-        else:
-            raise ValueError("OPENAI_API_KEY environment variable is not loaded")
+        self.llm = llm
         self.single_eval_prompt = self._get_single_eval_prompt()
         self.pairwise_eval_prompt = self._get_pairwise_eval_prompt()
-        self.single_eval_chain = self._build_single_eval_chain()
-        self.pairwise_eval_chain = self._build_pairwise_eval_chain()
+        self.single_eval_chain: Runnable = self._build_single_eval_chain()
+        self.pairwise_eval_chain: Runnable = self._build_pairwise_eval_chain()
+        if llm_cache is not None:
+            self.single_eval_chain = llm_cache.wrap(
+                self.single_eval_chain,
+                self.llm,
+                self.single_eval_prompt,
+                self._get_single_result_model(),
+            )
+            self.pairwise_eval_chain = llm_cache.wrap(
+                self.pairwise_eval_chain,
+                self.llm,
+                self.pairwise_eval_prompt,
+                self._get_pairwise_result_model(),
+            )
 
     @abstractmethod
     def _get_single_eval_prompt(self) -> PromptTemplate:
@@ -122,12 +151,82 @@ class BaseLLMEvaluation(Generic[SingleResultType, PairwiseResultType], ABC):
             self._get_pairwise_result_model()
         )
 
-    @staticmethod
-    def _safe_invoke(chain: RunnableSerializable, params: dict[str, str]) -> Any:
+    @abstractmethod
+    def _single_params(self, *args: Any, **kwargs: Any) -> dict[str, str]:
+        pass
+
+    @abstractmethod
+    def _pairwise_params(self, *args: Any, **kwargs: Any) -> dict[str, str]:
+        pass
+
+    def evaluate_single_many(
+        self, items: Sequence[Sequence[str]], max_concurrency: int = 8
+    ) -> list[SingleResultType | ConnectionError]:
+        params = [self._single_params(*item) for item in items]
+        return self._safe_batch(self.single_eval_chain, params, max_concurrency)
+
+    def evaluate_pairwise_many(
+        self, items: Sequence[Sequence[str]], max_concurrency: int = 8
+    ) -> list[PairwiseResultType | ConnectionError]:
+        params = [self._pairwise_params(*item) for item in items]
+        return self._safe_batch(self.pairwise_eval_chain, params, max_concurrency)
+
+    async def aevaluate_single_many(
+        self, items: Sequence[Sequence[str]], max_concurrency: int = 8
+    ) -> list[SingleResultType | ConnectionError]:
+        params = [self._single_params(*item) for item in items]
+        return await self._asafe_batch(self.single_eval_chain, params, max_concurrency)
+
+    async def aevaluate_pairwise_many(
+        self, items: Sequence[Sequence[str]], max_concurrency: int = 8
+    ) -> list[PairwiseResultType | ConnectionError]:
+        params = [self._pairwise_params(*item) for item in items]
+        return await self._asafe_batch(self.pairwise_eval_chain, params, max_concurrency)
+
+    def _record_usage(self, usage: UsageCallbackHandler) -> None:
+        if self.usage_ledger is not None:
+            self.usage_ledger.record_call(self.system_name, current_dialogue("default"), usage)
+
+    def _safe_invoke(self, chain: Runnable, params: dict[str, str]) -> Any:
+        usage = UsageCallbackHandler(JUDGE_NODE)
         try:
-            return chain.invoke(params)
+            return chain.invoke(params, config={"callbacks": [usage]})
         except Exception as e:
             raise ConnectionError(f"API request failed: {e}") from e
+        finally:
+            self._record_usage(usage)
+
+    @staticmethod
+    def _as_connection_error(output: Any) -> Any:
+        if not isinstance(output, Exception) or isinstance(output, ConnectionError):
+            return output
+        error = ConnectionError(f"API request failed: {output}")
+        error.__cause__ = output
+        return error
+
+    def _safe_batch(
+        self, chain: Runnable, params: list[dict[str, str]], max_concurrency: int
+    ) -> list[Any]:
+        usage = UsageCallbackHandler(JUDGE_NODE)
+        outputs = chain.batch(
+            params,
+            config={"max_concurrency": max_concurrency, "callbacks": [usage]},
+            return_exceptions=True,
+        )
+        self._record_usage(usage)
+        return [self._as_connection_error(output) for output in outputs]
+
+    async def _asafe_batch(
+        self, chain: Runnable, params: list[dict[str, str]], max_concurrency: int
+    ) -> list[Any]:
+        usage = UsageCallbackHandler(JUDGE_NODE)
+        outputs = await chain.abatch(
+            params,
+            config={"max_concurrency": max_concurrency, "callbacks": [usage]},
+            return_exceptions=True,
+        )
+        self._record_usage(usage)
+        return [self._as_connection_error(output) for output in outputs]
 
 
 class LLMResponseEvaluation(BaseLLMEvaluation[SingleResult, PairwiseResult]):
@@ -143,19 +242,27 @@ class LLMResponseEvaluation(BaseLLMEvaluation[SingleResult, PairwiseResult]):
     def _get_pairwise_result_model(self) -> type[PairwiseResult]:
         return PairwiseResult
 
-    def evaluate_single(self, context: str, memory: str, response: str) -> SingleResult:
-        params = {"context": context, "memory": memory, "response": response}
-        return self._safe_invoke(self.single_eval_chain, params)
+    def _single_params(self, context: str, memory: str, response: str) -> dict[str, str]:
+        return {"context": context, "memory": memory, "response": response}
 
-    def evaluate_pairwise(
+    def _pairwise_params(
         self, context: str, memory: str, first_response: str, second_response: str
-    ) -> PairwiseResult:
-        params = {
+    ) -> dict[str, str]:
+        return {
             "context": context,
             "memory": memory,
             "first_response": first_response,
             "second_response": second_response,
         }
+
+    def evaluate_single(self, context: str, memory: str, response: str) -> SingleResult:
+        params = self._single_params(context, memory, response)
+        return self._safe_invoke(self.single_eval_chain, params)
+
+    def evaluate_pairwise(
+        self, context: str, memory: str, first_response: str, second_response: str
+    ) -> PairwiseResult:
+        params = self._pairwise_params(context, memory, first_response, second_response)
         return self._safe_invoke(self.pairwise_eval_chain, params)
 
 
@@ -172,18 +279,26 @@ class LLMMemoryEvaluation(BaseLLMEvaluation[SingleResult, PairwiseResult]):
     def _get_pairwise_result_model(self) -> type[PairwiseResult]:
         return PairwiseResult
 
-    def evaluate_single(self, ideal_memory: str, memory: str) -> SingleResult:
-        params = {"generated_memory": memory, "ideal_memory": ideal_memory}
-        return self._safe_invoke(self.single_eval_chain, params)
+    def _single_params(self, ideal_memory: str, memory: str) -> dict[str, str]:
+        return {"generated_memory": memory, "ideal_memory": ideal_memory}
 
-    def evaluate_pairwise(
+    def _pairwise_params(
         self, ideal_memory: str, first_memory: str, second_memory: str
-    ) -> PairwiseResult:
-        params = {
+    ) -> dict[str, str]:
+        return {
             "first_memory": first_memory,
             "second_memory": second_memory,
             "ideal_memory": ideal_memory,
         }
+
+    def evaluate_single(self, ideal_memory: str, memory: str) -> SingleResult:
+        params = self._single_params(ideal_memory, memory)
+        return self._safe_invoke(self.single_eval_chain, params)
+
+    def evaluate_pairwise(
+        self, ideal_memory: str, first_memory: str, second_memory: str
+    ) -> PairwiseResult:
+        params = self._pairwise_params(ideal_memory, first_memory, second_memory)
         return self._safe_invoke(self.pairwise_eval_chain, params)
 
 
@@ -202,21 +317,29 @@ class LLMChatAgentEvaluation(
     def _get_pairwise_result_model(self) -> type[PairwiseChatAgentResult]:
         return PairwiseChatAgentResult
 
-    def evaluate_single(
-        self, dialogue_context: str, assistant_answer: str
-    ) -> SingleChatAgentResult:
-        params = {
+    def _single_params(self, dialogue_context: str, assistant_answer: str) -> dict[str, str]:
+        return {
             "dialogue_context": dialogue_context,
             "assistant_answer": assistant_answer,
         }
-        return self._safe_invoke(self.single_eval_chain, params)
 
-    def evaluate_pairwise(
+    def _pairwise_params(
         self, dialogue_context: str, first_answer: str, second_answer: str
-    ) -> PairwiseChatAgentResult:
-        params = {
+    ) -> dict[str, str]:
+        return {
             "dialogue_context": dialogue_context,
             "first_answer": first_answer,
             "second_answer": second_answer,
         }
+
+    def evaluate_single(
+        self, dialogue_context: str, assistant_answer: str
+    ) -> SingleChatAgentResult:
+        params = self._single_params(dialogue_context, assistant_answer)
+        return self._safe_invoke(self.single_eval_chain, params)
+
+    def evaluate_pairwise(
+        self, dialogue_context: str, first_answer: str, second_answer: str
+    ) -> PairwiseChatAgentResult:
+        params = self._pairwise_params(dialogue_context, first_answer, second_answer)
         return self._safe_invoke(self.pairwise_eval_chain, params)
@@ -0,0 +1,192 @@
+import gzip
+import json
+import re
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional
+
+import numpy as np
+
+from src.benchmarking.memory_logger import LOG_FORMAT
+from src.summarize_algorithms.core.memory_storage import MemoryFragment
+
+
+@dataclass
+class LoggedStorage:
+    fragments: list[MemoryFragment] = field(default_factory=list)
+    max_session_id: int = 0
+    embeddings_model: str = ""
+    vectors: Optional[np.ndarray] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "memory_list": [
+                {
+                    "embed_content": fragment.embed_content,
+                    "content": fragment.content,
+                    "session_id": fragment.session_id,
+                }
+                for fragment in self.fragments
+            ],
+            "max_session_id": self.max_session_id,
+            "memory_count": len(self.fragments),
+            "embeddings_model": self.embeddings_model,
+        }
+
+
+@dataclass
+class LoggedIteration:
+    system: str
+    conversation_id: str
+    iteration: int
+    timestamp: str = ""
+    query: str = ""
+    response: Optional[str] = None
+    sessions: list[dict[str, Any]] = field(default_factory=list)
+    storages: dict[str, LoggedStorage] = field(default_factory=dict)
+    text_memory: Optional[list[list[str]]] = None
+    memory_tree: list[list[list[str]]] = field(default_factory=list)
+
+
+class MemoryLogReader:
+    def __init__(self, log_dir: str | Path, run_id: str) -> None:
+        self.log_dir = Path(log_dir)
+        self.run_id = run_id
+        self._index: Optional[dict[tuple[str, str], list[dict[str, Any]]]] = None
+
+    @property
+    def files(self) -> list[Path]:
+        pattern = re.compile(rf"{re.escape(self.run_id)}(?:\.(\d+))?\.jsonl(?:\.gz)?")
+        parts = []
+        for path in self.log_dir.iterdir():
+            match = pattern.fullmatch(path.name)
+            if match is not None:
+                parts.append((int(match.group(1) or 0), path))
+        return [path for _, path in sorted(parts)]
+
+    @staticmethod
+    def _read_lines(path: Path) -> Iterator[str]:
+        opener = gzip.open if path.suffix == ".gz" else open
+        f: IO[str]
+        with opener(path, "rt", encoding="utf-8") as f:
+            try:
+                yield from f
+            except EOFError:
+                return
+
+    def records(self) -> Iterator[dict[str, Any]]:
+        for path in self.files:
+            for line in self._read_lines(path):
+                if line.endswith("\n"):
+                    yield json.loads(line)
+
+    def _records_by_key(self) -> dict[tuple[str, str], list[dict[str, Any]]]:
+        if self._index is None:
+            index: dict[tuple[str, str], list[dict[str, Any]]] = {}
+            for record in self.records():
+                if record.get("format") != LOG_FORMAT:
+                    continue
+                key = (record["system"], record.get("conversation_id", "default"))
+                index.setdefault(key, []).append(record)
+            self._index = index
+        return self._index
+
+    def conversations(self) -> list[tuple[str, str]]:
+        return sorted(self._records_by_key())
+
+    def iterations(self, system: str, conversation_id: str = "default") -> list[int]:
+        return [record["iteration"] for record in self._records_by_key().get((system, conversation_id), [])]
+
+    def _read_vectors(self, record: dict[str, Any], embeddings: dict[str, int]) -> np.ndarray:
+        payload = record["payload"]
+        return np.fromfile(
+            self.log_dir / payload["file"],
+            dtype=np.float32,
+            count=embeddings["count"] * embeddings["dim"],
+            offset=payload["offset"] + embeddings["offset"],
+        ).reshape(embeddings["count"], embeddings["dim"])
+
+    def _apply_storage(
+        self, storage: Optional[LoggedStorage], delta: dict[str, Any], record: dict[str, Any]
+    ) -> LoggedStorage:
+        offset = delta["offset"]
+        if offset > 0 and (storage is None or len(storage.fragments) < offset):
+            raise ValueError(f"Storage delta at offset {offset} in iteration {record['iteration']} has no base state")
+        previous = storage if storage is not None and offset > 0 else LoggedStorage()
+        vectors = previous.vectors[:offset] if previous.vectors is not None else None
+        if "embeddings" in delta:
+            new_vectors = self._read_vectors(record, delta["embeddings"])
+            if offset == 0:
+                vectors = new_vectors
+            elif vectors is not None:
+                vectors = np.concatenate([vectors, new_vectors])
+        elif delta["fragments"]:
+            vectors = None
+
+        return LoggedStorage(
+            fragments=previous.fragments[:offset] + [
+                MemoryFragment(embed_content=embed_content, content=content, session_id=session_id)
+                for embed_content, content, session_id in delta["fragments"]
+            ],
+            max_session_id=delta["max_session_id"],
+            embeddings_model=delta["embeddings_model"],
+            vectors=vectors,
+        )
+
+    @staticmethod
+    def _apply_text_memory(
+        text_memory: Optional[list[list[str]]], delta: dict[str, Any]
+    ) -> list[list[str]]:
+        result = list(text_memory or [])[: delta["length"]]
+        if any(str(index) not in delta["changed"] for index in range(len(result), delta["length"])):
+            raise ValueError("Text memory delta has no base state")
+        result += [[] for _ in range(delta["length"] - len(result))]
+        for index, memory in delta["changed"].items():
+            result[int(index)] = memory
+        return result
+
+    def _apply(self, state: LoggedIteration, record: dict[str, Any]) -> LoggedIteration:
+        storages = dict(state.storages)
+        text_memory = state.text_memory
+        memory_tree: list[list[list[str]]] = []
+        for name, delta in record["memory"].items():
+            if name == "text_memory":
+                text_memory = self._apply_text_memory(text_memory, delta)
+            elif name == "memory_tree":
+                memory_tree = [
+                    self._apply_text_memory(
+                        state.memory_tree[height] if height < len(state.memory_tree) else None,
+                        level_delta,
+                    )
+                    for height, level_delta in enumerate(delta)
+                ]
+            else:
+                storages[name] = self._apply_storage(storages.get(name), delta, record)
+
+        return LoggedIteration(
+            system=record["system"],
+            conversation_id=record.get("conversation_id", "default"),
+            iteration=record["iteration"],
+            timestamp=record["timestamp"],
+            query=record["query"],
+            response=record.get("response"),
+            sessions=state.sessions[: record["session_offset"]] + record["sessions"],
+            storages=storages,
+            text_memory=text_memory,
+            memory_tree=memory_tree,
+        )
+
+    def replay(self, system: str, conversation_id: str = "default") -> Iterator[LoggedIteration]:
+        state = LoggedIteration(system=system, conversation_id=conversation_id, iteration=0)
+        for record in self._records_by_key().get((system, conversation_id), []):
+            state = self._apply(state, record)
+            yield state
+
+    def reconstruct(
+        self, system: str, iteration: int, conversation_id: str = "default"
+    ) -> LoggedIteration:
+        for state in self.replay(system, conversation_id):
+            if state.iteration == iteration:
+                return state
+        raise KeyError(f"No logged iteration {iteration} for {system}/{conversation_id}")
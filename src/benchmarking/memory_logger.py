@@ -1,19 +1,134 @@
-import json
 import logging
-import os
+import threading
 
 from datetime import datetime
-from pathlib import Path
-from typing import Any
+from typing import Any, Hashable, Optional
 
+import numpy as np
+
+from src.benchmarking.jsonl_writer import RUN_ID, get_writer
+from src.summarize_algorithms.core.memory_storage import MemoryStorage
 from src.summarize_algorithms.core.models import DialogueState, Session
 
+LOG_FORMAT = "delta"
+LOG_VERSION = 1
+STORAGE_FIELDS = ["text_memory_storage", "code_memory_storage", "tool_memory_storage"]
+
+
+class SessionLog:
+    def __init__(self) -> None:
+        self._logged: dict[Hashable, list[str]] = {}
+        self._lock = threading.Lock()
+
+    def new_sessions(self, key: Hashable, sessions: list[Session]) -> tuple[int, list[dict[str, Any]]]:
+        fingerprints = [session.fingerprint() for session in sessions]
+        with self._lock:
+            logged = self._logged.get(key, [])
+            offset = len(logged) if fingerprints[: len(logged)] == logged else 0
+            self._logged[key] = fingerprints
+        return offset, [session.to_dict() for session in sessions[offset:]]
+
+
+class MemoryLog:
+    def __init__(self) -> None:
+        self._storages: dict[tuple[Hashable, str], tuple[str, int]] = {}
+        self._text_memory: dict[Hashable, list[tuple[str, ...]]] = {}
+        self._tree_heights: dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def _storage_offset(self, key: Hashable, name: str, storage: MemoryStorage) -> int:
+        count = storage.get_memory_count()
+        with self._lock:
+            logged = self._storages.get((key, name))
+            self._storages[(key, name)] = (storage.lineage, count)
+        if logged is None or logged[0] != storage.lineage or logged[1] > count:
+            return 0
+        return logged[1]
+
+    def _storage_delta(
+        self, key: Hashable, name: str, storage: MemoryStorage, payload_offset: int
+    ) -> tuple[dict[str, Any], Optional[np.ndarray]]:
+        offset = self._storage_offset(key, name, storage)
+        count = storage.get_memory_count()
+        delta: dict[str, Any] = {
+            "offset": offset,
+            "fragments": [
+                [fragment.embed_content, fragment.content, fragment.session_id]
+                for fragment in storage.memory_list[offset:count]
+            ],
+            "max_session_id": storage.max_session_id,
+            "embeddings_model": getattr(storage.embeddings, "model", str(type(storage.embeddings))),
+        }
+
+        vectors = storage.get_vectors(offset, count)
+        if vectors is None or len(vectors) == 0:
+            return delta, None
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        delta["embeddings"] = {"offset": payload_offset, "count": len(vectors), "dim": vectors.shape[1]}
+        return delta, vectors
+
+    def _text_memory_delta(self, key: Hashable, text_memory: list[list[str]]) -> dict[str, Any]:
+        current = [tuple(memory) for memory in text_memory]
+        with self._lock:
+            logged = self._text_memory.get(key, [])
+            self._text_memory[key] = current
+        return {
+            "length": len(current),
+            "changed": {
+                str(i): list(memory)
+                for i, memory in enumerate(current)
+                if i >= len(logged) or logged[i] != memory
+            },
+        }
+
+    def _memory_tree_delta(self, key: Hashable, memory_tree: list[list[list[str]]]) -> list[dict[str, Any]]:
+        with self._lock:
+            for height in range(len(memory_tree), self._tree_heights.get(key, 0)):
+                self._text_memory.pop((key, height), None)
+            self._tree_heights[key] = len(memory_tree)
+        return [
+            self._text_memory_delta((key, height), level)
+            for height, level in enumerate(memory_tree)
+        ]
+
+    def delta(self, key: Hashable, state: DialogueState) -> tuple[dict[str, Any], Optional[bytes]]:
+        memory: dict[str, Any] = {}
+        vectors: list[np.ndarray] = []
+        payload_offset = 0
+        for name in STORAGE_FIELDS:
+            storage = getattr(state, name, None)
+            if storage is None:
+                continue
+            memory[name], storage_vectors = self._storage_delta(key, name, storage, payload_offset)
+            if storage_vectors is not None:
+                vectors.append(storage_vectors)
+                payload_offset += storage_vectors.nbytes
+
+        text_memory = getattr(state, "text_memory", None)
+        if text_memory is not None:
+            memory["text_memory"] = self._text_memory_delta(key, text_memory)
+
+        memory_tree = getattr(state, "memory_tree", None)
+        if memory_tree is not None:
+            memory["memory_tree"] = self._memory_tree_delta(key, memory_tree)
+
+        payload = b"".join(array.tobytes() for array in vectors) if vectors else None
+        return memory, payload
+
 
 class MemoryLogger:
-    def __init__(self, logs_dir: str = "logs/memory") -> None:
-        os.makedirs(logs_dir, exist_ok=True)
-        self.log_dir = Path(logs_dir)
+    def __init__(
+        self,
+        logs_dir: str = "logs/memory",
+        run_id: Optional[str] = None,
+        max_bytes: int = 64 * 1024 * 1024,
+        compress: bool = False,
+    ) -> None:
+        self.writer = get_writer(logs_dir, run_id or RUN_ID, max_bytes, compress)
+        self.log_dir = self.writer.log_dir
         self.logger = logging.getLogger(__name__)
+        self._sessions = SessionLog()
+        self._memory = MemoryLog()
 
     def log_iteration(
             self,
@@ -21,36 +136,30 @@ class MemoryLogger:
             query: str,
             state: DialogueState,
             iteration: int,
-            sessions: list[Session]
+            sessions: list[Session],
+            conversation_id: str = "default",
     ) -> None:
-        self.logger.info(f"Logging iteration {iteration} to {self.log_dir}")
-
-        record = {
-            "timestamp": datetime.now().isoformat(),
-            "iteration": iteration,
-            "system": system_name,
-            "query": query,
-            "response": getattr(state, "response", None),
-            "memory": MemoryLogger._serialize_memories(state),
-            "sessions": [s.to_dict() for s in sessions],
-        }
-
-        with open(self.log_dir / (system_name + str(iteration) + ".jsonl"), "a", encoding="utf-8") as f:
-            f.write(json.dumps(record, ensure_ascii=False, indent=4))
-            f.write("\n")
+        self.logger.debug(f"Queueing iteration {iteration} for {self.writer.path}")
 
-        self.logger.info(f"Saved successfully iteration {iteration} to {self.log_dir}")
-
-    @staticmethod
-    def _serialize_memories(state: DialogueState) -> dict[str, Any]:
-        result = {}
-        for name in ["text_memory_storage", "code_memory_storage", "tool_memory_storage"]:
-            storage = getattr(state, name, None)
-            if storage is not None:
-                result[name] = storage.__dict__()
-
-        text_memory = getattr(state, "text_memory", None)
-        if text_memory is not None:
-            result["text_memory"] = text_memory
+        key = (system_name, conversation_id)
+        session_offset, new_sessions = self._sessions.new_sessions(key, sessions)
+        memory, payload = self._memory.delta(key, state)
+        self.writer.write(
+            {
+                "format": LOG_FORMAT,
+                "version": LOG_VERSION,
+                "timestamp": datetime.now().isoformat(),
+                "iteration": iteration,
+                "system": system_name,
+                "conversation_id": conversation_id,
+                "query": query,
+                "response": getattr(state, "_response", None),
+                "memory": memory,
+                "session_offset": session_offset,
+                "sessions": new_sessions,
+            },
+            payload,
+        )
 
-        return result
+    def flush(self) -> None:
+        self.writer.flush()
@@ -4,14 +4,20 @@ import json
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import numpy as np
 
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
 from pydantic import BaseModel
 
+from src.benchmarking.checkpoint import BenchmarkCheckpoint, dialogue_fingerprint
 from src.benchmarking.deserialize_mcp_data import MCPDataset
 from src.benchmarking.llm_evaluation import ComparisonResult
+from src.summarize_algorithms.core.llm_cache import LLMResponseCache
+from src.summarize_algorithms.core.models import Session
+from src.summarize_algorithms.core.usage import UsageLedger, dialogue_scope
 from src.summarize_algorithms.recsum.dialogue_system import RecsumDialogueSystem
 
 
@@ -100,15 +106,42 @@ class MCPMemoryResults(MCPResult):
 
 
 class CalculateMCPMetrics(abc.ABC):
-    def __init__(self, n_samples: int = 30):
-        self.dataset = MCPDataset(n_samples)
-        self.recsum = RecsumDialogueSystem()
+    def __init__(
+        self,
+        n_samples: int = 30,
+        llm_cache: Optional[LLMResponseCache] = None,
+        embeddings: Optional[Embeddings] = None,
+        checkpoint_path: Optional[str] = None,
+        resume: bool = False,
+        seed: Optional[int] = 0,
+        llm: Optional[BaseChatModel] = None,
+        dataset: Optional[MCPDataset] = None,
+    ):
+        self.llm_cache = llm_cache
+        self.llm = llm
+        self.embeddings = embeddings
+        self.dataset = dataset if dataset is not None else MCPDataset(n_samples, seed=seed)
+        self.usage_ledger = UsageLedger()
+        self.recsum = RecsumDialogueSystem(
+            llm=llm,
+            embed_model=embeddings,
+            llm_cache=llm_cache,
+            system_name="recsum",
+            usage_ledger=self.usage_ledger,
+        )
 
         self._recsum_semantic_data = RawSemanticData()
         self._recsum_llm_data = RawLLMData()
+        self._semantic_inputs: list[Any] = []
         self._pairwise_data = PairwiseResults()
 
         self.n_samples = n_samples
+        self.seed = seed
+        self.checkpoint = (
+            BenchmarkCheckpoint(checkpoint_path, resume)
+            if checkpoint_path is not None
+            else None
+        )
 
         self._is_calculated = False
 
@@ -121,6 +154,46 @@ class CalculateMCPMetrics(abc.ABC):
     def calculate(self) -> None:
         pass
 
+    @abc.abstractmethod
+    def _process_dialogue(self, dialogue: list, dialogue_index: int) -> None:
+        pass
+
+    @property
+    def _checkpoint_fields(self) -> list[str]:
+        return [
+            "_semantic_inputs",
+            "_recsum_llm_data",
+            "_pairwise_data",
+            "recsum.prompt_tokens",
+            "recsum.completion_tokens",
+            "recsum.embedding_tokens",
+            "recsum.total_cost",
+        ]
+
+    def _latency_metadata(self) -> dict[str, Any]:
+        return {"recsum": self.recsum.latency_summary()}
+
+    def _process_dialogue_with_checkpoint(
+        self, dialogue: list[Session], dialogue_index: int
+    ) -> None:
+        if self.checkpoint is None:
+            with dialogue_scope(str(dialogue_index)):
+                self._process_dialogue(dialogue, dialogue_index)
+            return
+
+        unit = dialogue_fingerprint(dialogue)
+        if self.checkpoint.is_completed(unit):
+            print(f"Restoring dialogue {dialogue_index + 1} from checkpoint")
+            self.checkpoint.restore(unit, self)
+            return
+
+        before = self.checkpoint.capture(self, self._checkpoint_fields)
+        with dialogue_scope(str(dialogue_index)):
+            self._process_dialogue(dialogue, dialogue_index)
+        self.checkpoint.record(
+            unit, self, self._checkpoint_fields, before, dialogue_index=dialogue_index
+        )
+
     def _update_pairwise_counts(self, score: BaseModel, recsum_first: bool) -> None:
         metrics = ["faithfulness", "informativeness", "coherency"]
 
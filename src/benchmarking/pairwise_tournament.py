@@ -0,0 +1,150 @@
+import random
+
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from src.benchmarking.llm_evaluation import ComparisonResult
+
+
+@dataclass
+class Match:
+    first: str
+    second: str
+    outcomes: list[ComparisonResult]
+
+
+def bradley_terry(wins: np.ndarray, prior: float = 1.0, iterations: int = 200) -> np.ndarray:
+    games = wins + wins.T
+    strengths = np.ones(len(wins))
+    for _ in range(iterations):
+        pair_strengths = strengths[:, np.newaxis] + strengths[np.newaxis, :]
+        denominator = (games / pair_strengths).sum(axis=1) + 2 * prior / (strengths + 1)
+        updated = (wins.sum(axis=1) + prior) / denominator
+        if np.allclose(updated, strengths, rtol=1e-6):
+            strengths = updated
+            break
+        strengths = updated
+    return np.log(strengths)
+
+
+def kendall_tau(first: Sequence[str], second: Sequence[str]) -> float:
+    if len(first) < 2:
+        return 1.0
+    position = {name: i for i, name in enumerate(second)}
+    ranks = [position[name] for name in first]
+    concordant = sum(
+        1 if ranks[i] < ranks[j] else -1
+        for i in range(len(ranks))
+        for j in range(i + 1, len(ranks))
+    )
+    return concordant / (len(ranks) * (len(ranks) - 1) / 2)
+
+
+class PairwiseTournament:
+    def __init__(
+        self,
+        names: Sequence[str],
+        judge: Callable[[list[tuple[str, str]]], list[list[ComparisonResult]]],
+        patience: int = 2,
+        stability: float = 0.9,
+        min_games: int = 2,
+        max_games_per_pair: int = 1,
+        max_comparisons: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        if len(set(names)) != len(names):
+            raise ValueError("Tournament participants must have unique names.")
+
+        self.names = list(names)
+        self.judge = judge
+        self.patience = patience
+        self.stability = stability
+        self.min_games = min_games
+        self.max_games_per_pair = max_games_per_pair
+        self.max_comparisons = max_comparisons
+        self.random = random.Random(seed)
+
+        self.matches: list[Match] = []
+        self._wins = np.zeros((len(names), len(names)))
+        self._games = np.zeros((len(names), len(names)), dtype=int)
+
+    def strengths(self) -> dict[str, float]:
+        return dict(zip(self.names, bradley_terry(self._wins).tolist()))
+
+    def ranking(self) -> list[str]:
+        strengths = bradley_terry(self._wins)
+        order = sorted(range(len(self.names)), key=lambda i: (-strengths[i], i))
+        return [self.names[i] for i in order]
+
+    def _next_round(self) -> list[tuple[int, int]]:
+        strengths = bradley_terry(self._wins)
+        games_played = self._games.sum(axis=1)
+
+        candidates = [
+            (i, j)
+            for i in range(len(self.names))
+            for j in range(i + 1, len(self.names))
+            if self._games[i, j] < self.max_games_per_pair
+        ]
+        self.random.shuffle(candidates)
+
+        def informativeness(pair: tuple[int, int]) -> tuple[float, int]:
+            i, j = pair
+            probability = 1 / (1 + np.exp(strengths[j] - strengths[i]))
+            return -probability * (1 - probability), games_played[i] + games_played[j]
+
+        candidates.sort(key=informativeness)
+
+        budget = len(self.names) // 2
+        if self.max_comparisons is not None:
+            budget = min(budget, self.max_comparisons - len(self.matches))
+
+        paired: set[int] = set()
+        pairs: list[tuple[int, int]] = []
+        for i, j in candidates:
+            if len(pairs) >= budget:
+                break
+            if i in paired or j in paired:
+                continue
+            paired.update((i, j))
+            pairs.append((i, j) if self.random.random() < 0.5 else (j, i))
+        return pairs
+
+    def _record(self, first: int, second: int, outcomes: list[ComparisonResult]) -> None:
+        self.matches.append(Match(self.names[first], self.names[second], outcomes))
+        self._games[first, second] += 1
+        self._games[second, first] += 1
+        for outcome in outcomes:
+            if outcome == ComparisonResult.OPTION_1_BETTER:
+                self._wins[first, second] += 1
+            elif outcome == ComparisonResult.OPTION_2_BETTER:
+                self._wins[second, first] += 1
+            elif outcome == ComparisonResult.DRAW:
+                self._wins[first, second] += 0.5
+                self._wins[second, first] += 0.5
+
+    def _is_stable(self, stable_rounds: int) -> bool:
+        return stable_rounds >= self.patience and bool(
+            (self._games.sum(axis=1) >= self.min_games).all()
+        )
+
+    def run(self) -> list[Match]:
+        ranking = self.ranking()
+        stable_rounds = 0
+        while not self._is_stable(stable_rounds):
+            pairs = self._next_round()
+            if not pairs:
+                break
+
+            outcomes = self.judge([(self.names[i], self.names[j]) for i, j in pairs])
+            for (first, second), pair_outcomes in zip(pairs, outcomes):
+                self._record(first, second, pair_outcomes)
+
+            new_ranking = self.ranking()
+            is_stable_round = kendall_tau(ranking, new_ranking) >= self.stability
+            stable_rounds = stable_rounds + 1 if is_stable_round else 0
+            ranking = new_ranking
+
+        return self.matches
@@ -1,11 +1,36 @@
+import functools
+
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Optional, Sequence
 
 import numpy as np
 import tiktoken
 
+from langchain_core.embeddings import Embeddings
 from langchain_openai import OpenAIEmbeddings
-from sklearn.metrics.pairwise import cosine_similarity
+
+from src.summarize_algorithms.core.tokenization import get_encoding
+from src.summarize_algorithms.core.usage import (
+    EMBEDDINGS_NODE,
+    UsageCallbackHandler,
+    UsageLedger,
+    current_dialogue,
+    record_embedding_usage,
+    track_usage,
+)
+
+
+@functools.lru_cache(maxsize=None)
+def get_token_strings(name: str) -> np.ndarray:
+    encoding = get_encoding(name)
+    token_strings = np.full(encoding.n_vocab, "", dtype=object)
+    for token_id in range(encoding.n_vocab):
+        try:
+            token_bytes = encoding.decode_single_token_bytes(token_id)
+        except KeyError:
+            continue
+        token_strings[token_id] = token_bytes.decode("utf-8", errors="replace")
+    return token_strings
 
 
 @dataclass
@@ -21,65 +46,120 @@ class SemanticSimilarity:
         model: str = "text-embedding-3-small",
         batch_size: int = 100,
         use_tokenizer: bool = True,
+        embeddings: Optional[Embeddings] = None,
+        encoding_name: str = "cl100k_base",
+        usage_ledger: Optional[UsageLedger] = None,
+        system_name: str = "semantic_similarity",
     ) -> None:
-        self.embeddings = OpenAIEmbeddings(model=model, chunk_size=batch_size)
+        self.usage_ledger = usage_ledger
+        self.system_name = system_name
+        self.embeddings = embeddings or OpenAIEmbeddings(
+            model=model, chunk_size=batch_size
+        )
         self.batch_size = batch_size
-        self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        self.encoding_name = encoding_name
         self.use_tokenizer = use_tokenizer
 
-    def _tokenize(self, text: str) -> np.ndarray:
-        if not text or not text.strip():
-            return np.array([])
+    @property
+    def tokenizer(self) -> tiktoken.Encoding:
+        return get_encoding(self.encoding_name)
 
-        token_ids = np.array(self.tokenizer.encode(text))
+    def _decode_tokens(self, token_ids: Sequence[int]) -> np.ndarray:
         if len(token_ids) == 0:
             return np.array([])
 
-        decode_func = np.vectorize(
-            lambda token_id: self.tokenizer.decode([token_id]),
-        )
-        tokens = decode_func(token_ids)
-
-        non_empty_mask = np.vectorize(lambda x: bool(x))(tokens)
-        return tokens[non_empty_mask]
-
-    def _get_embeddings_batch(self, tokens: np.ndarray) -> np.ndarray:
-        unique_tokens, inverse_indices = np.unique(tokens, return_inverse=True)
+        tokens = get_token_strings(self.encoding_name)[np.asarray(token_ids)]
+        return tokens[tokens != ""].astype(str)
 
-        embeddings_list = self.embeddings.embed_documents(unique_tokens.tolist())
-        embeddings_array = np.array(embeddings_list)
+    def _tokenize(self, text: str) -> np.ndarray:
+        if not text or not text.strip():
+            return np.array([])
 
-        return embeddings_array[inverse_indices]
+        return self._decode_tokens(self.tokenizer.encode(text))
 
-    def compute_similarity(
-        self, candidate: Any, reference: Any
-    ) -> SemanticSimilarityResult:
-        if not candidate or not reference:
-            return SemanticSimilarityResult(0.0, 0.0, 0.0)
-        if self.use_tokenizer:
-            cand_tokens = self._tokenize(candidate)
-            ref_tokens = self._tokenize(reference)
-        else:
-            cand_tokens = np.array([candidate])
-            ref_tokens = np.array([reference])
+    def tokenize_many(self, texts: Sequence[str], num_threads: int = 8) -> list[np.ndarray]:
+        non_blank = [i for i, text in enumerate(texts) if text and text.strip()]
+        token_ids = self.tokenizer.encode_batch(
+            [texts[i] for i in non_blank], num_threads=num_threads
+        )
 
-        if len(cand_tokens) == 0 or len(ref_tokens) == 0:
-            return SemanticSimilarityResult(0.0, 0.0, 0.0)
+        tokens = [np.array([]) for _ in texts]
+        for i, ids in zip(non_blank, token_ids):
+            tokens[i] = self._decode_tokens(ids)
+        return tokens
+
+    def _get_units(self, texts: Sequence[Any]) -> list[np.ndarray]:
+        if not self.use_tokenizer:
+            return [np.asarray(text, dtype=str).ravel() for text in texts]
+        return self.tokenize_many(texts)
+
+    def _embed_unique(self, units: list[np.ndarray]) -> tuple[dict[str, int], np.ndarray]:
+        vocabulary: dict[str, int] = {}
+        for unit in units:
+            for token in unit.tolist():
+                vocabulary.setdefault(token, len(vocabulary))
+        if not vocabulary:
+            return vocabulary, np.empty((0, 0), dtype=np.float32)
+
+        embeddings = np.asarray(self._embed_documents(list(vocabulary)), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.where(norms == 0, 1, norms)
+        return vocabulary, embeddings
+
+    def _embed_documents(self, texts: list[str]) -> list[list[float]]:
+        usage = UsageCallbackHandler(EMBEDDINGS_NODE)
+        with track_usage(usage):
+            record_embedding_usage(self.embeddings, texts)
+            embeddings = self.embeddings.embed_documents(texts)
+        if self.usage_ledger is not None:
+            self.usage_ledger.record_call(self.system_name, current_dialogue("default"), usage)
+        return embeddings
+
+    @staticmethod
+    def _greedy_match(
+        candidate: np.ndarray, reference: np.ndarray, block_size: int
+    ) -> tuple[float, float]:
+        row_max = np.full(len(candidate), -np.inf, dtype=np.float32)
+        col_max = np.full(len(reference), -np.inf, dtype=np.float32)
+        for i in range(0, len(candidate), block_size):
+            for j in range(0, len(reference), block_size):
+                sim = candidate[i : i + block_size] @ reference[j : j + block_size].T
+                np.maximum(row_max[i : i + block_size], sim.max(axis=1), out=row_max[i : i + block_size])
+                np.maximum(col_max[j : j + block_size], sim.max(axis=0), out=col_max[j : j + block_size])
+        return float(row_max.mean()), float(col_max.mean())
+
+    def compute_similarity_many(
+        self, pairs: Sequence[tuple[Any, Any]], block_size: int = 1024
+    ) -> list[SemanticSimilarityResult]:
+        valid = [i for i, (candidate, reference) in enumerate(pairs) if candidate and reference]
+        units = self._get_units(
+            [pairs[i][0] for i in valid] + [pairs[i][1] for i in valid]
+        )
+        vocabulary, embeddings = self._embed_unique(units)
 
-        cand_embeddings = self._get_embeddings_batch(cand_tokens)
-        ref_embeddings = self._get_embeddings_batch(ref_tokens)
+        results = [SemanticSimilarityResult(0.0, 0.0, 0.0) for _ in pairs]
+        for position, i in enumerate(valid):
+            cand_tokens = units[position]
+            ref_tokens = units[len(valid) + position]
+            if len(cand_tokens) == 0 or len(ref_tokens) == 0:
+                continue
 
-        sim_matrix = cosine_similarity(cand_embeddings, ref_embeddings)
+            cand_rows = [vocabulary[token] for token in cand_tokens.tolist()]
+            ref_rows = [vocabulary[token] for token in ref_tokens.tolist()]
+            precision, recall = self._greedy_match(
+                embeddings[cand_rows], embeddings[ref_rows], block_size
+            )
 
-        precisions = np.max(sim_matrix, axis=1)
-        recalls = np.max(sim_matrix, axis=0)
+            denominator = precision + recall
+            f1 = 2 * precision * recall / denominator if denominator != 0 else 0.0
 
-        precision = np.mean(precisions)
-        recall = np.mean(recalls)
+            results[i] = SemanticSimilarityResult(
+                precision=precision, recall=recall, f1=float(f1)
+            )
 
-        denominator = precision + recall
-        f1 = 2 * precision * recall / denominator if denominator != 0 else 0.0
+        return results
 
-        return SemanticSimilarityResult(
-            precision=float(precision), recall=float(recall), f1=float(f1)
-        )
+    def compute_similarity(
+        self, candidate: Any, reference: Any
+    ) -> SemanticSimilarityResult:
+        return self.compute_similarity_many([(candidate, reference)])[0]
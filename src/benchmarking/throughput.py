@@ -0,0 +1,281 @@
+import argparse
+import copy
+import json
+import random
+import tempfile
+import time
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+from src.benchmarking.agent_chat.calculate_agent_chat_response_metrics import (
+    CalculateAgentChatResponseMetrics,
+)
+from src.benchmarking.agent_chat.deserialize_agent_chat import ChatDataset
+from src.benchmarking.baseline import DialogueBaseline
+from src.benchmarking.baseline_logger import BaselineLogger
+from src.benchmarking.calculate_mcp_memory_metrics import CalculateMCPMemoryMetrics
+from src.benchmarking.calculate_mcp_response_metrics import CalculateMCPResponseMetrics
+from src.benchmarking.deserialize_mcp_data import MCPDataset, SessionMemory
+from src.benchmarking.fake_models import FakeChatModel, HashingEmbeddings, fake_text
+from src.benchmarking.memory_logger import MemoryLogger
+from src.summarize_algorithms.core.base_dialogue_system import BaseDialogueSystem
+from src.summarize_algorithms.core.models import BaseBlock, Session
+from src.summarize_algorithms.memory_bank.dialogue_system import (
+    MemoryBankDialogueSystem,
+)
+from src.summarize_algorithms.recsum.dialogue_system import RecsumDialogueSystem
+
+
+@dataclass
+class ThroughputResult:
+    name: str
+    sessions: int
+    seconds: float
+    llm_calls: int
+    llm_seconds: float
+    embedding_calls: int
+    embedding_seconds: float
+
+    @property
+    def sessions_per_second(self) -> float:
+        return self.sessions / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def overhead_seconds(self) -> float:
+        return max(self.seconds - self.llm_seconds - self.embedding_seconds, 0.0)
+
+    @property
+    def overhead_ms_per_session(self) -> float:
+        return 1000 * self.overhead_seconds / self.sessions if self.sessions else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            **asdict(self),
+            "sessions_per_second": self.sessions_per_second,
+            "overhead_seconds": self.overhead_seconds,
+            "overhead_ms_per_session": self.overhead_ms_per_session,
+        }
+
+
+def make_dialogues(
+    n_dialogues: int,
+    n_sessions: int = 4,
+    n_messages: int = 6,
+    words_per_message: int = 20,
+    seed: int = 0,
+) -> list[list[Session]]:
+    rng = random.Random(seed)
+    roles = ["USER", "ASSISTANT"]
+    return [
+        [
+            Session(
+                [
+                    BaseBlock(roles[i % 2], fake_text(rng, words_per_message))
+                    for i in range(n_messages)
+                ]
+            )
+            for _ in range(n_sessions)
+        ]
+        for _ in range(n_dialogues)
+    ]
+
+
+def make_memory(
+    dialogues: Sequence[Sequence[Session]], words_per_fact: int = 8, seed: int = 0
+) -> list[list[SessionMemory]]:
+    rng = random.Random(seed)
+    return [
+        [
+            SessionMemory(
+                memory1=[fake_text(rng, words_per_fact) for _ in range(2)],
+                memory2=[fake_text(rng, words_per_fact) for _ in range(2)],
+            )
+            for _ in dialogue
+        ]
+        for dialogue in dialogues
+    ]
+
+
+BENCHMARKS = [
+    "recsum",
+    "recsum_tree",
+    "memory_bank",
+    "baseline",
+    "mcp_response",
+    "mcp_memory",
+    "agent_chat",
+]
+
+
+class ThroughputSuite:
+    def __init__(
+        self,
+        n_dialogues: int = 20,
+        n_sessions: int = 4,
+        n_messages: int = 6,
+        words_per_message: int = 20,
+        latency: float = 0.0,
+        completion_tokens: int = 32,
+        seed: int = 0,
+        work_dir: Optional[str] = None,
+    ) -> None:
+        self.work_dir = Path(work_dir or tempfile.mkdtemp(prefix="recapkt-throughput-"))
+        self.llm = FakeChatModel(latency=latency, completion_tokens=completion_tokens, seed=seed)
+        self.embeddings = HashingEmbeddings()
+        self.dialogues = make_dialogues(
+            n_dialogues, n_sessions, n_messages, words_per_message, seed
+        )
+        self.memory = make_memory(self.dialogues, seed=seed)
+        self.benchmarks: dict[str, Callable[[], int]] = {
+            name: getattr(self, f"bench_{name}") for name in BENCHMARKS
+        }
+
+    def _copy_dialogues(self) -> list[list[Session]]:
+        return copy.deepcopy(self.dialogues)
+
+    def _redirect_logs(self, owner: Any) -> None:
+        for component in [owner, *vars(owner).values()]:
+            if isinstance(component, BaseDialogueSystem):
+                component.memory_logger = MemoryLogger(str(self.work_dir / "logs" / "memory"))
+            elif isinstance(component, DialogueBaseline):
+                component.baseline_logger = BaselineLogger(str(self.work_dir / "logs" / "baseline"))
+
+    def _run_system(self, system: BaseDialogueSystem) -> int:
+        self._redirect_logs(system)
+        sessions = 0
+        for i, dialogue in enumerate(self._copy_dialogues()):
+            system.process_dialogue(dialogue, dialogue[-1].messages[-1].content, str(i))
+            sessions += len(dialogue)
+        return sessions
+
+    def bench_recsum(self) -> int:
+        return self._run_system(RecsumDialogueSystem(llm=self.llm, embed_model=self.embeddings))
+
+    def bench_recsum_tree(self) -> int:
+        return self._run_system(
+            RecsumDialogueSystem(llm=self.llm, embed_model=self.embeddings, tree_update=True)
+        )
+
+    def bench_memory_bank(self) -> int:
+        return self._run_system(
+            MemoryBankDialogueSystem(llm=self.llm, embed_model=self.embeddings)
+        )
+
+    def bench_baseline(self) -> int:
+        baseline = DialogueBaseline("ThroughputBaseline", llm=self.llm)
+        self._redirect_logs(baseline)
+        sessions = 0
+        for dialogue in self._copy_dialogues():
+            baseline.process_dialogue(dialogue, dialogue[-1].messages[-1].content)
+            sessions += len(dialogue)
+        return sessions
+
+    def _mcp_dataset(self) -> MCPDataset:
+        return MCPDataset.from_dialogues(self._copy_dialogues(), copy.deepcopy(self.memory))
+
+    def bench_mcp_response(self) -> int:
+        calculator = CalculateMCPResponseMetrics(
+            n_samples=len(self.dialogues),
+            llm=self.llm,
+            embeddings=self.embeddings,
+            dataset=self._mcp_dataset(),
+        )
+        calculator.semantic_scorer.use_tokenizer = False
+        self._redirect_logs(calculator)
+        calculator.calculate()
+        return sum(len(dialogue) for dialogue in self.dialogues)
+
+    def bench_mcp_memory(self) -> int:
+        calculator = CalculateMCPMemoryMetrics(
+            n_samples=len(self.dialogues),
+            llm=self.llm,
+            embeddings=self.embeddings,
+            dataset=self._mcp_dataset(),
+        )
+        self._redirect_logs(calculator)
+        calculator.calculate()
+        return calculator.session_count
+
+    def bench_agent_chat(self) -> int:
+        sessions = [session for dialogue in self._copy_dialogues() for session in dialogue]
+        calculator = CalculateAgentChatResponseMetrics(
+            llm=self.llm, embeddings=self.embeddings, dataset=ChatDataset(sessions)
+        )
+        self._redirect_logs(calculator)
+        calculator.calculate()
+        return len(sessions)
+
+    def measure(self, name: str) -> ThroughputResult:
+        self.llm.stats.reset()
+        self.embeddings.stats.reset()
+
+        started = time.perf_counter()
+        sessions = self.benchmarks[name]()
+        seconds = time.perf_counter() - started
+
+        return ThroughputResult(
+            name=name,
+            sessions=sessions,
+            seconds=seconds,
+            llm_calls=self.llm.stats.calls,
+            llm_seconds=self.llm.stats.seconds,
+            embedding_calls=self.embeddings.stats.calls,
+            embedding_seconds=self.embeddings.stats.seconds,
+        )
+
+    def run(self, names: Optional[Sequence[str]] = None) -> list[ThroughputResult]:
+        return [self.measure(name) for name in names or list(self.benchmarks)]
+
+
+def print_results(results: Sequence[ThroughputResult]) -> None:
+    print(
+        f"{'Benchmark':<14} | {'Sessions':>8} | {'Sessions/s':>10} | {'LLM calls':>9} | "
+        f"{'LLM s':>7} | {'Embed s':>7} | {'Overhead ms/session':>19}"
+    )
+    print("-" * 92)
+    for result in results:
+        print(
+            f"{result.name:<14} | {result.sessions:>8} | {result.sessions_per_second:>10.2f} | "
+            f"{result.llm_calls:>9} | {result.llm_seconds:>7.3f} | {result.embedding_seconds:>7.3f} | "
+            f"{result.overhead_ms_per_session:>19.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure pipeline throughput with offline models.")
+    parser.add_argument("--dialogues", type=int, default=20)
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=6)
+    parser.add_argument("--words", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--completion-tokens", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument("--work-dir")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    suite = ThroughputSuite(
+        n_dialogues=args.dialogues,
+        n_sessions=args.sessions,
+        n_messages=args.messages,
+        words_per_message=args.words,
+        latency=args.latency,
+        completion_tokens=args.completion_tokens,
+        seed=args.seed,
+        work_dir=args.work_dir,
+    )
+    results = suite.run(args.benchmarks)
+    print_results(results)
+
+    if args.output is not None:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([result.to_dict() for result in results], f, indent=2)
+        print(f"\nResults have been saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,20 @@
+import asyncio
+import contextlib
+import copy
+import dataclasses
 import functools
 import os
+import threading
 
 from abc import ABC, abstractmethod
-from typing import Any, Optional, Type
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence, Type
 
 from dotenv import load_dotenv
-from langchain_community.callbacks import get_openai_callback
 from langchain_core.embeddings import Embeddings
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langchain_openai import ChatOpenAI
 from langgraph.constants import END
 from langgraph.graph import StateGraph
@@ -18,10 +24,14 @@ from pydantic import SecretStr
 from src.benchmarking.memory_logger import MemoryLogger
 from src.summarize_algorithms.core.graph_nodes import (
     UpdateState,
+    agenerate_response_node,
+    aupdate_memory_node,
     generate_response_node,
     should_continue_memory_update,
     update_memory_node,
 )
+from src.summarize_algorithms.core.instrumentation import Instrumentation
+from src.summarize_algorithms.core.llm_cache import LLMResponseCache
 from src.summarize_algorithms.core.models import (
     DialogueState,
     OpenAIModels,
@@ -29,7 +39,24 @@ from src.summarize_algorithms.core.models import (
     WorkflowNode,
 )
 from src.summarize_algorithms.core.prompts import RESPONSE_GENERATION_PROMPT
+from src.summarize_algorithms.core.recency import RecencyPolicy
 from src.summarize_algorithms.core.response_generator import ResponseGenerator
+from src.summarize_algorithms.core.usage import (
+    RESPONSE_NODE,
+    SUMMARIZER_NODE,
+    UsageCallbackHandler,
+    UsageLedger,
+    current_dialogue,
+    track_usage,
+)
+from src.summarize_algorithms.core.vector_index import IndexConfig
+
+CONVERSATION_LOCK_STRIPES = 64
+CONVERSATION_LOCK_POLL_SECONDS = 0.005
+USAGE_NODES = {
+    WorkflowNode.UPDATE_MEMORY.value: SUMMARIZER_NODE,
+    WorkflowNode.GENERATE_RESPONSE.value: RESPONSE_NODE,
+}
 
 
 class BaseDialogueSystem(ABC):
@@ -40,21 +67,34 @@ class BaseDialogueSystem(ABC):
         embed_tool: bool = False,
         embed_model: Optional[Embeddings] = None,
         max_session_id: int = 3,
+        llm_cache: Optional[LLMResponseCache] = None,
+        index_config: Optional[IndexConfig] = None,
+        recency_policy: Optional[RecencyPolicy] = None,
+        system_name: Optional[str] = None,
+        usage_ledger: Optional[UsageLedger] = None,
+        max_conversations: int = 128,
     ) -> None:
         load_dotenv()
 
-        api_key: str | None = os.getenv("OPENAI_API_KEY")
-        if api_key is not None:
-            self.llm = llm or ChatOpenAI(
+        if max_conversations < 1:
+            raise ValueError("max_conversations must be at least 1.")
+
+        if llm is None:
+            api_key: str | None = os.getenv("OPENAI_API_KEY")
+            if api_key is None:
+                raise ValueError("OPENAI_API_KEY environment variable is not loaded")
+            llm = ChatOpenAI(
                 model=OpenAIModels.GPT_5_MINI.value,
                 api_key=SecretStr(api_key)
             )
-        else:
-            raise ValueError("OPENAI_API_KEY environment variable is not loaded")
+        self.llm = llm
 
+        self.instrumentation = Instrumentation()
+        self._instrumentation_handler = self.instrumentation.callback_handler()
+        self.llm_cache = llm_cache
         self.summarizer = self._build_summarizer()
         self.response_generator = ResponseGenerator(
-            self.llm, self._get_response_prompt_template()
+            self.llm, self._get_response_prompt_template(), llm_cache
         )
         self.graph = self._build_graph()
         self.state: Optional[DialogueState] = None
@@ -62,13 +102,24 @@ class BaseDialogueSystem(ABC):
         self.embed_tool = embed_tool
         self.embed_model = embed_model
         self.max_session_id = max_session_id
+        self.index_config = index_config
+        self.recency_policy = recency_policy
+        self.system_name = system_name or self.__class__.__name__
+        self.usage_ledger = usage_ledger
         self.prompt_tokens = 0
         self.completion_tokens = 0
+        self.embedding_tokens = 0
         self.total_cost = 0.0
+        self._usage_lock = threading.Lock()
 
         self.memory_logger = MemoryLogger()
         self.iteration = 0
 
+        self.max_conversations = max_conversations
+        self._conversations: OrderedDict[str, tuple[DialogueState, list[str]]] = OrderedDict()
+        self._conversations_lock = threading.Lock()
+        self._conversation_locks = [threading.Lock() for _ in range(CONVERSATION_LOCK_STRIPES)]
+
     @abstractmethod
     def _build_summarizer(self) -> Any:
         pass
@@ -86,19 +137,45 @@ class BaseDialogueSystem(ABC):
     def _get_dialogue_state_class(self) -> Type[DialogueState]:
         pass
 
+    def _build_update_memory_node(self) -> RunnableLambda:
+        return RunnableLambda(
+            self.instrumentation.wrap(
+                WorkflowNode.UPDATE_MEMORY.value,
+                functools.partial(update_memory_node, self.summarizer),
+            ),
+            afunc=self.instrumentation.awrap(
+                WorkflowNode.UPDATE_MEMORY.value,
+                functools.partial(aupdate_memory_node, self.summarizer),
+            ),
+        )
+
     def _build_graph(self) -> CompiledStateGraph:
         workflow = StateGraph(self._get_dialogue_state_class)
 
         workflow.add_node(
-            WorkflowNode.UPDATE_MEMORY.value,
-            functools.partial(update_memory_node, self.summarizer),
+            WorkflowNode.UPDATE_MEMORY.value, self._build_update_memory_node()
         )
         workflow.add_node(
             WorkflowNode.GENERATE_RESPONSE.value,
-            functools.partial(generate_response_node, self.response_generator),
+            RunnableLambda(
+                self.instrumentation.wrap(
+                    WorkflowNode.GENERATE_RESPONSE.value,
+                    functools.partial(generate_response_node, self.response_generator),
+                ),
+                afunc=self.instrumentation.awrap(
+                    WorkflowNode.GENERATE_RESPONSE.value,
+                    functools.partial(agenerate_response_node, self.response_generator),
+                ),
+            ),
         )
 
-        workflow.set_entry_point(WorkflowNode.UPDATE_MEMORY.value)
+        workflow.set_conditional_entry_point(
+            should_continue_memory_update,
+            {
+                UpdateState.CONTINUE_UPDATE.value: WorkflowNode.UPDATE_MEMORY.value,
+                UpdateState.FINISH_UPDATE.value: WorkflowNode.GENERATE_RESPONSE.value,
+            },
+        )
 
         workflow.add_conditional_edges(
             WorkflowNode.UPDATE_MEMORY.value,
@@ -113,19 +190,169 @@ class BaseDialogueSystem(ABC):
 
         return workflow.compile()
 
-    def process_dialogue(self, sessions: list[Session], query: str) -> DialogueState:
-        initial_state = self._get_initial_state(sessions, query)
-        with get_openai_callback() as cb:
-            self.state = self._get_dialogue_state_class(
-                **self.graph.invoke(initial_state)
+    def _run_config(self, usage: UsageCallbackHandler) -> RunnableConfig:
+        return {"callbacks": [self._instrumentation_handler, usage]}
+
+    def _usage_handler(self) -> UsageCallbackHandler:
+        return UsageCallbackHandler(RESPONSE_NODE, USAGE_NODES)
+
+    def _record_usage(self, usage: UsageCallbackHandler, conversation_id: str) -> None:
+        total = usage.total()
+        with self._usage_lock:
+            self.prompt_tokens += total.prompt_tokens
+            self.completion_tokens += total.completion_tokens
+            self.embedding_tokens += total.embedding_tokens
+            self.total_cost += total.cost
+
+        if self.usage_ledger is not None:
+            self.usage_ledger.record_call(
+                self.system_name, current_dialogue(conversation_id), usage
             )
 
-            self.prompt_tokens += cb.prompt_tokens
-            self.completion_tokens += cb.completion_tokens
-            self.total_cost += cb.total_cost
+    def _next_iteration(self) -> int:
+        with self._usage_lock:
+            self.iteration += 1
+            return self.iteration
+
+    def _prepare_state(
+        self, sessions: list[Session], query: str, conversation_id: str
+    ) -> DialogueState:
+        with self._conversations_lock:
+            remembered = self._conversations.get(conversation_id)
+            if remembered is not None:
+                self._conversations.move_to_end(conversation_id)
+
+        fingerprints = [session.fingerprint() for session in sessions]
+        if remembered is None or fingerprints[: len(remembered[1])] != remembered[1]:
+            return self._get_initial_state(sessions, query)
+
+        state = dataclasses.replace(
+            remembered[0], dialogue_sessions=sessions, query=query, _response=None
+        )
+        return copy.deepcopy(state, {id(sessions): sessions})
+
+    def _conversation_lock(self, conversation_id: str) -> threading.Lock:
+        return self._conversation_locks[hash(conversation_id) % len(self._conversation_locks)]
 
-        self.iteration += 1
-        system_name = self.__class__.__name__
-        self.memory_logger.log_iteration(system_name, query, self.state, self.iteration, sessions)
+    @contextlib.contextmanager
+    def _conversation(self, conversation_id: str) -> Iterator[None]:
+        with self._conversation_lock(conversation_id):
+            yield
 
-        return self.state if self.state is not None else initial_state
+    @contextlib.asynccontextmanager
+    async def _aconversation(self, conversation_id: str) -> AsyncIterator[None]:
+        lock = self._conversation_lock(conversation_id)
+        while not lock.acquire(blocking=False):
+            await asyncio.sleep(CONVERSATION_LOCK_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            lock.release()
+
+    def _remember_state(
+        self, state: DialogueState, sessions: list[Session], conversation_id: str
+    ) -> None:
+        fingerprints = [session.fingerprint() for session in sessions]
+        with self._conversations_lock:
+            self._conversations[conversation_id] = (state, fingerprints)
+            self._conversations.move_to_end(conversation_id)
+            while len(self._conversations) > self.max_conversations:
+                self._conversations.popitem(last=False)
+
+    def reset(self, conversation_id: Optional[str] = None) -> None:
+        with self._conversations_lock:
+            if conversation_id is None:
+                self._conversations.clear()
+            else:
+                self._conversations.pop(conversation_id, None)
+
+    def latency_summary(self) -> dict[str, dict[str, float]]:
+        summary = self.instrumentation.summary()
+        process = summary.get("process_dialogue")
+        if process is not None:
+            node_ms = sum(
+                summary[node.value]["total_ms"]
+                for node in WorkflowNode
+                if node.value in summary
+            )
+            overhead_ms = max(process["total_ms"] - node_ms, 0.0)
+            summary["graph_overhead"] = {
+                "calls": process["calls"],
+                "total_ms": overhead_ms,
+                "mean_ms": overhead_ms / process["calls"],
+            }
+        return summary
+
+    def process_dialogue(
+        self, sessions: list[Session], query: str, conversation_id: str = "default"
+    ) -> DialogueState:
+        usage = self._usage_handler()
+        with self._conversation(conversation_id):
+            initial_state = self._prepare_state(sessions, query, conversation_id)
+            with track_usage(usage), self.instrumentation.timed("process_dialogue"):
+                state = self._get_dialogue_state_class(
+                    **self.graph.invoke(initial_state, config=self._run_config(usage))
+                )
+                self._remember_state(state, sessions, conversation_id)
+        self._record_usage(usage, conversation_id)
+
+        self.state = state
+        iteration = self._next_iteration()
+        with self.instrumentation.timed("log_iteration"):
+            self.memory_logger.log_iteration(
+                self.system_name, query, state, iteration, sessions, conversation_id
+            )
+
+        return state
+
+    async def aprocess_dialogue(
+        self, sessions: list[Session], query: str, conversation_id: str = "default"
+    ) -> DialogueState:
+        usage = self._usage_handler()
+        async with self._aconversation(conversation_id):
+            initial_state = self._prepare_state(sessions, query, conversation_id)
+            with track_usage(usage), self.instrumentation.timed("process_dialogue"):
+                state = self._get_dialogue_state_class(
+                    **await self.graph.ainvoke(initial_state, config=self._run_config(usage))
+                )
+                self._remember_state(state, sessions, conversation_id)
+        self._record_usage(usage, conversation_id)
+
+        self.state = state
+        iteration = self._next_iteration()
+        with self.instrumentation.timed("log_iteration"):
+            self.memory_logger.log_iteration(
+                self.system_name, query, state, iteration, sessions, conversation_id
+            )
+
+        return state
+
+    async def aprocess_many(
+        self,
+        dialogues: Sequence[tuple[list[Session], str]],
+        concurrency: int = 8,
+        conversation_ids: Optional[Sequence[str]] = None,
+    ) -> list[DialogueState]:
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1.")
+        if conversation_ids is None:
+            conversation_ids = [str(i) for i in range(len(dialogues))]
+        if len(set(conversation_ids)) != len(dialogues):
+            raise ValueError("Each dialogue must have its own conversation id.")
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def process(
+            sessions: list[Session], query: str, conversation_id: str
+        ) -> DialogueState:
+            async with semaphore:
+                return await self.aprocess_dialogue(sessions, query, conversation_id)
+
+        return await asyncio.gather(
+            *(
+                process(sessions, query, conversation_id)
+                for (sessions, query), conversation_id in zip(
+                    dialogues, conversation_ids
+                )
+            )
+        )
@@ -1,21 +1,41 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Optional
 
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import PromptTemplate
 from langchain_core.runnables import Runnable
+from pydantic import BaseModel
+
+from src.summarize_algorithms.core.llm_cache import LLMResponseCache
 
 
 class BaseSummarizer(ABC):
-    def __init__(self, llm: BaseChatModel, prompt: PromptTemplate) -> None:
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        prompt: PromptTemplate,
+        llm_cache: Optional[LLMResponseCache] = None,
+    ) -> None:
         self.llm = llm
         self.prompt = prompt
-        self.chain = self._build_chain()
+        self.llm_cache = llm_cache
+        self.chain: Runnable[dict[str, Any], Any] = self._build_chain()
+        if llm_cache is not None:
+            self.chain = llm_cache.wrap(
+                self.chain, llm, prompt, self._get_output_schema()
+            )
 
     @abstractmethod
     def _build_chain(self) -> Runnable[dict[str, Any], Any]:
         pass
 
+    def _get_output_schema(self) -> Optional[type[BaseModel]]:
+        return None
+
     @abstractmethod
     def summarize(self, *args: Any, **kwargs: Any) -> Any:
         pass
+
+    @abstractmethod
+    async def asummarize(self, *args: Any, **kwargs: Any) -> Any:
+        pass
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import re
+import threading
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from langchain_core.embeddings import Embeddings
+
+from src.summarize_algorithms.core.usage import record_embedding_usage
+
+DIGEST_SIZE = 32
+
+
+class VectorStore:
+    def __init__(self, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+
+        self.keys_path = directory / "keys.bin"
+        self.vectors_path = directory / "vectors.f32"
+        self.meta_path = directory / "meta.json"
+
+        self.dimension: Optional[int] = None
+        if self.meta_path.exists():
+            self.dimension = json.loads(self.meta_path.read_text())["dimension"]
+
+        self._rows: dict[bytes, int] = {}
+        self._mapped: Optional[np.memmap] = None
+        self._load_keys()
+
+    def _load_keys(self) -> None:
+        if self.dimension is None:
+            return
+
+        keys = self.keys_path.read_bytes() if self.keys_path.exists() else b""
+        vector_bytes = self.vectors_path.stat().st_size if self.vectors_path.exists() else 0
+        row_count = min(len(keys) // DIGEST_SIZE, vector_bytes // (4 * self.dimension))
+        self._truncate(row_count)
+        for row in range(row_count):
+            self._rows[keys[row * DIGEST_SIZE : (row + 1) * DIGEST_SIZE]] = row
+
+    def _truncate(self, row_count: int) -> None:
+        if self.dimension is None:
+            return
+
+        for path, size in (
+            (self.keys_path, row_count * DIGEST_SIZE),
+            (self.vectors_path, row_count * 4 * self.dimension),
+        ):
+            if path.exists() and path.stat().st_size != size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _vectors(self) -> np.memmap:
+        if self.dimension is None:
+            raise ValueError("Vector store is empty.")
+
+        mapped = self._mapped
+        if mapped is None or mapped.shape[0] < len(self._rows):
+            mapped = np.memmap(
+                self.vectors_path,
+                dtype=np.float32,
+                mode="r",
+                shape=(len(self._rows), self.dimension),
+            )
+            self._mapped = mapped
+        return mapped
+
+    def get(self, digest: bytes) -> Optional[np.ndarray]:
+        row = self._rows.get(digest)
+        if row is None:
+            return None
+        return np.array(self._vectors()[row])
+
+    def put_many(self, digests: list[bytes], vectors: np.ndarray) -> None:
+        if self.dimension is None:
+            self.dimension = int(vectors.shape[1])
+            self.meta_path.write_text(json.dumps({"dimension": self.dimension}))
+        elif vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"Expected embeddings of dimension {self.dimension}, got {vectors.shape[1]}."
+            )
+
+        new_rows: dict[bytes, np.ndarray] = {}
+        for digest, vector in zip(digests, vectors):
+            if digest not in self._rows:
+                new_rows.setdefault(digest, vector)
+        if not new_rows:
+            return
+
+        row_count = len(self._rows)
+        try:
+            with open(self.vectors_path, "ab") as f:
+                f.write(np.stack(list(new_rows.values())).astype(np.float32).tobytes())
+            with open(self.keys_path, "ab") as f:
+                f.write(b"".join(new_rows))
+        except BaseException:
+            self._truncate(row_count)
+            raise
+
+        for row, digest in enumerate(new_rows, start=row_count):
+            self._rows[digest] = row
+
+
+class CachedEmbeddings(Embeddings):
+    tracks_usage = True
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        cache_dir: str = ".cache/embeddings",
+        memory_cache_size: int = 50_000,
+        model: Optional[str] = None,
+    ) -> None:
+        self.embeddings = embeddings
+        self.model = model or str(getattr(embeddings, "model", type(embeddings).__name__))
+        self.memory_cache_size = memory_cache_size
+        self.hits = 0
+        self.misses = 0
+
+        model_dir = re.sub(r"[^A-Za-z0-9_.-]", "_", self.model)
+        self._store = VectorStore(Path(cache_dir) / model_dir)
+        self._memory: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(text: str, kind: str = "document") -> bytes:
+        prefix = "" if kind == "document" else f"{kind}\0"
+        return hashlib.sha256((prefix + text).encode("utf-8")).digest()
+
+    def _lookup(self, digest: bytes) -> Optional[np.ndarray]:
+        vector = self._memory.get(digest)
+        if vector is not None:
+            self._memory.move_to_end(digest)
+            return vector
+
+        vector = self._store.get(digest)
+        if vector is not None:
+            self._remember(digest, vector)
+        return vector
+
+    def _remember(self, digest: bytes, vector: np.ndarray) -> None:
+        self._memory[digest] = vector
+        self._memory.move_to_end(digest)
+        while len(self._memory) > self.memory_cache_size:
+            self._memory.popitem(last=False)
+
+    def _split(
+        self, texts: list[str], kind: str
+    ) -> tuple[list[bytes], dict[bytes, np.ndarray], dict[bytes, str]]:
+        digests = [self._digest(text, kind) for text in texts]
+        found: dict[bytes, np.ndarray] = {}
+        missing: dict[bytes, str] = {}
+        with self._lock:
+            for digest, text in zip(digests, texts):
+                if digest in found or digest in missing:
+                    continue
+                vector = self._lookup(digest)
+                if vector is None:
+                    missing[digest] = text
+                else:
+                    found[digest] = vector
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        return digests, found, missing
+
+    def _store_missing(
+        self,
+        found: dict[bytes, np.ndarray],
+        missing: dict[bytes, str],
+        embeddings_list: list[list[float]],
+    ) -> None:
+        vectors = np.array(embeddings_list, dtype=np.float32)
+        with self._lock:
+            self._store.put_many(list(missing), vectors)
+            for digest, vector in zip(missing, vectors):
+                self._remember(digest, vector)
+                found[digest] = vector
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        digests, found, missing = self._split(texts, "document")
+        if missing:
+            record_embedding_usage(self.embeddings, list(missing.values()))
+            embeddings_list = self.embeddings.embed_documents(list(missing.values()))
+            self._store_missing(found, missing, embeddings_list)
+        return [found[digest].tolist() for digest in digests]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        digests, found, missing = self._split(texts, "document")
+        if missing:
+            record_embedding_usage(self.embeddings, list(missing.values()))
+            embeddings_list = await self.embeddings.aembed_documents(
+                list(missing.values())
+            )
+            self._store_missing(found, missing, embeddings_list)
+        return [found[digest].tolist() for digest in digests]
+
+    def embed_query(self, text: str) -> list[float]:
+        digests, found, missing = self._split([text], "query")
+        if missing:
+            record_embedding_usage(self.embeddings, [text])
+            self._store_missing(found, missing, [self.embeddings.embed_query(text)])
+        return found[digests[0]].tolist()
+
+    async def aembed_query(self, text: str) -> list[float]:
+        digests, found, missing = self._split([text], "query")
+        if missing:
+            record_embedding_usage(self.embeddings, [text])
+            self._store_missing(
+                found, missing, [await self.embeddings.aembed_query(text)]
+            )
+        return found[digests[0]].tolist()
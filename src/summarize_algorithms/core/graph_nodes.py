@@ -1,11 +1,26 @@
+import asyncio
+
+from typing import TYPE_CHECKING, Hashable, Optional
+
 from src.summarize_algorithms.core.base_summarizer import BaseSummarizer
+from src.summarize_algorithms.core.memory_storage import MemoryStorage
 from src.summarize_algorithms.core.models import (
+    BaseBlock,
     DialogueState,
+    MemoryBankDialogueState,
     RecsumDialogueState,
+    Session,
     UpdateState,
 )
 from src.summarize_algorithms.core.response_generator import ResponseGenerator
 
+if TYPE_CHECKING:
+    from src.summarize_algorithms.memory_bank.summarizer import SessionSummarizer
+    from src.summarize_algorithms.recsum.summarizer import (
+        MemoryMerger,
+        RecursiveSummarizer,
+    )
+
 
 def update_memory_node(
     summarizer_instance: BaseSummarizer, state: DialogueState
@@ -50,40 +65,379 @@ def update_memory_node(
     return state
 
 
-def generate_response_node(
-    response_generator_instance: ResponseGenerator, state: DialogueState
+async def aupdate_memory_node(
+    summarizer_instance: BaseSummarizer, state: DialogueState
 ) -> DialogueState:
     from src.summarize_algorithms.memory_bank.dialogue_system import (
         MemoryBankDialogueState,
     )
 
+    current_dialogue_session = state.dialogue_sessions[state.current_session_index]
+
+    if state.code_memory_storage is not None:
+        code_blocks = current_dialogue_session.get_code_blocks()
+        if len(code_blocks) > 0:
+            await state.code_memory_storage.aadd_memory(
+                code_blocks, state.current_session_index
+            )
+    if state.tool_memory_storage is not None:
+        tool_calls = current_dialogue_session.get_tool_calls()
+        if len(tool_calls) > 0:
+            await state.tool_memory_storage.aadd_memory(
+                tool_calls, state.current_session_index
+            )
+
+    text_blocks = current_dialogue_session.get_text_blocks()
+    string_text_blocks = "\n".join([str(block) for block in text_blocks])
+
     if isinstance(state, RecsumDialogueState):
-        dialogue_memory = state.latest_memory
+        new_memory = await summarizer_instance.asummarize(
+            state.latest_memory, string_text_blocks
+        )
+        state.text_memory.append([memory.content for memory in new_memory])
     elif isinstance(state, MemoryBankDialogueState):
-        dialogue_memory = "\n".join(state.text_memory_storage.find_similar(state.query))
+        new_memory = await summarizer_instance.asummarize(
+            string_text_blocks, state.current_session_index
+        )
+        await state.text_memory_storage.aadd_memory(
+            new_memory, state.current_session_index
+        )
     else:
         raise TypeError(
             f"Unsupported status type for update_memory_node: {type(state)}"
         )
+    state.current_session_index += 1
+    return state
+
+
+def _pending_sessions(state: DialogueState) -> list[tuple[Session, int]]:
+    return [
+        (state.dialogue_sessions[session_id], session_id)
+        for session_id in range(
+            state.current_session_index, len(state.dialogue_sessions)
+        )
+    ]
+
+
+def _session_text(session: Session) -> str:
+    return "\n".join([str(block) for block in session.get_text_blocks()])
+
+
+def update_memory_parallel_node(
+    summarizer_instance: "SessionSummarizer",
+    max_concurrency: int,
+    state: DialogueState,
+) -> DialogueState:
+    if not isinstance(state, MemoryBankDialogueState):
+        raise TypeError(
+            f"Unsupported status type for update_memory_parallel_node: {type(state)}"
+        )
+
+    pending_sessions = _pending_sessions(state)
 
     if state.code_memory_storage is not None:
-        code_memory = "\n".join(state.code_memory_storage.find_similar(state.query))
+        state.code_memory_storage.add_memories(
+            [(session.get_code_blocks(), session_id) for session, session_id in pending_sessions]
+        )
+    if state.tool_memory_storage is not None:
+        state.tool_memory_storage.add_memories(
+            [(session.get_tool_calls(), session_id) for session, session_id in pending_sessions]
+        )
+
+    new_memories = summarizer_instance.summarize_many(
+        [(_session_text(session), session_id) for session, session_id in pending_sessions],
+        max_concurrency=max_concurrency,
+    )
+    state.text_memory_storage.add_memories(
+        [
+            (new_memory, session_id)
+            for new_memory, (_, session_id) in zip(new_memories, pending_sessions)
+        ]
+    )
+
+    state.current_session_index = len(state.dialogue_sessions)
+    return state
+
+
+async def aupdate_memory_parallel_node(
+    summarizer_instance: "SessionSummarizer",
+    max_concurrency: int,
+    state: DialogueState,
+) -> DialogueState:
+    if not isinstance(state, MemoryBankDialogueState):
+        raise TypeError(
+            f"Unsupported status type for update_memory_parallel_node: {type(state)}"
+        )
+
+    pending_sessions = _pending_sessions(state)
+
+    async def update_code_memory() -> None:
+        if state.code_memory_storage is not None:
+            await state.code_memory_storage.aadd_memories(
+                [(session.get_code_blocks(), session_id) for session, session_id in pending_sessions]
+            )
+
+    async def update_tool_memory() -> None:
+        if state.tool_memory_storage is not None:
+            await state.tool_memory_storage.aadd_memories(
+                [(session.get_tool_calls(), session_id) for session, session_id in pending_sessions]
+            )
+
+    new_memories, _, _ = await asyncio.gather(
+        summarizer_instance.asummarize_many(
+            [(_session_text(session), session_id) for session, session_id in pending_sessions],
+            max_concurrency=max_concurrency,
+        ),
+        update_code_memory(),
+        update_tool_memory(),
+    )
+    await state.text_memory_storage.aadd_memories(
+        [
+            (new_memory, session_id)
+            for new_memory, (_, session_id) in zip(new_memories, pending_sessions)
+        ]
+    )
+
+    state.current_session_index = len(state.dialogue_sessions)
+    return state
+
+
+def _memory_text(memory: list[str]) -> str:
+    return "\n".join(memory)
+
+
+def _merge_plan(
+    children: list[list[str]], dirty: int
+) -> tuple[int, list[tuple[str, str]], Optional[list[str]]]:
+    start = dirty // 2
+    pairs = [
+        (_memory_text(children[2 * i]), _memory_text(children[2 * i + 1]))
+        for i in range(start, len(children) // 2)
+    ]
+    promoted = children[-1] if len(children) % 2 else None
+    return start, pairs, promoted
+
+
+def _apply_merge(
+    state: RecsumDialogueState,
+    height: int,
+    start: int,
+    merged: list[list[BaseBlock]],
+    promoted: Optional[list[str]],
+) -> list[list[str]]:
+    level = state.memory_tree[height][:start] if height < len(state.memory_tree) else []
+    level += [[memory.content for memory in blocks] for blocks in merged]
+    if promoted is not None:
+        level.append(promoted)
+
+    if height < len(state.memory_tree):
+        state.memory_tree[height] = level
     else:
-        code_memory = "Code Memory is missing"
+        state.memory_tree.append(level)
+    return level
+
+
+def _add_leaves(state: RecsumDialogueState, leaves: list[list[BaseBlock]]) -> int:
+    dirty = len(state.text_memory)
+    state.text_memory.extend([[memory.content for memory in leaf] for leaf in leaves])
+    return dirty
+
+
+def update_memory_tree_node(
+    summarizer_instance: "RecursiveSummarizer",
+    merger_instance: "MemoryMerger",
+    max_concurrency: int,
+    state: DialogueState,
+) -> DialogueState:
+    if not isinstance(state, RecsumDialogueState):
+        raise TypeError(
+            f"Unsupported status type for update_memory_tree_node: {type(state)}"
+        )
+
+    pending_sessions = _pending_sessions(state)
 
+    if state.code_memory_storage is not None:
+        state.code_memory_storage.add_memories(
+            [(session.get_code_blocks(), session_id) for session, session_id in pending_sessions]
+        )
     if state.tool_memory_storage is not None:
-        tool_memory = "\n".join(state.tool_memory_storage.find_similar(state.query))
+        state.tool_memory_storage.add_memories(
+            [(session.get_tool_calls(), session_id) for session, session_id in pending_sessions]
+        )
+
+    leaves = summarizer_instance.summarize_many(
+        [("", _session_text(session)) for session, _ in pending_sessions],
+        max_concurrency=max_concurrency,
+    )
+    dirty = _add_leaves(state, leaves)
+
+    children, height = state.text_memory, 0
+    while len(children) > 1:
+        start, pairs, promoted = _merge_plan(children, dirty)
+        merged = merger_instance.summarize_many(pairs, max_concurrency) if pairs else []
+        children = _apply_merge(state, height, start, merged, promoted)
+        dirty, height = start, height + 1
+    del state.memory_tree[height:]
+
+    state.current_session_index = len(state.dialogue_sessions)
+    return state
+
+
+async def aupdate_memory_tree_node(
+    summarizer_instance: "RecursiveSummarizer",
+    merger_instance: "MemoryMerger",
+    max_concurrency: int,
+    state: DialogueState,
+) -> DialogueState:
+    if not isinstance(state, RecsumDialogueState):
+        raise TypeError(
+            f"Unsupported status type for update_memory_tree_node: {type(state)}"
+        )
+
+    pending_sessions = _pending_sessions(state)
+
+    async def update_code_memory() -> None:
+        if state.code_memory_storage is not None:
+            await state.code_memory_storage.aadd_memories(
+                [(session.get_code_blocks(), session_id) for session, session_id in pending_sessions]
+            )
+
+    async def update_tool_memory() -> None:
+        if state.tool_memory_storage is not None:
+            await state.tool_memory_storage.aadd_memories(
+                [(session.get_tool_calls(), session_id) for session, session_id in pending_sessions]
+            )
+
+    leaves, _, _ = await asyncio.gather(
+        summarizer_instance.asummarize_many(
+            [("", _session_text(session)) for session, _ in pending_sessions],
+            max_concurrency=max_concurrency,
+        ),
+        update_code_memory(),
+        update_tool_memory(),
+    )
+    dirty = _add_leaves(state, leaves)
+
+    children, height = state.text_memory, 0
+    while len(children) > 1:
+        start, pairs, promoted = _merge_plan(children, dirty)
+        merged = await merger_instance.asummarize_many(pairs, max_concurrency) if pairs else []
+        children = _apply_merge(state, height, start, merged, promoted)
+        dirty, height = start, height + 1
+    del state.memory_tree[height:]
+
+    state.current_session_index = len(state.dialogue_sessions)
+    return state
+
+
+def _text_memory_storage(state: DialogueState) -> Optional[MemoryStorage]:
+    if isinstance(state, RecsumDialogueState):
+        return None
+    elif isinstance(state, MemoryBankDialogueState):
+        return state.text_memory_storage
+    else:
+        raise TypeError(
+            f"Unsupported status type for generate_response_node: {type(state)}"
+        )
+
+
+def _find_similar_memories(
+    storages: list[Optional[MemoryStorage]], query: str
+) -> list[list[str]]:
+    query_embeddings: dict[Hashable, list[float]] = {}
+    results: list[list[str]] = []
+    for storage in storages:
+        if storage is None or storage.get_memory_count() == 0:
+            results.append([])
+            continue
+
+        signature = storage.embeddings_signature
+        if signature not in query_embeddings:
+            query_embeddings[signature] = storage.embed_query(query)
+        results.append(storage.find_similar_by_vector(query_embeddings[signature]))
+    return results
+
+
+async def _afind_similar_memories(
+    storages: list[Optional[MemoryStorage]], query: str
+) -> list[list[str]]:
+    embedding_storages: dict[Hashable, MemoryStorage] = {}
+    for storage in storages:
+        if storage is not None and storage.get_memory_count() > 0:
+            embedding_storages.setdefault(storage.embeddings_signature, storage)
+
+    embeddings_list = await asyncio.gather(
+        *(storage.aembed_query(query) for storage in embedding_storages.values())
+    )
+    query_embeddings = dict(zip(embedding_storages, embeddings_list))
+
+    return [
+        storage.find_similar_by_vector(query_embeddings[storage.embeddings_signature])
+        if storage is not None and storage.get_memory_count() > 0
+        else []
+        for storage in storages
+    ]
+
+
+def _generate_inputs(
+    state: DialogueState, memories: list[list[str]]
+) -> dict[str, str]:
+    text_memory, code_memory, tool_memory = memories
+
+    if isinstance(state, RecsumDialogueState):
+        dialogue_memory = state.latest_memory
     else:
-        tool_memory = "Tool Memory is missing"
+        dialogue_memory = "\n".join(text_memory)
+
+    return {
+        "dialogue_memory": dialogue_memory,
+        "code_memory": (
+            "\n".join(code_memory)
+            if state.code_memory_storage is not None
+            else "Code Memory is missing"
+        ),
+        "tool_memory": (
+            "\n".join(tool_memory)
+            if state.tool_memory_storage is not None
+            else "Tool Memory is missing"
+        ),
+        "query": state.query,
+    }
+
 
-    final_response = response_generator_instance.generate_response(
-        dialogue_memory=dialogue_memory,
-        code_memory=code_memory,
-        tool_memory=tool_memory,
-        query=state.query,
+def generate_response_node(
+    response_generator_instance: ResponseGenerator, state: DialogueState
+) -> DialogueState:
+    memories = _find_similar_memories(
+        [
+            _text_memory_storage(state),
+            state.code_memory_storage,
+            state.tool_memory_storage,
+        ],
+        state.query,
     )
 
-    state._response = final_response
+    state._response = response_generator_instance.generate_response(
+        **_generate_inputs(state, memories)
+    )
+    return state
+
+
+async def agenerate_response_node(
+    response_generator_instance: ResponseGenerator, state: DialogueState
+) -> DialogueState:
+    memories = await _afind_similar_memories(
+        [
+            _text_memory_storage(state),
+            state.code_memory_storage,
+            state.tool_memory_storage,
+        ],
+        state.query,
+    )
+
+    state._response = await response_generator_instance.agenerate_response(
+        **_generate_inputs(state, memories)
+    )
     return state
 
 
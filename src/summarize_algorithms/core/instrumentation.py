@@ -0,0 +1,176 @@
+import contextlib
+import functools
+import inspect
+import threading
+import time
+
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar, cast
+from uuid import UUID
+
+import numpy as np
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+T = TypeVar("T")
+F = TypeVar("F", bound=Callable[..., Any])
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class StageStats:
+    durations: list[float] = field(default_factory=list)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def calls(self) -> int:
+        return len(self.durations)
+
+    def percentile(self, q: float) -> float:
+        if not self.durations:
+            return 0.0
+        return float(np.percentile(self.durations, q))
+
+    def summary(self) -> dict[str, float]:
+        total = float(sum(self.durations))
+        return {
+            "calls": self.calls,
+            "total_ms": 1000 * total,
+            "mean_ms": 1000 * total / self.calls if self.calls else 0.0,
+            **{f"p{q}_ms": 1000 * self.percentile(q) for q in PERCENTILES},
+            "max_ms": 1000 * max(self.durations, default=0.0),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+
+class Instrumentation:
+    def __init__(self) -> None:
+        self.stages: dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self, stage: str, seconds: float, prompt_tokens: int = 0, completion_tokens: int = 0
+    ) -> None:
+        with self._lock:
+            stats = self.stages.setdefault(stage, StageStats())
+            stats.durations.append(seconds)
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+
+    @contextlib.contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def wrap(self, stage: str, func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            with self.timed(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def awrap(
+        self, stage: str, func: Callable[..., Awaitable[T]]
+    ) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            with self.timed(stage):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    def callback_handler(self) -> "InstrumentationCallbackHandler":
+        return InstrumentationCallbackHandler(self)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {stage: stats.summary() for stage, stats in sorted(self.stages.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages.clear()
+
+
+def instrumented(stage: str) -> Callable[[F], F]:
+    def decorator(method: F) -> F:
+        if inspect.iscoroutinefunction(method):
+
+            @functools.wraps(method)
+            async def async_wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+                instrumentation: Optional[Instrumentation] = self.instrumentation
+                if instrumentation is None:
+                    return await method(self, *args, **kwargs)
+                with instrumentation.timed(stage):
+                    return await method(self, *args, **kwargs)
+
+            return cast(F, async_wrapper)
+
+        @functools.wraps(method)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            instrumentation: Optional[Instrumentation] = self.instrumentation
+            if instrumentation is None:
+                return method(self, *args, **kwargs)
+            with instrumentation.timed(stage):
+                return method(self, *args, **kwargs)
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+def token_usage(response: LLMResult) -> tuple[int, int]:
+    prompt_tokens = completion_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            if not isinstance(generation, ChatGeneration):
+                continue
+            message = generation.message
+            if isinstance(message, AIMessage) and message.usage_metadata:
+                usage = message.usage_metadata
+                prompt_tokens += usage["input_tokens"]
+                completion_tokens += usage["output_tokens"]
+    if prompt_tokens or completion_tokens:
+        return prompt_tokens, completion_tokens
+
+    llm_usage: dict[str, int] = (response.llm_output or {}).get("token_usage", {})
+    return llm_usage.get("prompt_tokens", 0), llm_usage.get("completion_tokens", 0)
+
+
+class InstrumentationCallbackHandler(BaseCallbackHandler):
+    run_inline = True
+
+    def __init__(self, instrumentation: Instrumentation, stage: str = "llm") -> None:
+        self.instrumentation = instrumentation
+        self.stage = stage
+        self._started: dict[UUID, float] = {}
+
+    def on_llm_start(
+        self, serialized: dict[str, Any], prompts: list[str], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_chat_model_start(
+        self, serialized: dict[str, Any], messages: list[list[Any]], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        prompt_tokens, completion_tokens = token_usage(response)
+        self.instrumentation.record(
+            self.stage, time.perf_counter() - started, prompt_tokens, completion_tokens
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started.pop(run_id, None)
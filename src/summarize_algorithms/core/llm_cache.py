@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from pathlib import Path
+from typing import Any, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.prompts import BasePromptTemplate
+from langchain_core.runnables import Runnable, RunnableConfig
+from pydantic import BaseModel
+
+
+class LLMResponseCache:
+    def __init__(
+        self,
+        path: str = ".cache/llm_responses.sqlite",
+        max_size_bytes: int = 512 * 1024 * 1024,
+        enabled: bool = True,
+    ) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = path
+        self.max_size_bytes = max_size_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_access INTEGER NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)"
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def make_key(
+        llm: BaseChatModel,
+        rendered_prompt: str,
+        output_schema: Optional[type[BaseModel]],
+    ) -> str:
+        model_name = getattr(llm, "model_name", None) or getattr(llm, "model", None)
+        schema = (
+            output_schema.model_json_schema() if output_schema is not None else "str"
+        )
+        payload = json.dumps(
+            {
+                "model": str(model_name or type(llm).__name__),
+                "temperature": getattr(llm, "temperature", None),
+                "prompt": rendered_prompt,
+                "schema": schema,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._connection.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (time.time_ns(), key)
+            )
+            self._connection.commit()
+            self.hits += 1
+            return row[0]
+
+    def update(self, key: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time_ns()),
+            )
+            self._evict()
+            self._connection.commit()
+
+    async def alookup(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self.lookup, key)
+
+    async def aupdate(self, key: str, value: str) -> None:
+        await asyncio.to_thread(self.update, key, value)
+
+    def _evict(self) -> None:
+        total_size = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total_size <= self.max_size_bytes:
+            return
+
+        rows = self._connection.execute(
+            "SELECT key, size FROM responses ORDER BY last_access"
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if total_size <= self.max_size_bytes:
+                break
+            evicted.append((key,))
+            total_size -= size
+        self._connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "size_bytes": size,
+            "enabled": self.enabled,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def wrap(
+        self,
+        chain: Runnable,
+        llm: BaseChatModel,
+        prompt: BasePromptTemplate,
+        output_schema: Optional[type[BaseModel]] = None,
+    ) -> "CachedChain":
+        return CachedChain(chain, self, llm, prompt, output_schema)
+
+
+class CachedChain(Runnable[dict[str, Any], Any]):
+    def __init__(
+        self,
+        chain: Runnable,
+        cache: LLMResponseCache,
+        llm: BaseChatModel,
+        prompt: BasePromptTemplate,
+        result_schema: Optional[type[BaseModel]] = None,
+    ) -> None:
+        self.chain = chain
+        self.cache = cache
+        self.llm = llm
+        self.prompt = prompt
+        self.result_schema = result_schema
+
+    def _key(self, params: dict[str, Any]) -> str:
+        rendered_prompt = self.prompt.invoke(params).to_string()
+        return self.cache.make_key(self.llm, rendered_prompt, self.result_schema)
+
+    def _serialize(self, output: Any) -> str:
+        if self.result_schema is not None:
+            return output.model_dump_json()
+        return json.dumps(output, ensure_ascii=False)
+
+    def _deserialize(self, value: str) -> Any:
+        if self.result_schema is not None:
+            return self.result_schema.model_validate_json(value)
+        return json.loads(value)
+
+    def invoke(
+        self, input: dict[str, Any], config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> Any:
+        if not self.cache.enabled:
+            return self.chain.invoke(input, config, **kwargs)
+
+        key = self._key(input)
+        cached = self.cache.lookup(key)
+        if cached is not None:
+            return self._deserialize(cached)
+
+        output = self.chain.invoke(input, config, **kwargs)
+        if output is not None:
+            self.cache.update(key, self._serialize(output))
+        return output
+
+    async def ainvoke(
+        self, input: dict[str, Any], config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> Any:
+        if not self.cache.enabled:
+            return await self.chain.ainvoke(input, config, **kwargs)
+
+        key = self._key(input)
+        cached = await self.cache.alookup(key)
+        if cached is not None:
+            return self._deserialize(cached)
+
+        output = await self.chain.ainvoke(input, config, **kwargs)
+        if output is not None:
+            await self.cache.aupdate(key, self._serialize(output))
+        return output
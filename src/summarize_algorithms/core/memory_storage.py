@@ -1,8 +1,11 @@
-import math
+import copy
+import json
 import os
+import uuid
 
 from dataclasses import dataclass
-from typing import Any, Iterable, Optional
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Hashable, Iterable, Optional, Sequence
 
 import faiss
 import numpy as np
@@ -12,7 +15,22 @@ from langchain_core.embeddings import Embeddings
 from langchain_openai import OpenAIEmbeddings
 from pydantic import SecretStr
 
-from src.summarize_algorithms.core.models import BaseBlock, CodeBlock
+from src.summarize_algorithms.core.instrumentation import Instrumentation, instrumented
+from src.summarize_algorithms.core.recency import ExponentialRecency, RecencyPolicy
+from src.summarize_algorithms.core.usage import record_embedding_usage
+from src.summarize_algorithms.core.vector_index import (
+    IndexConfig,
+    build_index,
+    configure_search,
+    evaluate_index_kinds,
+    id_selector,
+    index_kind,
+    rebuild_index,
+    search_parameters,
+)
+
+if TYPE_CHECKING:
+    from src.summarize_algorithms.core.models import BaseBlock
 
 
 @dataclass
@@ -23,47 +41,169 @@ class MemoryFragment:
 
 
 class MemoryStorage:
+    INDEX_FILE = "index.faiss"
+    FRAGMENTS_FILE = "fragments.json"
+
     def __init__(
         self,
         embeddings: Optional[Embeddings] = None,
         max_session_id: int = 3,
+        index_config: Optional[IndexConfig] = None,
+        recency_policy: Optional[RecencyPolicy] = None,
+        overfetch_factor: int = 4,
+        instrumentation: Optional[Instrumentation] = None,
     ) -> None:
         load_dotenv()
 
+        self.lineage = uuid.uuid4().hex
         self.memory_list: list[MemoryFragment] = []
-        api_key: str | None = os.getenv("OPENAI_API_KEY")
-        if api_key is not None:
-            self.embeddings = embeddings or OpenAIEmbeddings(
+        self._session_rows: dict[int, list[int]] = {}
+        if embeddings is None:
+            api_key: str | None = os.getenv("OPENAI_API_KEY")
+            if api_key is None:
+                raise ValueError("OPENAI_API_KEY environment variable is not loaded")
+            embeddings = OpenAIEmbeddings(
                 model="text-embedding-3-small",
                 chunk_size=100,
                 api_key=SecretStr(api_key)
             )
-        else:
-            raise ValueError("OPENAI_API_KEY environment variable is not loaded")
+        self.embeddings = embeddings
 
         self.max_session_id = max_session_id
+        self.index_config = index_config or IndexConfig()
+        self.recency_policy = recency_policy or ExponentialRecency()
+        self.overfetch_factor = overfetch_factor
+        self.instrumentation = instrumentation
         self.index = None
         self._is_initialized = False
 
     def _initialize_index(self, dimension: int) -> None:
         if self._is_initialized:
             return
-        self.index = faiss.IndexFlatIP(dimension)
+        self.index = build_index(
+            self.index_config.kind_for(0),
+            np.empty((0, dimension), dtype=np.float32),
+            self.index_config,
+        )
         self._is_initialized = True
 
+    def _update_index_kind(self) -> None:
+        if self.index is None:
+            return
+        target_kind = self.index_config.kind_for(self.index.ntotal)
+        if index_kind(self.index) != target_kind:
+            self.index = rebuild_index(self.index, target_kind, self.index_config)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "MemoryStorage":
+        clone = copy.copy(self)
+        memo[id(self)] = clone
+        clone.memory_list = list(self.memory_list)
+        clone._session_rows = {session_id: list(rows) for session_id, rows in self._session_rows.items()}
+        if self.index is not None:
+            clone.index = faiss.clone_index(self.index)
+            configure_search(clone.index, self.index_config)
+        return clone
+
     @staticmethod
     def _normalize_vectors(vectors: np.ndarray) -> np.ndarray:
         norms = np.linalg.norm(vectors, axis=1, keepdims=True)
         norms = np.where(norms == 0, 1, norms)
         return vectors / norms
 
-    def add_memory(self, memories: Iterable[BaseBlock], session_id: int) -> None:
+    @instrumented("embeddings")
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        record_embedding_usage(self.embeddings, texts)
+        return self.embeddings.embed_documents(texts)
+
+    @instrumented("embeddings")
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        record_embedding_usage(self.embeddings, texts)
+        return await self.embeddings.aembed_documents(texts)
+
+    @instrumented("embeddings")
+    def embed_query(self, text: str) -> list[float]:
+        record_embedding_usage(self.embeddings, [text])
+        return self.embeddings.embed_query(text)
+
+    @instrumented("embeddings")
+    async def aembed_query(self, text: str) -> list[float]:
+        record_embedding_usage(self.embeddings, [text])
+        return await self.embeddings.aembed_query(text)
+
+    @instrumented("memory_storage.add_memory")
+    def add_memory(self, memories: Iterable["BaseBlock"], session_id: int) -> None:
         if not memories:
             return
 
         memory_embed_contents = [block.content for block in memories]
+        embeddings_list = self.embed_documents(memory_embed_contents)
+        self._add_embeddings(memories, embeddings_list, session_id)
+
+    @instrumented("memory_storage.add_memory")
+    async def aadd_memory(
+        self, memories: Iterable["BaseBlock"], session_id: int
+    ) -> None:
+        if not memories:
+            return
 
-        embeddings_list = self.embeddings.embed_documents(memory_embed_contents)
+        memory_embed_contents = [block.content for block in memories]
+        embeddings_list = await self.aembed_documents(memory_embed_contents)
+        self._add_embeddings(memories, embeddings_list, session_id)
+
+    @instrumented("memory_storage.add_memory")
+    def add_memories(
+        self, memories_by_session: Sequence[tuple[Sequence["BaseBlock"], int]]
+    ) -> None:
+        memories_by_session = [
+            (memories, session_id)
+            for memories, session_id in memories_by_session
+            if memories
+        ]
+        if not memories_by_session:
+            return
+
+        memory_embed_contents = [
+            block.content for memories, _ in memories_by_session for block in memories
+        ]
+        embeddings_list = self.embed_documents(memory_embed_contents)
+        self._add_session_embeddings(memories_by_session, embeddings_list)
+
+    @instrumented("memory_storage.add_memory")
+    async def aadd_memories(
+        self, memories_by_session: Sequence[tuple[Sequence["BaseBlock"], int]]
+    ) -> None:
+        memories_by_session = [
+            (memories, session_id)
+            for memories, session_id in memories_by_session
+            if memories
+        ]
+        if not memories_by_session:
+            return
+
+        memory_embed_contents = [
+            block.content for memories, _ in memories_by_session for block in memories
+        ]
+        embeddings_list = await self.aembed_documents(memory_embed_contents)
+        self._add_session_embeddings(memories_by_session, embeddings_list)
+
+    def _add_session_embeddings(
+        self,
+        memories_by_session: Sequence[tuple[Sequence["BaseBlock"], int]],
+        embeddings_list: list[list[float]],
+    ) -> None:
+        offset = 0
+        for memories, session_id in memories_by_session:
+            self._add_embeddings(
+                memories, embeddings_list[offset : offset + len(memories)], session_id
+            )
+            offset += len(memories)
+
+    def _add_embeddings(
+        self,
+        memories: Iterable["BaseBlock"],
+        embeddings_list: list[list[float]],
+        session_id: int,
+    ) -> None:
         embeddings_array = np.array(embeddings_list, dtype=np.float32)
 
         self._initialize_index(embeddings_array.shape[1])
@@ -73,11 +213,10 @@ class MemoryStorage:
 
         normalized_embeddings = self._normalize_vectors(embeddings_array)
 
-        importance = math.exp(-0.2 * (1 - (session_id + 1 / self.max_session_id + 1)))
-
-        weighted_embeddings = normalized_embeddings * importance
+        self.index.add(normalized_embeddings)
+        self._update_index_kind()
 
-        self.index.add(weighted_embeddings)
+        from src.summarize_algorithms.core.models import CodeBlock
 
         for memory in memories:
             if isinstance(memory, CodeBlock):
@@ -85,30 +224,121 @@ class MemoryStorage:
             else:
                 content = memory.content
 
-            self.memory_list.append(
+            self._append_fragment(
                 MemoryFragment(
                     embed_content=memory.content, content=content, session_id=session_id
                 )
             )
 
-    def find_similar(self, query: str, top_k: int = 5) -> list[str]:
+    def _append_fragment(self, fragment: MemoryFragment) -> None:
+        self._session_rows.setdefault(fragment.session_id, []).append(len(self.memory_list))
+        self.memory_list.append(fragment)
+
+    def _rows_for_sessions(self, session_ids: Iterable[int]) -> list[int]:
+        return sorted(
+            row
+            for session_id in set(session_ids)
+            for row in self._session_rows.get(session_id, ())
+        )
+
+    @instrumented("memory_storage.find_similar")
+    def find_similar(
+        self,
+        query: str,
+        top_k: int = 5,
+        session_ids: Optional[Iterable[int]] = None,
+    ) -> list[str]:
         if self.index is None or len(self.memory_list) == 0:
             return []
 
-        query_embedding = self.embeddings.embed_query(query)
+        query_embedding = self.embed_query(query)
+        return self.find_similar_by_vector(query_embedding, top_k, session_ids)
+
+    @instrumented("memory_storage.find_similar")
+    async def afind_similar(
+        self,
+        query: str,
+        top_k: int = 5,
+        session_ids: Optional[Iterable[int]] = None,
+    ) -> list[str]:
+        if self.index is None or len(self.memory_list) == 0:
+            return []
+
+        query_embedding = await self.aembed_query(query)
+        return self.find_similar_by_vector(query_embedding, top_k, session_ids)
+
+    @instrumented("memory_storage.search")
+    def find_similar_by_vector(
+        self,
+        query_embedding: Sequence[float],
+        top_k: int = 5,
+        session_ids: Optional[Iterable[int]] = None,
+    ) -> list[str]:
+        if self.index is None or len(self.memory_list) == 0:
+            return []
+
+        params = None
+        candidate_count = len(self.memory_list)
+        if session_ids is not None:
+            candidate_rows = self._rows_for_sessions(session_ids)
+            if not candidate_rows:
+                return []
+            params = search_parameters(self.index, id_selector(candidate_rows))
+            candidate_count = len(candidate_rows)
+
         query_vector = np.array([query_embedding], dtype=np.float32)
 
         normalized_query = self._normalize_vectors(query_vector)
 
-        indices = self.index.search(
-            normalized_query, min(top_k, len(self.memory_list))
-        )[1]
+        fetch_count = min(top_k * self.overfetch_factor, candidate_count)
+        scores, indices = self.index.search(normalized_query, fetch_count, params=params)
+
+        found = indices[0] >= 0
+        rows = indices[0][found]
+        row_session_ids = np.array([self.memory_list[row].session_id for row in rows])
+        weights = self.recency_policy.weights(row_session_ids, max(self._session_rows))
+        order = np.argsort(-(scores[0][found] * weights), kind="stable")[:top_k]
 
-        results = []
-        for idx in indices[0]:
-            results.append(self.memory_list[idx].content)
+        return [self.memory_list[row].content for row in rows[order]]
 
-        return results
+    def evaluate_index_kinds(
+        self,
+        kinds: Sequence[str] = ("flat", "hnsw", "ivf_flat", "ivf_pq"),
+        top_k: int = 5,
+        n_queries: int = 100,
+        seed: int = 0,
+    ) -> dict[str, dict[str, Any]]:
+        if self.index is None or self.index.ntotal == 0:
+            return {}
+
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        rng = np.random.default_rng(seed)
+        query_rows = rng.choice(len(vectors), size=min(n_queries, len(vectors)), replace=False)
+        return evaluate_index_kinds(
+            vectors, vectors[query_rows], kinds, top_k, self.index_config
+        )
+
+    @property
+    def embeddings_signature(self) -> Hashable:
+        model = getattr(self.embeddings, "model", None)
+        if model is None:
+            return id(self.embeddings)
+        return (
+            type(self.embeddings).__name__,
+            model,
+            getattr(self.embeddings, "dimensions", None),
+        )
+
+    def get_vectors(self, start: int = 0, stop: Optional[int] = None) -> Optional[np.ndarray]:
+        if self.index is None:
+            return None
+        stop = self.index.ntotal if stop is None else stop
+        if stop <= start:
+            return np.empty((0, self.index.d), dtype=np.float32)
+        try:
+            return self.index.reconstruct_n(start, stop - start)
+        except RuntimeError:
+            return None
 
     def get_memory_count(self) -> int:
         return len(self.memory_list)
@@ -120,9 +350,7 @@ class MemoryStorage:
             )
 
         return [
-            fragment.content
-            for fragment in self.memory_list
-            if fragment.session_id == session_id
+            self.memory_list[row].content for row in self._session_rows.get(session_id, ())
         ]
 
     def to_dict(self) -> dict[str, Any]:
@@ -141,6 +369,80 @@ class MemoryStorage:
             "index_info": {
                 "ntotal": int(self.index.ntotal),
                 "dimension": int(self.index.d),
+                "kind": index_kind(self.index),
             } if self.index is not None else None,
             "embeddings_model": getattr(self.embeddings, "model", str(type(self.embeddings))),
         }
+
+    def save(self, path: str) -> None:
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        if self.index is not None:
+            tmp_index_path = directory / (self.INDEX_FILE + ".tmp")
+            faiss.write_index(self.index, str(tmp_index_path))
+            os.replace(tmp_index_path, directory / self.INDEX_FILE)
+        else:
+            (directory / self.INDEX_FILE).unlink(missing_ok=True)
+
+        payload = {
+            "version": 2,
+            "max_session_id": self.max_session_id,
+            "embeddings_model": getattr(self.embeddings, "model", str(type(self.embeddings))),
+            "fragments": [
+                [fragment.embed_content, fragment.content, fragment.session_id]
+                for fragment in self.memory_list
+            ],
+        }
+        tmp_fragments_path = directory / (self.FRAGMENTS_FILE + ".tmp")
+        with open(tmp_fragments_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_fragments_path, directory / self.FRAGMENTS_FILE)
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        embeddings: Optional[Embeddings] = None,
+        mmap: bool = True,
+        index_config: Optional[IndexConfig] = None,
+        recency_policy: Optional[RecencyPolicy] = None,
+    ) -> "MemoryStorage":
+        directory = Path(path)
+        with open(directory / cls.FRAGMENTS_FILE, encoding="utf-8") as f:
+            payload = json.load(f)
+
+        storage = cls(
+            embeddings=embeddings,
+            max_session_id=payload["max_session_id"],
+            index_config=index_config,
+            recency_policy=recency_policy,
+        )
+        for embed_content, content, session_id in payload["fragments"]:
+            storage._append_fragment(
+                MemoryFragment(embed_content=embed_content, content=content, session_id=session_id)
+            )
+
+        index_path = directory / cls.INDEX_FILE
+        if index_path.exists():
+            io_flags = faiss.IO_FLAG_MMAP if mmap else 0
+            index = faiss.read_index(str(index_path), io_flags)
+            if mmap and faiss.try_extract_index_ivf(index) is not None:
+                index = faiss.read_index(str(index_path))
+            if payload["version"] < 2:
+                index = build_index(
+                    index_kind(index),
+                    cls._normalize_vectors(index.reconstruct_n(0, index.ntotal)),
+                    storage.index_config,
+                )
+            configure_search(index, storage.index_config)
+            storage.index = index
+            storage._is_initialized = True
+
+        if storage.index is not None and storage.index.ntotal != len(storage.memory_list):
+            raise ValueError(
+                f"Index holds {storage.index.ntotal} vectors "
+                f"but {len(storage.memory_list)} fragments were saved."
+            )
+
+        return storage
@@ -1,3 +1,5 @@
+import hashlib
+
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Iterator, Optional
@@ -87,6 +89,9 @@ class Session:
                 })
         return {"messages": result_messages}
 
+    def fingerprint(self) -> str:
+        return hashlib.sha256(repr(self.messages).encode("utf-8")).hexdigest()
+
     def get_messages_by_role(self, role: str) -> list[BaseBlock]:
         return [msg for msg in self.messages if msg.role == role]
 
@@ -131,9 +136,12 @@ class DialogueState:
 @dataclass
 class RecsumDialogueState(DialogueState):
     text_memory: list[list[str]] = field(default_factory=list)
+    memory_tree: list[list[list[str]]] = field(default_factory=list)
 
     @property
     def latest_memory(self) -> str:
+        if self.memory_tree:
+            return "\n".join(self.memory_tree[-1][0])
         return "\n".join(self.text_memory[-1]) if self.text_memory else ""
 
 
@@ -0,0 +1,25 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class RecencyPolicy(ABC):
+    @abstractmethod
+    def weights(self, session_ids: np.ndarray, latest_session_id: int) -> np.ndarray:
+        pass
+
+
+class NoRecency(RecencyPolicy):
+    def weights(self, session_ids: np.ndarray, latest_session_id: int) -> np.ndarray:
+        return np.ones(len(session_ids), dtype=np.float32)
+
+
+class ExponentialRecency(RecencyPolicy):
+    def __init__(self, rate: float = 0.2) -> None:
+        if rate < 0:
+            raise ValueError("Recency rate must be non-negative.")
+        self.rate = rate
+
+    def weights(self, session_ids: np.ndarray, latest_session_id: int) -> np.ndarray:
+        age = latest_session_id - session_ids.astype(np.float32)
+        return np.exp(-self.rate * age).astype(np.float32)
@@ -1,14 +1,25 @@
+from typing import Optional
+
 from langchain_core.language_models import BaseChatModel
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
 from langchain_core.runnables import Runnable
 
+from src.summarize_algorithms.core.llm_cache import LLMResponseCache
+
 
 class ResponseGenerator:
-    def __init__(self, llm: BaseChatModel, prompt_template: PromptTemplate) -> None:
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        prompt_template: PromptTemplate,
+        llm_cache: Optional[LLMResponseCache] = None,
+    ) -> None:
         self.llm = llm
         self.prompt_template = prompt_template
         self.chain = self._build_chain()
+        if llm_cache is not None:
+            self.chain = llm_cache.wrap(self.chain, llm, prompt_template)
 
     def _build_chain(self) -> Runnable:
         return self.prompt_template | self.llm | StrOutputParser()
@@ -28,3 +39,19 @@ class ResponseGenerator:
             return response
         except Exception as e:
             raise ConnectionError(f"API request failed: {str(e)}") from e
+
+    async def agenerate_response(
+        self, dialogue_memory: str, code_memory: str, tool_memory: str, query: str
+    ) -> str:
+        try:
+            response = await self.chain.ainvoke(
+                {
+                    "dialogue_memory": dialogue_memory,
+                    "code_memory": code_memory,
+                    "tool_memory": tool_memory,
+                    "query": query,
+                }
+            )
+            return response
+        except Exception as e:
+            raise ConnectionError(f"API request failed: {str(e)}") from e
@@ -0,0 +1,8 @@
+import functools
+
+import tiktoken
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(name: str) -> tiktoken.Encoding:
+    return tiktoken.get_encoding(name)
@@ -0,0 +1,232 @@
+import contextlib
+import functools
+import threading
+
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Iterable, Iterator, Optional
+from uuid import UUID
+
+import tiktoken
+
+from langchain_community.callbacks.openai_info import OpenAICallbackHandler
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+from langchain_core.outputs import LLMResult
+
+from src.summarize_algorithms.core.tokenization import get_encoding
+
+SUMMARIZER_NODE = "summarizer"
+RESPONSE_NODE = "response"
+EMBEDDINGS_NODE = "embeddings"
+JUDGE_NODE = "judge"
+EMBEDDING_COST_PER_1K_TOKENS = {
+    "text-embedding-3-small": 0.00002,
+    "text-embedding-3-large": 0.00013,
+    "text-embedding-ada-002": 0.0001,
+}
+USAGE_KEYS = ("system", "dialogue", "node")
+
+_current_usage: ContextVar[Optional["UsageCallbackHandler"]] = ContextVar(
+    "current_usage", default=None
+)
+_current_dialogue: ContextVar[Optional[str]] = ContextVar("current_dialogue", default=None)
+
+
+@dataclass
+class Usage:
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    embedding_tokens: int = 0
+    cost: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens + self.embedding_tokens
+
+    def add(self, other: "Usage") -> None:
+        self.calls += other.calls
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.embedding_tokens += other.embedding_tokens
+        self.cost += other.cost
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "total_tokens": self.total_tokens}
+
+
+@functools.lru_cache(maxsize=1)
+def _embedding_encoding() -> Optional[tiktoken.Encoding]:
+    try:
+        return get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_embedding_tokens(texts: list[str]) -> int:
+    encoding = _embedding_encoding()
+    if encoding is None:
+        return sum(max(len(text) // 4, 1) for text in texts)
+    return sum(len(ids) for ids in encoding.encode_batch(texts, disallowed_special=()))
+
+
+def embedding_cost(embeddings: Embeddings, tokens: int) -> float:
+    model = getattr(embeddings, "model", None)
+    return EMBEDDING_COST_PER_1K_TOKENS.get(str(model), 0.0) * tokens / 1000
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    run_inline = True
+
+    def __init__(
+        self, default_node: str, node_names: Optional[dict[str, str]] = None
+    ) -> None:
+        self.default_node = default_node
+        self.node_names = node_names or {}
+        self._llm_handlers: dict[str, OpenAICallbackHandler] = {}
+        self._embeddings = Usage()
+        self._run_nodes: dict[UUID, str] = {}
+        self._lock = threading.Lock()
+
+    def _node(self, metadata: Optional[dict[str, Any]]) -> str:
+        graph_node = str((metadata or {}).get("langgraph_node", ""))
+        return self.node_names.get(graph_node, self.default_node)
+
+    def _llm_handler(self, node: str) -> OpenAICallbackHandler:
+        with self._lock:
+            return self._llm_handlers.setdefault(node, OpenAICallbackHandler())
+
+    def on_llm_start(
+        self,
+        serialized: dict[str, Any],
+        prompts: list[str],
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        self._run_nodes[run_id] = self._node(metadata)
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[Any]],
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        self._run_nodes[run_id] = self._node(metadata)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        node = self._run_nodes.pop(run_id, self.default_node)
+        self._llm_handler(node).on_llm_end(response)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._run_nodes.pop(run_id, None)
+
+    def record_embeddings(self, embeddings: Embeddings, texts: list[str]) -> None:
+        tokens = count_embedding_tokens(texts)
+        usage = Usage(calls=1, embedding_tokens=tokens, cost=embedding_cost(embeddings, tokens))
+        with self._lock:
+            self._embeddings.add(usage)
+
+    def usage_by_node(self) -> dict[str, Usage]:
+        with self._lock:
+            nodes = {
+                node: Usage(
+                    calls=handler.successful_requests,
+                    prompt_tokens=handler.prompt_tokens,
+                    completion_tokens=handler.completion_tokens,
+                    cost=handler.total_cost,
+                )
+                for node, handler in self._llm_handlers.items()
+            }
+            if self._embeddings.calls:
+                nodes[EMBEDDINGS_NODE] = Usage(**asdict(self._embeddings))
+        return nodes
+
+    def total(self) -> Usage:
+        total = Usage()
+        for usage in self.usage_by_node().values():
+            total.add(usage)
+        return total
+
+
+@contextlib.contextmanager
+def track_usage(handler: UsageCallbackHandler) -> Iterator[UsageCallbackHandler]:
+    token = _current_usage.set(handler)
+    try:
+        yield handler
+    finally:
+        _current_usage.reset(token)
+
+
+def record_embedding_usage(embeddings: Embeddings, texts: list[str]) -> None:
+    if getattr(embeddings, "tracks_usage", False):
+        return
+    handler = _current_usage.get()
+    if handler is not None:
+        handler.record_embeddings(embeddings, texts)
+
+
+@contextlib.contextmanager
+def dialogue_scope(dialogue: str) -> Iterator[None]:
+    token = _current_dialogue.set(dialogue)
+    try:
+        yield
+    finally:
+        _current_dialogue.reset(token)
+
+
+def current_dialogue(default: str) -> str:
+    dialogue = _current_dialogue.get()
+    return dialogue if dialogue is not None else default
+
+
+class UsageLedger:
+    def __init__(self) -> None:
+        self._entries: dict[tuple[str, str, str], Usage] = defaultdict(Usage)
+        self._lock = threading.Lock()
+
+    def record(self, system: str, dialogue: str, node: str, usage: Usage) -> None:
+        with self._lock:
+            self._entries[(system, dialogue, node)].add(usage)
+
+    def record_call(self, system: str, dialogue: str, handler: UsageCallbackHandler) -> None:
+        for node, usage in handler.usage_by_node().items():
+            self.record(system, dialogue, node, usage)
+
+    def entries(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [
+                {**dict(zip(USAGE_KEYS, key)), **usage.to_dict()}
+                for key, usage in sorted(self._entries.items())
+            ]
+
+    def report(self, keys: Iterable[str]) -> dict[str, Usage]:
+        positions = [USAGE_KEYS.index(key) for key in keys]
+        report: dict[str, Usage] = defaultdict(Usage)
+        with self._lock:
+            for key, usage in sorted(self._entries.items()):
+                report["/".join(key[position] for position in positions)].add(usage)
+        return dict(report)
+
+    def total(self) -> Usage:
+        total = Usage()
+        for usage in self.report([]).values():
+            total.add(usage)
+        return total
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "total": self.total().to_dict(),
+            **{
+                f"by_{'_'.join(keys)}": {
+                    name: usage.to_dict() for name, usage in self.report(keys).items()
+                }
+                for keys in [("system",), ("dialogue",), ("node",), ("system", "node")]
+            },
+        }
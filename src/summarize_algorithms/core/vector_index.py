@@ -0,0 +1,172 @@
+import math
+import time
+
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+
+import faiss
+import numpy as np
+
+INDEX_KINDS = ("flat", "hnsw", "ivf_flat", "ivf_pq")
+TRAINED_INDEX_KINDS = ("ivf_flat", "ivf_pq")
+
+
+@dataclass
+class IndexConfig:
+    kind: str = "flat"
+    auto_threshold: int = 10_000
+    auto_kind: str = "hnsw"
+    min_train_size: int = 1_024
+    hnsw_m: int = 32
+    ef_construction: int = 80
+    ef_search: int = 64
+    nlist: Optional[int] = None
+    nprobe: int = 16
+    pq_m: int = 8
+    pq_bits: int = 8
+
+    def __post_init__(self) -> None:
+        if self.kind not in INDEX_KINDS + ("auto",):
+            raise ValueError(
+                f"Unknown index kind {self.kind!r}, expected one of {INDEX_KINDS + ('auto',)}."
+            )
+        if self.auto_kind not in INDEX_KINDS:
+            raise ValueError(
+                f"Unknown auto index kind {self.auto_kind!r}, expected one of {INDEX_KINDS}."
+            )
+
+    def kind_for(self, ntotal: int) -> str:
+        kind = self.kind
+        if kind == "auto":
+            if ntotal < self.auto_threshold:
+                return "flat"
+            kind = self.auto_kind
+        if kind in TRAINED_INDEX_KINDS and ntotal < self.min_train_size:
+            return "flat"
+        return kind
+
+
+def _nlist(config: IndexConfig, ntotal: int) -> int:
+    if config.nlist is not None:
+        return max(1, min(config.nlist, ntotal))
+    return max(1, min(int(4 * math.sqrt(ntotal)), ntotal // 39))
+
+
+def _pq_m(config: IndexConfig, dimension: int) -> int:
+    return max(m for m in range(1, min(config.pq_m, dimension) + 1) if dimension % m == 0)
+
+
+def _pq_bits(config: IndexConfig, ntotal: int) -> int:
+    return max(1, min(config.pq_bits, int(math.log2(max(ntotal // 39, 2)))))
+
+
+def factory_string(kind: str, dimension: int, ntotal: int, config: IndexConfig) -> str:
+    if kind == "flat":
+        return "Flat"
+    if kind == "hnsw":
+        return f"HNSW{config.hnsw_m}"
+    if kind == "ivf_flat":
+        return f"IVF{_nlist(config, ntotal)},Flat"
+    if kind == "ivf_pq":
+        return (
+            f"IVF{_nlist(config, ntotal)},"
+            f"PQ{_pq_m(config, dimension)}x{_pq_bits(config, ntotal)}"
+        )
+    raise ValueError(f"Unknown index kind {kind!r}, expected one of {INDEX_KINDS}.")
+
+
+def index_kind(index: faiss.Index) -> str:
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return "ivf_pq" if isinstance(faiss.downcast_index(ivf), faiss.IndexIVFPQ) else "ivf_flat"
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    return "flat"
+
+
+def configure_search(index: faiss.Index, config: IndexConfig) -> None:
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(config.nprobe, ivf.nlist)
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = config.ef_search
+
+
+def id_selector(ids: Sequence[int]) -> faiss.IDSelector:
+    if ids and ids[-1] - ids[0] + 1 == len(ids):
+        return faiss.IDSelectorRange(ids[0], ids[-1] + 1)
+    return faiss.IDSelectorBatch(np.asarray(ids, dtype=np.int64))
+
+
+def search_parameters(index: faiss.Index, selector: faiss.IDSelector) -> faiss.SearchParameters:
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+    if isinstance(index, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+def build_index(
+    kind: str, vectors: np.ndarray, config: IndexConfig, dimension: Optional[int] = None
+) -> faiss.Index:
+    dimension = dimension if dimension is not None else int(vectors.shape[1])
+    index = faiss.index_factory(
+        dimension,
+        factory_string(kind, dimension, len(vectors), config),
+        faiss.METRIC_INNER_PRODUCT,
+    )
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efConstruction = config.ef_construction
+    if not index.is_trained:
+        index.train(vectors)
+    if len(vectors):
+        index.add(vectors)
+    configure_search(index, config)
+    return index
+
+
+def rebuild_index(index: faiss.Index, kind: str, config: IndexConfig) -> faiss.Index:
+    vectors = index.reconstruct_n(0, index.ntotal)
+    return build_index(kind, vectors, config, dimension=index.d)
+
+
+def evaluate_index_kinds(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    kinds: Sequence[str] = INDEX_KINDS,
+    top_k: int = 5,
+    config: Optional[IndexConfig] = None,
+) -> dict[str, dict[str, Any]]:
+    config = config or IndexConfig()
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    top_k = min(top_k, len(vectors))
+
+    exact = faiss.IndexFlatIP(vectors.shape[1])
+    exact.add(vectors)
+    expected = exact.search(queries, top_k)[1]
+
+    report = {}
+    for kind in kinds:
+        start = time.perf_counter()
+        index = build_index(kind, vectors, config)
+        build_seconds = time.perf_counter() - start
+
+        latencies = []
+        hits = 0
+        for query, truth in zip(queries, expected):
+            start = time.perf_counter()
+            found = index.search(query[np.newaxis, :], top_k)[1][0]
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += len(set(found.tolist()) & set(truth.tolist()))
+
+        report[kind] = {
+            "factory": factory_string(kind, vectors.shape[1], len(vectors), config),
+            f"recall@{top_k}": hits / (len(queries) * top_k) if len(queries) else 0.0,
+            "mean_latency_ms": float(np.mean(latencies)) if latencies else 0.0,
+            "p95_latency_ms": float(np.percentile(latencies, 95)) if latencies else 0.0,
+            "build_seconds": build_seconds,
+        }
+
+    return report
@@ -1,15 +1,59 @@
-from typing import Type
+import functools
+
+from typing import Any, Type
+
+from langchain_core.runnables import RunnableLambda
 
 from src.summarize_algorithms.core.base_dialogue_system import BaseDialogueSystem
+from src.summarize_algorithms.core.graph_nodes import (
+    aupdate_memory_parallel_node,
+    update_memory_parallel_node,
+)
 from src.summarize_algorithms.core.memory_storage import MemoryStorage
-from src.summarize_algorithms.core.models import MemoryBankDialogueState, Session
+from src.summarize_algorithms.core.models import (
+    MemoryBankDialogueState,
+    Session,
+    WorkflowNode,
+)
 from src.summarize_algorithms.memory_bank.prompts import SESSION_SUMMARY_PROMPT
 from src.summarize_algorithms.memory_bank.summarizer import SessionSummarizer
 
 
 class MemoryBankDialogueSystem(BaseDialogueSystem):
+    def __init__(
+        self,
+        *args: Any,
+        parallel_update: bool = False,
+        max_concurrency: int = 8,
+        **kwargs: Any,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("Concurrency must be at least 1.")
+        self.parallel_update = parallel_update
+        self.max_concurrency = max_concurrency
+        super().__init__(*args, **kwargs)
+
     def _build_summarizer(self) -> SessionSummarizer:
-        return SessionSummarizer(self.llm, SESSION_SUMMARY_PROMPT)
+        return SessionSummarizer(self.llm, SESSION_SUMMARY_PROMPT, self.llm_cache)
+
+    def _build_update_memory_node(self) -> RunnableLambda:
+        if not self.parallel_update:
+            return super()._build_update_memory_node()
+
+        return RunnableLambda(
+            self.instrumentation.wrap(
+                WorkflowNode.UPDATE_MEMORY.value,
+                functools.partial(
+                    update_memory_parallel_node, self.summarizer, self.max_concurrency
+                ),
+            ),
+            afunc=self.instrumentation.awrap(
+                WorkflowNode.UPDATE_MEMORY.value,
+                functools.partial(
+                    aupdate_memory_parallel_node, self.summarizer, self.max_concurrency
+                ),
+            ),
+        )
 
     def _get_initial_state(
         self, sessions: list[Session], query: str
@@ -18,21 +62,33 @@ class MemoryBankDialogueSystem(BaseDialogueSystem):
             dialogue_sessions=sessions,
             code_memory_storage=(
                 MemoryStorage(
-                    embeddings=self.embed_model, max_session_id=self.max_session_id
+                    embeddings=self.embed_model,
+                    max_session_id=self.max_session_id,
+                    index_config=self.index_config,
+                    recency_policy=self.recency_policy,
+                    instrumentation=self.instrumentation,
                 )
                 if self.embed_code
                 else None
             ),
             tool_memory_storage=(
                 MemoryStorage(
-                    embeddings=self.embed_model, max_session_id=self.max_session_id
+                    embeddings=self.embed_model,
+                    max_session_id=self.max_session_id,
+                    index_config=self.index_config,
+                    recency_policy=self.recency_policy,
+                    instrumentation=self.instrumentation,
                 )
                 if self.embed_tool
                 else None
             ),
             query=query,
             text_memory_storage=MemoryStorage(
-                embeddings=self.embed_model, max_session_id=self.max_session_id
+                embeddings=self.embed_model,
+                max_session_id=self.max_session_id,
+                index_config=self.index_config,
+                recency_policy=self.recency_policy,
+                instrumentation=self.instrumentation,
             ),
         )
 
@@ -1,4 +1,4 @@
-from typing import Any, cast
+from typing import Any, Sequence, cast
 
 from langchain_core.runnables import RunnableSerializable
 from pydantic import BaseModel, Field
@@ -18,6 +18,9 @@ class SessionSummarizer(BaseSummarizer):
             self.prompt | self.llm.with_structured_output(SessionMemory),
         )
 
+    def _get_output_schema(self) -> type[SessionMemory]:
+        return SessionMemory
+
     def summarize(self, session_messages: str, session_id: int) -> list[BaseBlock]:
         try:
             response = self.chain.invoke(
@@ -29,3 +32,47 @@ class SessionSummarizer(BaseSummarizer):
             return response.summary_messages
         except Exception as e:
             raise ConnectionError(f"API request failed: {e}") from e
+
+    async def asummarize(
+        self, session_messages: str, session_id: int
+    ) -> list[BaseBlock]:
+        try:
+            response = await self.chain.ainvoke(
+                {
+                    "session_messages": session_messages,
+                    "session_id": session_id,
+                }
+            )
+            return response.summary_messages
+        except Exception as e:
+            raise ConnectionError(f"API request failed: {e}") from e
+
+    def summarize_many(
+        self, sessions: Sequence[tuple[str, int]], max_concurrency: int = 8
+    ) -> list[list[BaseBlock]]:
+        try:
+            responses = self.chain.batch(
+                [
+                    {"session_messages": session_messages, "session_id": session_id}
+                    for session_messages, session_id in sessions
+                ],
+                config={"max_concurrency": max_concurrency},
+            )
+            return [response.summary_messages for response in responses]
+        except Exception as e:
+            raise ConnectionError(f"API request failed: {e}") from e
+
+    async def asummarize_many(
+        self, sessions: Sequence[tuple[str, int]], max_concurrency: int = 8
+    ) -> list[list[BaseBlock]]:
+        try:
+            responses = await self.chain.abatch(
+                [
+                    {"session_messages": session_messages, "session_id": session_id}
+                    for session_messages, session_id in sessions
+                ],
+                config={"max_concurrency": max_concurrency},
+            )
+            return [response.summary_messages for response in responses]
+        except Exception as e:
+            raise ConnectionError(f"API request failed: {e}") from e
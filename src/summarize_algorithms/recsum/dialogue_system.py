@@ -1,15 +1,63 @@
-from typing import Type
+import functools
+
+from typing import Any, Type
+
+from langchain_core.runnables import RunnableLambda
 
 from src.summarize_algorithms.core.base_dialogue_system import BaseDialogueSystem
+from src.summarize_algorithms.core.graph_nodes import (
+    aupdate_memory_tree_node,
+    update_memory_tree_node,
+)
 from src.summarize_algorithms.core.memory_storage import MemoryStorage
-from src.summarize_algorithms.core.models import RecsumDialogueState, Session
-from src.summarize_algorithms.recsum.prompts import MEMORY_UPDATE_PROMPT_TEMPLATE
-from src.summarize_algorithms.recsum.summarizer import RecursiveSummarizer
+from src.summarize_algorithms.core.models import (
+    RecsumDialogueState,
+    Session,
+    WorkflowNode,
+)
+from src.summarize_algorithms.recsum.prompts import (
+    MEMORY_MERGE_PROMPT_TEMPLATE,
+    MEMORY_UPDATE_PROMPT_TEMPLATE,
+)
+from src.summarize_algorithms.recsum.summarizer import MemoryMerger, RecursiveSummarizer
 
 
 class RecsumDialogueSystem(BaseDialogueSystem):
+    def __init__(
+        self,
+        *args: Any,
+        tree_update: bool = False,
+        max_concurrency: int = 8,
+        **kwargs: Any,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("Concurrency must be at least 1.")
+        self.tree_update = tree_update
+        self.max_concurrency = max_concurrency
+        super().__init__(*args, **kwargs)
+
     def _build_summarizer(self) -> RecursiveSummarizer:
-        return RecursiveSummarizer(self.llm, MEMORY_UPDATE_PROMPT_TEMPLATE)
+        return RecursiveSummarizer(self.llm, MEMORY_UPDATE_PROMPT_TEMPLATE, self.llm_cache)
+
+    def _build_update_memory_node(self) -> RunnableLambda:
+        if not self.tree_update:
+            return super()._build_update_memory_node()
+
+        self.merger = MemoryMerger(self.llm, MEMORY_MERGE_PROMPT_TEMPLATE, self.llm_cache)
+        return RunnableLambda(
+            self.instrumentation.wrap(
+                WorkflowNode.UPDATE_MEMORY.value,
+                functools.partial(
+                    update_memory_tree_node, self.summarizer, self.merger, self.max_concurrency
+                ),
+            ),
+            afunc=self.instrumentation.awrap(
+                WorkflowNode.UPDATE_MEMORY.value,
+                functools.partial(
+                    aupdate_memory_tree_node, self.summarizer, self.merger, self.max_concurrency
+                ),
+            ),
+        )
 
     def _get_initial_state(
         self, sessions: list[Session], query: str
@@ -17,10 +65,18 @@ class RecsumDialogueSystem(BaseDialogueSystem):
         return RecsumDialogueState(
             dialogue_sessions=sessions,
             code_memory_storage=MemoryStorage(
-                embeddings=self.embed_model, max_session_id=self.max_session_id
+                embeddings=self.embed_model,
+                max_session_id=self.max_session_id,
+                index_config=self.index_config,
+                recency_policy=self.recency_policy,
+                instrumentation=self.instrumentation,
             ),
             tool_memory_storage=MemoryStorage(
-                embeddings=self.embed_model, max_session_id=self.max_session_id
+                embeddings=self.embed_model,
+                max_session_id=self.max_session_id,
+                index_config=self.index_config,
+                recency_policy=self.recency_policy,
+                instrumentation=self.instrumentation,
             ),
             query=query,
         )
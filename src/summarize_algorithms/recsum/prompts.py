@@ -57,3 +57,56 @@ User:
 Assistant:
 - ..."""
 )
+
+MEMORY_MERGE_PROMPT_TEMPLATE = PromptTemplate.from_template(
+    """You are an advanced AI assistant responsible for maintaining a memory of personal details
+(personality traits, background, preferences, etc.) for both the user and the assistant.
+You will be given two memories that were built from consecutive parts of the same conversation:
+- Earlier Memory: The memory built from the earlier part of the conversation.
+- Later Memory: The memory built from the later part of the conversation.
+Your goal is to merge them into a single memory that covers the whole conversation.
+
+Instructions:
+1. Keep every distinct personal detail from both memories.
+2. When the memories conflict, prefer the Later Memory, because it reflects more recent information.
+3. Remove duplicates and combine related details into a clear, concise memory.
+   Use separate sections for the user and the assistant.
+   Present each person’s memory as bullet points.
+4. Format:
+   Structure the memory as shown in the example below.
+   Do not exceed 20 sentences in the entire memory.
+
+Example:
+Earlier Memory:
+User:
+- From Italy
+- Enjoys cooking
+- Lives in Rome
+Assistant:
+- Friendly and helpful
+Later Memory:
+User:
+- Recently moved to New York City
+- Learning Spanish
+Assistant:
+- AI assistant that helps find classes
+Merged Memory:
+User:
+- From Italy
+- Recently moved to New York City
+- Enjoys cooking
+- Learning Spanish
+Assistant:
+- Friendly and helpful AI assistant that helps find classes
+
+Inputs:
+Earlier Memory: {earlier_memory}
+Later Memory: {later_memory}
+
+Output:
+Merged Memory:
+User:
+- ...
+Assistant:
+- ..."""
+)
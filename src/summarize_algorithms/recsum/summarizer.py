@@ -1,4 +1,4 @@
-from typing import Any, cast
+from typing import Any, Sequence, cast
 
 from langchain_core.runnables import RunnableSerializable
 
@@ -14,6 +14,9 @@ class RecursiveSummarizer(BaseSummarizer):
             self.prompt | self.llm.with_structured_output(SessionMemory),
         )
 
+    def _get_output_schema(self) -> type[SessionMemory]:
+        return SessionMemory
+
     def summarize(self, previous_memory: str, dialogue_context: str) -> list[BaseBlock]:
         try:
             response = self.chain.invoke(
@@ -25,3 +28,94 @@ class RecursiveSummarizer(BaseSummarizer):
             return response.summary_messages
         except Exception as e:
             raise ConnectionError(f"API request failed: {e}") from e
+
+    async def asummarize(
+        self, previous_memory: str, dialogue_context: str
+    ) -> list[BaseBlock]:
+        try:
+            response = await self.chain.ainvoke(
+                {
+                    "previous_memory": previous_memory,
+                    "dialogue_context": dialogue_context,
+                }
+            )
+            return response.summary_messages
+        except Exception as e:
+            raise ConnectionError(f"API request failed: {e}") from e
+
+    def summarize_many(
+        self, items: Sequence[tuple[str, str]], max_concurrency: int = 8
+    ) -> list[list[BaseBlock]]:
+        try:
+            responses = self.chain.batch(
+                [
+                    {"previous_memory": previous_memory, "dialogue_context": dialogue_context}
+                    for previous_memory, dialogue_context in items
+                ],
+                config={"max_concurrency": max_concurrency},
+            )
+            return [response.summary_messages for response in responses]
+        except Exception as e:
+            raise ConnectionError(f"API request failed: {e}") from e
+
+    async def asummarize_many(
+        self, items: Sequence[tuple[str, str]], max_concurrency: int = 8
+    ) -> list[list[BaseBlock]]:
+        try:
+            responses = await self.chain.abatch(
+                [
+                    {"previous_memory": previous_memory, "dialogue_context": dialogue_context}
+                    for previous_memory, dialogue_context in items
+                ],
+                config={"max_concurrency": max_concurrency},
+            )
+            return [response.summary_messages for response in responses]
+        except Exception as e:
+            raise ConnectionError(f"API request failed: {e}") from e
+
+
+class MemoryMerger(BaseSummarizer):
+    def _build_chain(self) -> RunnableSerializable[dict[str, Any], SessionMemory]:
+        return cast(
+            RunnableSerializable[dict, SessionMemory],
+            self.prompt | self.llm.with_structured_output(SessionMemory),
+        )
+
+    def _get_output_schema(self) -> type[SessionMemory]:
+        return SessionMemory
+
+    def summarize(self, earlier_memory: str, later_memory: str) -> list[BaseBlock]:
+        return self.summarize_many([(earlier_memory, later_memory)])[0]
+
+    async def asummarize(self, earlier_memory: str, later_memory: str) -> list[BaseBlock]:
+        return (await self.asummarize_many([(earlier_memory, later_memory)]))[0]
+
+    def summarize_many(
+        self, pairs: Sequence[tuple[str, str]], max_concurrency: int = 8
+    ) -> list[list[BaseBlock]]:
+        try:
+            responses = self.chain.batch(
+                [
+                    {"earlier_memory": earlier_memory, "later_memory": later_memory}
+                    for earlier_memory, later_memory in pairs
+                ],
+                config={"max_concurrency": max_concurrency},
+            )
+            return [response.summary_messages for response in responses]
+        except Exception as e:
+            raise ConnectionError(f"API request failed: {e}") from e
+
+    async def asummarize_many(
+        self, pairs: Sequence[tuple[str, str]], max_concurrency: int = 8
+    ) -> list[list[BaseBlock]]:
+        try:
+            responses = await self.chain.abatch(
+                [
+                    {"earlier_memory": earlier_memory, "later_memory": later_memory}
+                    for earlier_memory, later_memory in pairs
+                ],
+                config={"max_concurrency": max_concurrency},
+            )
+            return [response.summary_messages for response in responses]
+        except Exception as e:
+            raise ConnectionError(f"API request failed: {e}") from e
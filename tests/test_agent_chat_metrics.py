@@ -0,0 +1,128 @@
+import threading
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.benchmarking.agent_chat import calculate_agent_chat_response_metrics
+from src.benchmarking.agent_chat.calculate_agent_chat_response_metrics import (
+    CalculateAgentChatResponseMetrics,
+    PairwiseResult,
+)
+from src.benchmarking.llm_evaluation import (
+    ComparisonResult,
+    PairwiseChatAgentResult,
+    SingleChatAgentResult,
+)
+from src.summarize_algorithms.core.models import BaseBlock, Session
+
+SYSTEMS = [
+    "base_recsum",
+    "rag_recsum",
+    "base_memory_bank",
+    "rag_memory_bank",
+    "full_baseline",
+    "last_baseline",
+]
+
+
+def make_calculator(monkeypatch, max_workers, barrier=None, adaptive_pairwise=False, **kwargs):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(
+        calculate_agent_chat_response_metrics.ChatDataset, "from_file", MagicMock()
+    )
+    calculator = CalculateAgentChatResponseMetrics(
+        max_workers=max_workers, adaptive_pairwise=adaptive_pairwise, **kwargs
+    )
+
+    def responder(name):
+        def respond(*args):
+            if barrier is not None:
+                barrier.wait(timeout=5)
+            return name if name.endswith("baseline") else MagicMock(response=name)
+
+        return respond
+
+    for name in SYSTEMS:
+        system = MagicMock(prompt_tokens=0, completion_tokens=0, embedding_tokens=0, total_cost=0.0)
+        system.process_dialogue.side_effect = responder(name)
+        setattr(calculator, name, system)
+
+    calculator.llm_scorer = MagicMock()
+    calculator.llm_scorer.evaluate_single.side_effect = (
+        lambda dialogue_context, assistant_answer: SingleChatAgentResult(
+            correctness_score=SYSTEMS.index(assistant_answer),
+            clarity_score=50,
+            context_handling_score=50,
+        )
+    )
+    calculator.llm_scorer.evaluate_pairwise.return_value = PairwiseChatAgentResult(
+        correctness=ComparisonResult.OPTION_1_BETTER,
+        clarity=ComparisonResult.OPTION_2_BETTER,
+        context_handling=ComparisonResult.DRAW,
+    )
+    return calculator
+
+
+@pytest.fixture
+def sessions():
+    return [Session([BaseBlock("USER", "How do I sort a list?")])]
+
+
+def test_systems_run_concurrently(monkeypatch, sessions):
+    calculator = make_calculator(monkeypatch, max_workers=6, barrier=threading.Barrier(6))
+
+    calculator._process(sessions, 1)
+
+    assert calculator.message_count == 1
+    assert calculator.llm_scorer.evaluate_pairwise.call_count == 15
+
+
+@pytest.mark.parametrize("max_workers", [1, 8])
+def test_results_are_aggregated_deterministically(monkeypatch, sessions, max_workers):
+    calculator = make_calculator(monkeypatch, max_workers=max_workers)
+
+    calculator._process(sessions, 1)
+
+    assert calculator.base_recsum_single_result.correctness == [0]
+    assert calculator.rag_memory_bank_single_result.correctness == [3]
+    assert calculator.last_session_baseline_single_result.correctness == [5]
+    assert calculator.pairwise_result == PairwiseResult(
+        base_recsum=10,
+        rag_recsum=10,
+        base_memory_bank=10,
+        rag_memory_bank=10,
+        full_baseline=10,
+        last_baseline=10,
+    )
+
+
+def test_adaptive_pairwise_judges_fewer_pairs(monkeypatch, sessions):
+    calculator = make_calculator(monkeypatch, max_workers=4, adaptive_pairwise=True)
+
+    calculator._process(sessions, 1)
+
+    assert calculator.llm_scorer.evaluate_pairwise.call_count < 15
+    assert all(getattr(calculator.pairwise_result, name) >= 4 for name in SYSTEMS)
+
+
+def test_resume_skips_completed_iterations(monkeypatch, sessions, tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    first_run = make_calculator(monkeypatch, max_workers=2, checkpoint_path=path)
+    first_run._process_with_checkpoint(sessions, 1)
+
+    resumed = make_calculator(monkeypatch, max_workers=2, checkpoint_path=path, resume=True)
+    resumed._process_with_checkpoint(sessions, 1)
+
+    resumed.llm_scorer.evaluate_pairwise.assert_not_called()
+    resumed.base_recsum.process_dialogue.assert_not_called()
+    assert resumed.pairwise_result == first_run.pairwise_result
+    assert resumed.rag_recsum_single_result == first_run.rag_recsum_single_result
+    assert resumed.message_count == 1
+
+
+def test_max_workers_must_be_positive(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    with pytest.raises(ValueError):
+        CalculateAgentChatResponseMetrics(max_workers=0)
@@ -0,0 +1,138 @@
+import io
+import json
+
+import pytest
+
+from src.benchmarking.agent_chat.create_chat import ChatSessionCombiner
+from src.benchmarking.agent_chat.deserialize_agent_chat import (
+    ChatDataset,
+    JSONArrayStream,
+)
+from src.summarize_algorithms.core.models import CodeBlock, ToolCallBlock
+
+SESSIONS = [
+    {
+        "session_id": "first",
+        "messages": [
+            {"type": "USER", "content": "Fix this:\n```python\nprint('hi')\n```"},
+            {
+                "type": "ASSISTANT",
+                "content": "",
+                "tool_calls": [{"id": "1", "name": "read", "arguments": "{}"}],
+            },
+            {"type": "TOOL", "tool_responses": [{"responseData": "ok ✓"}]},
+            {"type": "ASSISTANT", "content": "Done"},
+        ],
+    },
+    {"session_id": "second", "messages": [{"type": "USER", "content": "[not, json] {"}]},
+]
+
+
+@pytest.fixture
+def chat_file(tmp_path):
+    path = tmp_path / "chat.json"
+    path.write_text(json.dumps(SESSIONS, indent=4, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def dump(session):
+    return [(type(block).__name__, vars(block)) for block in session]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_stream_matches_json_load(chunk_size):
+    values = [{"a": [1, 2.5, "x]"]}, 12345, "text", None, [], {"nested": {"b": True}}]
+    text = " \n" + json.dumps(values, indent=2)
+
+    assert list(JSONArrayStream(io.StringIO(text), chunk_size)) == values
+
+
+@pytest.mark.parametrize("text", ["[]", " [ ] "])
+def test_stream_handles_empty_arrays(text):
+    assert list(JSONArrayStream(io.StringIO(text), 2)) == []
+
+
+@pytest.mark.parametrize("text", ['{"a": 1}', "[1, 2", "[1 2]"])
+def test_stream_rejects_malformed_input(text):
+    with pytest.raises(ValueError):
+        list(JSONArrayStream(io.StringIO(text), 2))
+
+
+def test_iter_sessions_builds_blocks(chat_file):
+    sessions = list(ChatDataset.iter_sessions(chat_file, chunk_size=16))
+
+    assert len(sessions) == 2
+    assert isinstance(sessions[0][1], CodeBlock)
+    assert isinstance(sessions[0][2], ToolCallBlock)
+    assert sessions[0][2].response == "ok ✓"
+    assert sessions[1][0].content == "[not, json] {"
+
+
+def test_from_file_uses_cache_until_source_changes(chat_file, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    dataset = ChatDataset.from_file(chat_file, cache_dir=cache_dir)
+
+    monkeypatch.setattr(ChatDataset, "iter_sessions", classmethod(lambda cls, *args: iter(())))
+    cached = ChatDataset.from_file(chat_file, cache_dir=cache_dir)
+    assert [dump(session) for session in cached] == [dump(session) for session in dataset]
+
+    with open(chat_file, "a", encoding="utf-8") as f:
+        f.write("\n")
+    assert len(ChatDataset.from_file(chat_file, cache_dir=cache_dir)) == 0
+
+
+def test_cache_is_jsonl_with_lossless_blocks(chat_file, tmp_path):
+    cache_dir = tmp_path / "cache"
+    dataset = ChatDataset.from_file(chat_file, cache_dir=str(cache_dir))
+
+    (cache_path,) = cache_dir.iterdir()
+    lines = cache_path.read_text(encoding="utf-8").splitlines()
+    assert cache_path.suffix == ".jsonl"
+    assert json.loads(lines[0])["size"] == len(open(chat_file, "rb").read())
+    assert len(lines) == 1 + len(dataset)
+    assert [dump(session) for session in ChatDataset.stream_sessions(chat_file, str(cache_dir))] == [
+        dump(session) for session in dataset
+    ]
+
+
+def test_partially_consumed_stream_does_not_write_cache(chat_file, tmp_path):
+    cache_dir = tmp_path / "cache"
+    sessions = ChatDataset.stream_sessions(chat_file, str(cache_dir))
+
+    next(sessions)
+    sessions.close()
+
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_combiner_streams_same_json_as_dump(tmp_path):
+    files = []
+    for session in SESSIONS:
+        path = tmp_path / f"{session['session_id']}.json"
+        path.write_text(json.dumps(session["messages"]), encoding="utf-8")
+        files.append(str(path))
+    output = tmp_path / "combined.json"
+
+    combiner = ChatSessionCombiner(files + [str(tmp_path / "missing.json")], str(output))
+    combiner.process_files()
+
+    assert output.read_text(encoding="utf-8") == json.dumps(SESSIONS, ensure_ascii=False, indent=4)
+    assert combiner.get_session_ids() == ["first", "second"]
+
+
+def test_combiner_writes_empty_array(tmp_path):
+    output = tmp_path / "combined.json"
+
+    ChatSessionCombiner([], str(output)).process_files()
+
+    assert json.loads(output.read_text(encoding="utf-8")) == []
+
+
+def test_save_combined_data_writes_given_entries(tmp_path):
+    output = tmp_path / "combined.json"
+    combiner = ChatSessionCombiner([], str(output))
+
+    combiner.save_combined_data(iter(SESSIONS))
+
+    assert json.loads(output.read_text(encoding="utf-8")) == SESSIONS
+    assert combiner.get_session_count() == 2
@@ -0,0 +1,104 @@
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+from src.benchmarking.checkpoint import BenchmarkCheckpoint, dialogue_fingerprint
+from src.benchmarking.metric_calculator import PairwiseResults, RawLLMData
+from src.summarize_algorithms.core.models import BaseBlock, Session
+
+
+@dataclass
+class Scores:
+    values: list[float] = field(default_factory=list)
+
+
+def make_benchmark():
+    return SimpleNamespace(
+        scores=Scores(),
+        llm_data=RawLLMData(),
+        pairwise=PairwiseResults(),
+        message_count=0,
+        system=SimpleNamespace(prompt_tokens=0, embedding_tokens=0, total_cost=0.0),
+    )
+
+
+FIELDS = [
+    "scores",
+    "llm_data",
+    "pairwise",
+    "message_count",
+    "system.prompt_tokens",
+    "system.embedding_tokens",
+    "system.total_cost",
+]
+
+
+def run_unit(checkpoint, benchmark, unit, score):
+    before = checkpoint.capture(benchmark, FIELDS)
+    benchmark.scores.values.append(score)
+    benchmark.llm_data.coherency.append(score * 10)
+    benchmark.pairwise.coherency["recsum"] += 1
+    benchmark.message_count += 2
+    benchmark.system.prompt_tokens += 100
+    benchmark.system.embedding_tokens += 40
+    benchmark.system.total_cost += 0.5
+    checkpoint.record(unit, benchmark, FIELDS, before, dialogue_index=score)
+
+
+def test_resume_rebuilds_results(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    original = make_benchmark()
+    checkpoint = BenchmarkCheckpoint(path)
+    run_unit(checkpoint, original, "first", 1)
+    run_unit(checkpoint, original, "second", 2)
+
+    resumed_checkpoint = BenchmarkCheckpoint(path, resume=True)
+    resumed = make_benchmark()
+    for unit in ["first", "second"]:
+        assert resumed_checkpoint.is_completed(unit)
+        resumed_checkpoint.restore(unit, resumed)
+
+    assert resumed == original
+    assert not resumed_checkpoint.is_completed("third")
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = tmp_path / "run.jsonl"
+    checkpoint = BenchmarkCheckpoint(str(path))
+    run_unit(checkpoint, make_benchmark(), "first", 1)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"unit": "second", "del')
+
+    resumed = BenchmarkCheckpoint(str(path), resume=True)
+
+    assert resumed.is_completed("first")
+    assert not resumed.is_completed("second")
+
+
+def test_resuming_twice_after_torn_write_keeps_new_records(tmp_path):
+    path = tmp_path / "run.jsonl"
+    benchmark = make_benchmark()
+    run_unit(BenchmarkCheckpoint(str(path)), benchmark, "first", 1)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"unit": "second", "del')
+
+    run_unit(BenchmarkCheckpoint(str(path), resume=True), benchmark, "second", 2)
+    resumed = BenchmarkCheckpoint(str(path), resume=True)
+
+    assert resumed.is_completed("first")
+    assert resumed.is_completed("second")
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_fresh_run_truncates_previous_checkpoint(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    run_unit(BenchmarkCheckpoint(path), make_benchmark(), "first", 1)
+
+    assert not BenchmarkCheckpoint(path).is_completed("first")
+
+
+def test_dialogue_fingerprint_depends_on_content():
+    first = [Session([BaseBlock("user", "hello")])]
+    second = [Session([BaseBlock("user", "hello!")])]
+
+    assert dialogue_fingerprint(first) == dialogue_fingerprint(list(first))
+    assert dialogue_fingerprint(first) != dialogue_fingerprint(second)
@@ -0,0 +1,137 @@
+from unittest.mock import MagicMock
+
+import pytest
+import tiktoken
+
+from src.benchmarking.baseline import DialogueBaseline
+from src.benchmarking.context_builder import ContextBuilder, ContextPolicy
+from src.benchmarking.fake_models import FakeChatModel
+from src.benchmarking.throughput import make_dialogues
+from src.summarize_algorithms.core import tokenization
+from src.summarize_algorithms.core.models import BaseBlock, Session
+
+ENCODING_NAME = "test_byte_level"
+
+
+@pytest.fixture(autouse=True)
+def encoding(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    encoding = tiktoken.Encoding(
+        name=ENCODING_NAME,
+        pat_str=r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+""",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+    monkeypatch.setattr(tokenization.tiktoken, "get_encoding", lambda name: encoding)
+    tokenization.get_encoding.cache_clear()
+    yield encoding
+    tokenization.get_encoding.cache_clear()
+
+
+@pytest.fixture
+def sessions():
+    return [
+        Session([BaseBlock(role="USER", content=f"message {i}.{j}") for j in range(5)])
+        for i in range(4)
+    ]
+
+
+def make_builder(max_tokens=None, policy=ContextPolicy.FULL, **kwargs):
+    return ContextBuilder(max_tokens, policy, encoding_name=ENCODING_NAME, **kwargs)
+
+
+def token_count(encoding, text):
+    return len(encoding.encode(text))
+
+
+def test_unbounded_context_joins_every_message(sessions):
+    context = make_builder().build(sessions)
+
+    assert context == "\n".join(
+        f"{message.role}: {message.content}" for session in sessions for message in session
+    )
+
+
+def test_context_under_budget_is_complete(sessions):
+    assert make_builder(10_000).build(sessions) == make_builder().build(sessions)
+
+
+@pytest.mark.parametrize("max_tokens", [1, 7, 50, 123])
+@pytest.mark.parametrize("policy", list(ContextPolicy))
+def test_context_fits_budget(encoding, sessions, policy, max_tokens):
+    context = make_builder(max_tokens, policy).build(sessions)
+
+    assert token_count(encoding, context) <= max_tokens
+
+
+def test_full_policy_keeps_the_beginning(sessions):
+    context = make_builder(60).build(sessions)
+
+    assert context.startswith("USER: message 0.0\nUSER: message 0.1")
+    assert "message 3.4" not in context
+
+
+def test_sliding_policy_keeps_the_end(sessions):
+    context = make_builder(60, "sliding").build(sessions)
+
+    assert context.endswith("USER: message 3.3\nUSER: message 3.4")
+    assert "message 0.0" not in context
+
+
+def test_head_tail_policy_keeps_both_ends(sessions):
+    context = make_builder(120, ContextPolicy.HEAD_TAIL).build(sessions)
+
+    lines = context.split("\n")
+    assert lines[0] == "USER: message 0.0"
+    assert lines[-1] == "USER: message 3.4"
+    assert ContextBuilder.OMISSION_MARKER in lines
+    assert "message 2.0" not in context
+
+
+def test_boundary_message_is_truncated_by_tokens():
+    session = Session([BaseBlock(role="USER", content="x" * 100)])
+
+    assert make_builder(11).build([session]) == "USER: xxxx"
+    assert make_builder(11, "sliding").build([session]) == "x" * 10
+
+
+def test_session_token_counts_are_cached(encoding, sessions, monkeypatch):
+    encode_batch = MagicMock(wraps=encoding.encode_batch)
+    monkeypatch.setattr(encoding, "encode_batch", encode_batch)
+    builder = make_builder(50)
+
+    builder.build(sessions[:2])
+    builder.build(sessions)
+    assert encode_batch.call_count == 4
+
+    sessions[0].messages.append(BaseBlock(role="USER", content="new"))
+    builder.build(sessions)
+    assert encode_batch.call_count == 5
+
+
+def test_cache_is_bounded(sessions):
+    builder = make_builder(50, max_cached_sessions=2)
+
+    builder.build(sessions)
+
+    assert len(builder._cache) == 2
+    assert builder.count_tokens(sessions) == sum(
+        len(f"USER: message {i}.{j}") + 1 for i in range(4) for j in range(5)
+    )
+
+
+@pytest.mark.parametrize("kwargs", [{"max_tokens": 0}, {"head_fraction": 1.5}, {"policy": "middle"}])
+def test_invalid_configuration_is_rejected(kwargs):
+    with pytest.raises(ValueError):
+        ContextBuilder(**kwargs)
+
+
+def test_baseline_uses_context_builder(sessions):
+    builder = make_builder(40, "sliding")
+    builder.build = MagicMock(wraps=builder.build)
+    baseline = DialogueBaseline("baseline", llm=FakeChatModel(), context_builder=builder)
+
+    baseline.process_dialogue(make_dialogues(1)[0], "query")
+
+    builder.build.assert_called_once()
+    assert baseline.latency_summary()["build_context"]["calls"] == 1
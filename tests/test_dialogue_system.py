@@ -0,0 +1,367 @@
+import asyncio
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, create_autospec
+
+import pytest
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models import BaseChatModel
+
+from src.benchmarking.fake_models import FakeChatModel, HashingEmbeddings
+from src.benchmarking.throughput import make_dialogues
+from src.summarize_algorithms.core.models import (
+    BaseBlock,
+    CodeBlock,
+    Session,
+    ToolCallBlock,
+)
+from src.summarize_algorithms.memory_bank.dialogue_system import (
+    MemoryBankDialogueSystem,
+)
+from src.summarize_algorithms.recsum.dialogue_system import RecsumDialogueSystem
+
+
+@pytest.fixture
+def system(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.chdir(tmp_path)
+
+    dialogue_system = RecsumDialogueSystem(llm=create_autospec(BaseChatModel))
+    dialogue_system.memory_logger = MagicMock()
+
+    summarizer_chain = MagicMock()
+    summarizer_chain.invoke.side_effect = lambda params: MagicMock(
+        summary_messages=[BaseBlock("user", params["dialogue_context"])]
+    )
+    summarizer_chain.ainvoke = AsyncMock(
+        side_effect=summarizer_chain.invoke.side_effect
+    )
+    dialogue_system.summarizer.chain = summarizer_chain
+
+    response_chain = MagicMock()
+    response_chain.invoke.return_value = "Response"
+    response_chain.ainvoke = AsyncMock(return_value="Async response")
+    dialogue_system.response_generator.chain = response_chain
+
+    return dialogue_system
+
+
+class QueryCountingEmbedding(DeterministicFakeEmbedding):
+    queries: list[str] = []
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return super().embed_query(text)
+
+
+def make_sessions(count):
+    return [Session([BaseBlock("user", f"message {i}")]) for i in range(count)]
+
+
+def test_only_new_sessions_are_summarized(system):
+    sessions = make_sessions(4)
+
+    for i in range(len(sessions)):
+        state = system.process_dialogue(sessions[: i + 1], "query")
+
+    assert system.summarizer.chain.invoke.call_count == len(sessions)
+    assert len(state.text_memory) == len(sessions)
+    assert state.response == "Response"
+
+
+def test_repeated_call_skips_memory_update(system):
+    sessions = make_sessions(2)
+
+    system.process_dialogue(sessions, "first query")
+    state = system.process_dialogue(sessions, "second query")
+
+    assert system.summarizer.chain.invoke.call_count == 2
+    assert state.query == "second query"
+    assert system.response_generator.chain.invoke.call_count == 2
+
+
+def test_changed_history_rebuilds_memory(system):
+    sessions = make_sessions(3)
+
+    system.process_dialogue(sessions, "query")
+    sessions[0].messages.append(BaseBlock("assistant", "edited"))
+    state = system.process_dialogue(sessions, "query")
+
+    assert system.summarizer.chain.invoke.call_count == 6
+    assert len(state.text_memory) == 3
+
+
+def test_conversations_are_kept_separately(system):
+    first, second = make_sessions(2), make_sessions(3)
+
+    system.process_dialogue(first, "query", conversation_id="first")
+    system.process_dialogue(second, "query", conversation_id="second")
+    state = system.process_dialogue(first, "query", conversation_id="first")
+
+    assert system.summarizer.chain.invoke.call_count == 5
+    assert len(state.text_memory) == 2
+
+
+def test_mutated_last_session_rebuilds_without_growing_the_cache(system):
+    sessions = make_sessions(3)
+
+    for _ in range(3):
+        sessions[-1].messages.pop()
+        sessions[-1].messages.append(BaseBlock("user", f"message {system.iteration}"))
+        state = system.process_dialogue(sessions, "query")
+
+    assert system.summarizer.chain.invoke.call_count == 9
+    assert [memory[0] for memory in state.text_memory][-1] == "user: message 2"
+    assert list(system._conversations) == ["default"]
+
+
+def test_conversation_cache_is_bounded(system):
+    system.max_conversations = 2
+
+    for conversation_id in ["a", "b", "a", "c"]:
+        system.process_dialogue(make_sessions(1), "query", conversation_id=conversation_id)
+
+    assert list(system._conversations) == ["a", "c"]
+    system.process_dialogue(make_sessions(1), "query", conversation_id="b")
+    assert system.summarizer.chain.invoke.call_count == 4
+
+
+def test_invalid_conversation_limit_is_rejected():
+    with pytest.raises(ValueError):
+        RecsumDialogueSystem(llm=create_autospec(BaseChatModel), max_conversations=0)
+
+
+def test_failed_update_leaves_remembered_state_intact(system):
+    sessions = make_sessions(4)
+    summarize = system.summarizer.chain.invoke.side_effect
+    calls = []
+
+    def failing_second_call(params):
+        calls.append(params)
+        if len(calls) == 3:
+            raise RuntimeError("API down")
+        return summarize(params)
+
+    system.summarizer.chain.invoke.side_effect = failing_second_call
+    system.process_dialogue(sessions[:1], "query")
+    with pytest.raises(ConnectionError):
+        system.process_dialogue(sessions, "query")
+    state = system.process_dialogue(sessions, "query")
+
+    assert len(state.text_memory) == 4
+    assert [memory[0] for memory in state.text_memory] == [f"user: message {i}" for i in range(4)]
+
+
+def test_earlier_states_are_not_mutated(system):
+    sessions = make_sessions(3)
+
+    first = system.process_dialogue(sessions[:1], "query")
+    system.process_dialogue(sessions, "query")
+
+    assert len(first.text_memory) == 1
+    assert len(first.dialogue_sessions) == 1
+
+
+def test_earlier_memory_bank_storage_is_not_mutated(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    system = MemoryBankDialogueSystem(
+        llm=FakeChatModel(), embed_model=HashingEmbeddings(size=16), max_session_id=8
+    )
+    sessions = make_dialogues(1, n_sessions=3)[0]
+
+    first = system.process_dialogue(sessions[:1], "query")
+    count = first.text_memory_storage.get_memory_count()
+    ntotal = first.text_memory_storage.index.ntotal
+    latest = system.process_dialogue(sessions, "query")
+
+    assert first.text_memory_storage.get_memory_count() == count
+    assert first.text_memory_storage.index.ntotal == ntotal
+    assert latest.text_memory_storage.get_memory_count() > count
+    assert latest.text_memory_storage.embeddings is first.text_memory_storage.embeddings
+
+
+def test_concurrent_calls_on_one_conversation_apply_sessions_once(system):
+    sessions = make_sessions(3)
+    summarize = system.summarizer.chain.invoke.side_effect
+    system.summarizer.chain.invoke.side_effect = lambda params: time.sleep(0.01) or summarize(params)
+    system.process_dialogue(sessions[:1], "query")
+
+    with ThreadPoolExecutor(4) as executor:
+        states = list(executor.map(lambda _: system.process_dialogue(sessions, "query"), range(4)))
+
+    assert system.summarizer.chain.invoke.call_count == 3
+    assert [len(state.text_memory) for state in states] == [3, 3, 3, 3]
+
+
+def test_reset_drops_memory(system):
+    sessions = make_sessions(2)
+
+    system.process_dialogue(sessions, "query")
+    system.reset()
+    system.process_dialogue(sessions, "query")
+
+    assert system.summarizer.chain.invoke.call_count == 4
+
+
+def test_aprocess_dialogue_is_incremental(system):
+    sessions = make_sessions(3)
+
+    asyncio.run(system.aprocess_dialogue(sessions[:2], "query"))
+    state = asyncio.run(system.aprocess_dialogue(sessions, "query"))
+
+    assert system.summarizer.chain.ainvoke.await_count == 3
+    assert system.summarizer.chain.invoke.call_count == 0
+    assert state.response == "Async response"
+
+
+def test_aprocess_many_keeps_dialogues_apart(system):
+    dialogues = [(make_sessions(i + 1), f"query {i}") for i in range(4)]
+
+    states = asyncio.run(system.aprocess_many(dialogues, concurrency=2))
+
+    assert [state.query for state in states] == [query for _, query in dialogues]
+    assert [len(state.text_memory) for state in states] == [1, 2, 3, 4]
+    assert system.summarizer.chain.ainvoke.await_count == 10
+
+
+def test_concurrent_calls_log_unique_iterations(system):
+    summarize = system.summarizer.chain.invoke.side_effect
+    system.summarizer.chain.invoke.side_effect = lambda params: time.sleep(0.01) or summarize(params)
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda i: system.process_dialogue(make_sessions(1), "query", f"c{i}"), range(16)))
+    asyncio.run(system.aprocess_many([(make_sessions(1), "query") for _ in range(8)], concurrency=4))
+
+    iterations = [call.args[3] for call in system.memory_logger.log_iteration.call_args_list]
+    assert sorted(iterations) == list(range(1, 25))
+    assert system.iteration == 24
+
+
+def test_aprocess_many_rejects_shared_conversation_ids(system):
+    dialogues = [(make_sessions(1), "query"), (make_sessions(2), "query")]
+
+    with pytest.raises(ValueError):
+        asyncio.run(
+            system.aprocess_many(dialogues, conversation_ids=["same", "same"])
+        )
+
+
+@pytest.fixture
+def parallel_memory_bank(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.chdir(tmp_path)
+
+    dialogue_system = MemoryBankDialogueSystem(
+        llm=create_autospec(BaseChatModel),
+        embed_model=DeterministicFakeEmbedding(size=8),
+        parallel_update=True,
+        max_concurrency=3,
+    )
+    dialogue_system.memory_logger = MagicMock()
+
+    def summarize_batch(inputs, config=None):
+        return [
+            MagicMock(summary_messages=[BaseBlock("user", params["session_messages"])])
+            for params in inputs
+        ]
+
+    summarizer_chain = MagicMock()
+    summarizer_chain.batch.side_effect = summarize_batch
+    summarizer_chain.abatch = AsyncMock(side_effect=summarize_batch)
+    dialogue_system.summarizer.chain = summarizer_chain
+
+    response_chain = MagicMock()
+    response_chain.invoke.return_value = "Response"
+    response_chain.ainvoke = AsyncMock(return_value="Async response")
+    dialogue_system.response_generator.chain = response_chain
+
+    return dialogue_system
+
+
+def test_parallel_memory_bank_summarizes_sessions_in_one_batch(parallel_memory_bank):
+    sessions = make_sessions(4)
+
+    state = parallel_memory_bank.process_dialogue(sessions, "query")
+
+    summarizer_chain = parallel_memory_bank.summarizer.chain
+    summarizer_chain.batch.assert_called_once()
+    assert summarizer_chain.batch.call_args.kwargs["config"] == {"max_concurrency": 3}
+    assert [
+        fragment.session_id for fragment in state.text_memory_storage.memory_list
+    ] == [0, 1, 2, 3]
+    assert state.text_memory_storage.get_session_memory(2) == ["user: message 2"]
+
+
+def test_parallel_memory_bank_async_only_summarizes_new_sessions(parallel_memory_bank):
+    sessions = make_sessions(3)
+
+    asyncio.run(parallel_memory_bank.aprocess_dialogue(sessions[:1], "query"))
+    state = asyncio.run(parallel_memory_bank.aprocess_dialogue(sessions, "query"))
+
+    batches = parallel_memory_bank.summarizer.chain.abatch.await_args_list
+    assert [len(call.args[0]) for call in batches] == [1, 2]
+    assert state.text_memory_storage.get_memory_count() == 3
+    assert state.response == "Async response"
+
+
+@pytest.mark.parametrize("run_async", [False, True])
+def test_query_is_embedded_once_for_all_storages(monkeypatch, tmp_path, run_async):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.chdir(tmp_path)
+
+    embeddings = QueryCountingEmbedding(size=8)
+    embeddings.queries = []
+    dialogue_system = MemoryBankDialogueSystem(
+        llm=create_autospec(BaseChatModel),
+        embed_code=True,
+        embed_tool=True,
+        embed_model=embeddings,
+        parallel_update=True,
+    )
+    dialogue_system.memory_logger = MagicMock()
+
+    def summarize_batch(inputs, config=None):
+        return [MagicMock(summary_messages=[BaseBlock("user", "summary")]) for _ in inputs]
+
+    dialogue_system.summarizer.chain = MagicMock()
+    dialogue_system.summarizer.chain.batch.side_effect = summarize_batch
+    dialogue_system.summarizer.chain.abatch = AsyncMock(side_effect=summarize_batch)
+    dialogue_system.response_generator.chain = MagicMock()
+    dialogue_system.response_generator.chain.invoke.return_value = "Response"
+    dialogue_system.response_generator.chain.ainvoke = AsyncMock(return_value="Response")
+
+    sessions = [
+        Session(
+            [
+                BaseBlock("user", "hello"),
+                CodeBlock("assistant", "Example", code="print(1)"),
+                ToolCallBlock("tool_call", "Ran it", id="1", name="run", arguments="", response="1"),
+            ]
+        )
+    ]
+
+    if run_async:
+        asyncio.run(dialogue_system.aprocess_dialogue(sessions, "query"))
+    else:
+        dialogue_system.process_dialogue(sessions, "query")
+
+    assert embeddings.queries == ["query"]
+    inputs = dialogue_system.response_generator.chain.ainvoke.await_args
+    if not run_async:
+        inputs = dialogue_system.response_generator.chain.invoke.call_args
+    assert inputs.args[0]["code_memory"] == "print(1)"
+    assert inputs.args[0]["tool_memory"] == "Ran it"
+
+
+def test_concurrent_async_calls_on_one_conversation_apply_sessions_once(system):
+    sessions = make_sessions(3)
+
+    async def run():
+        return await asyncio.gather(*(system.aprocess_dialogue(sessions, "query") for _ in range(3)))
+
+    states = asyncio.run(run())
+
+    assert system.summarizer.chain.ainvoke.await_count == 3
+    assert [len(state.text_memory) for state in states] == [3, 3, 3]
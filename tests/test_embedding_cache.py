@@ -0,0 +1,101 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.summarize_algorithms.core.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    calls: list[list[str]] = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def inner():
+    embeddings = CountingEmbeddings(size=8)
+    embeddings.calls = []
+    return embeddings
+
+
+def test_only_misses_are_embedded_in_one_request(inner, tmp_path):
+    cached = CachedEmbeddings(inner, cache_dir=str(tmp_path))
+
+    cached.embed_documents(["a", "b"])
+    result = cached.embed_documents(["b", "c", "a", "c"])
+
+    assert inner.calls == [["a", "b"], ["c"]]
+    assert np.allclose(result, inner.embed_documents(["b", "c", "a", "c"]))
+
+
+def test_vectors_are_read_back_from_disk(inner, tmp_path):
+    first = CachedEmbeddings(inner, cache_dir=str(tmp_path), model="fake")
+    expected = first.embed_documents(["code block", "tool output"])
+
+    second = CachedEmbeddings(inner, cache_dir=str(tmp_path), model="fake")
+    result = second.embed_documents(["tool output", "code block"])
+
+    assert len(inner.calls) == 1
+    assert np.allclose(result, expected[::-1])
+    assert second.hits == 2
+    assert second.misses == 0
+
+
+def test_models_do_not_share_vectors(inner, tmp_path):
+    CachedEmbeddings(inner, cache_dir=str(tmp_path), model="first").embed_documents(["a"])
+    CachedEmbeddings(inner, cache_dir=str(tmp_path), model="second").embed_documents(["a"])
+
+    assert len(inner.calls) == 2
+
+
+def test_memory_tier_is_bounded(inner, tmp_path):
+    cached = CachedEmbeddings(inner, cache_dir=str(tmp_path), memory_cache_size=2)
+
+    cached.embed_documents(["a", "b", "c"])
+    result = cached.embed_documents(["a"])
+
+    assert len(cached._memory) == 2
+    assert len(inner.calls) == 1
+    assert np.allclose(result, inner.embed_documents(["a"]))
+
+
+def test_async_queries_are_cached(inner, tmp_path):
+    cached = CachedEmbeddings(inner, cache_dir=str(tmp_path))
+
+    first = asyncio.run(cached.aembed_query("query"))
+    second = cached.embed_query("query")
+
+    assert first == second
+    assert cached.hits == 1
+
+
+def test_torn_write_is_truncated_to_whole_rows(inner, tmp_path):
+    first = CachedEmbeddings(inner, cache_dir=str(tmp_path), model="fake")
+    first.embed_documents(["a", "b"])
+    store = first._store
+    with open(store.vectors_path, "ab") as f:
+        f.write(np.ones(8, dtype=np.float32).tobytes() + b"\0\0")
+
+    second = CachedEmbeddings(inner, cache_dir=str(tmp_path), model="fake")
+    second.embed_documents(["c"])
+    third = CachedEmbeddings(inner, cache_dir=str(tmp_path), model="fake")
+
+    assert store.keys_path.stat().st_size == 3 * 32
+    assert store.vectors_path.stat().st_size == 3 * 8 * 4
+    assert np.allclose(third.embed_documents(["a", "b", "c"]), inner.embed_documents(["a", "b", "c"]))
+    assert third.misses == 0
+
+
+def test_duplicate_digests_get_one_row(tmp_path):
+    store = CachedEmbeddings(DeterministicFakeEmbedding(size=4), cache_dir=str(tmp_path))._store
+    vectors = np.arange(12, dtype=np.float32).reshape(3, 4)
+
+    store.put_many([b"a" * 32, b"a" * 32, b"b" * 32], vectors)
+
+    assert len(store) == 2
+    assert np.allclose(store.get(b"b" * 32), vectors[2])
@@ -0,0 +1,73 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from langchain_community.callbacks import get_openai_callback
+from langchain_core.prompts import PromptTemplate
+
+from src.benchmarking.fake_models import FakeChatModel, HashingEmbeddings
+from src.benchmarking.llm_evaluation import LLMMemoryEvaluation, PairwiseResult
+from src.summarize_algorithms.memory_bank.summarizer import SessionMemory
+from src.summarize_algorithms.recsum.dialogue_system import RecsumDialogueSystem
+
+PROMPT = PromptTemplate.from_template("Summarize {dialogue}")
+
+
+def test_structured_output_follows_schema():
+    llm = FakeChatModel()
+
+    memory = (PROMPT | llm.with_structured_output(SessionMemory)).invoke({"dialogue": "hi"})
+    pairwise = (PROMPT | llm.with_structured_output(PairwiseResult)).invoke({"dialogue": "hi"})
+
+    assert 1 <= len(memory.summary_messages) <= 3
+    assert isinstance(pairwise, PairwiseResult)
+
+
+def test_responses_are_deterministic_per_prompt_and_seed():
+    chain = PROMPT | FakeChatModel(completion_tokens=6)
+
+    first = chain.invoke({"dialogue": "a"}).content
+
+    assert chain.invoke({"dialogue": "a"}).content == first
+    assert len(first.split()) == 6
+    assert (PROMPT | FakeChatModel(completion_tokens=6, seed=1)).invoke({"dialogue": "a"}).content != first
+
+
+def test_token_counts_reach_openai_callback():
+    llm = FakeChatModel(prompt_tokens=11, completion_tokens=7)
+
+    with get_openai_callback() as cb:
+        (PROMPT | llm).invoke({"dialogue": "hi"})
+        asyncio.run((PROMPT | llm).ainvoke({"dialogue": "hi"}))
+
+    assert (cb.prompt_tokens, cb.completion_tokens) == (22, 14)
+    assert llm.stats.calls == 2
+
+
+def test_latency_is_recorded():
+    llm = FakeChatModel(latency=0.01)
+
+    (PROMPT | llm).invoke({"dialogue": "hi"})
+
+    assert llm.stats.seconds >= 0.01
+
+
+def test_hashing_embeddings_are_normalized_and_stable():
+    embeddings = HashingEmbeddings(size=32)
+
+    vectors = np.array(embeddings.embed_documents(["fix the cache", "fix the cache", "", "kotlin build"]))
+
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    assert np.array_equal(vectors[0], vectors[1])
+    assert vectors[0] @ vectors[3] < 1.0
+    assert embeddings.embed_query("fix the cache") == pytest.approx(vectors[0].tolist())
+
+
+def test_components_need_no_api_key_with_injected_backends(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr("src.summarize_algorithms.core.base_dialogue_system.load_dotenv", lambda: None)
+    monkeypatch.setattr("src.benchmarking.llm_evaluation.load_dotenv", lambda: None)
+
+    RecsumDialogueSystem(llm=FakeChatModel(), embed_model=HashingEmbeddings())
+    LLMMemoryEvaluation(llm=FakeChatModel())
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from langchain_core.prompts import PromptTemplate
+
+from src.benchmarking.baseline import DialogueBaseline
+from src.benchmarking.fake_models import FakeChatModel, HashingEmbeddings
+from src.benchmarking.throughput import make_dialogues
+from src.summarize_algorithms.core.instrumentation import (
+    Instrumentation,
+    StageStats,
+    instrumented,
+)
+from src.summarize_algorithms.memory_bank.dialogue_system import (
+    MemoryBankDialogueSystem,
+)
+from src.summarize_algorithms.recsum.dialogue_system import RecsumDialogueSystem
+
+
+class Worker:
+    def __init__(self, instrumentation):
+        self.instrumentation = instrumentation
+
+    @instrumented("work")
+    def work(self, value):
+        return value * 2
+
+    @instrumented("work")
+    async def awork(self, value):
+        return value * 3
+
+
+@pytest.fixture(autouse=True)
+def logs_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def test_stage_stats_percentiles():
+    stats = StageStats(durations=[i / 1000 for i in range(1, 101)])
+
+    summary = stats.summary()
+
+    assert summary["calls"] == 100
+    assert summary["p50_ms"] == pytest.approx(50.5)
+    assert summary["p95_ms"] == pytest.approx(95.05)
+    assert summary["p99_ms"] == pytest.approx(99.01)
+    assert summary["max_ms"] == pytest.approx(100)
+
+
+def test_empty_stage_summary_is_zero():
+    assert StageStats().summary()["p99_ms"] == 0.0
+
+
+def test_instrumented_methods_record_sync_and_async_calls():
+    instrumentation = Instrumentation()
+    worker = Worker(instrumentation)
+
+    assert worker.work(2) == 4
+    assert asyncio.run(worker.awork(2)) == 6
+    assert Worker(None).work(1) == 2
+
+    assert instrumentation.summary()["work"]["calls"] == 2
+
+
+def test_callback_handler_records_llm_tokens():
+    instrumentation = Instrumentation()
+    chain = PromptTemplate.from_template("{x}") | FakeChatModel(prompt_tokens=5, completion_tokens=3)
+
+    chain.invoke({"x": "hi"}, config={"callbacks": [instrumentation.callback_handler()]})
+
+    llm = instrumentation.summary()["llm"]
+    assert (llm["calls"], llm["prompt_tokens"], llm["completion_tokens"]) == (1, 5, 3)
+
+
+def test_dialogue_system_records_every_stage():
+    system = MemoryBankDialogueSystem(
+        llm=FakeChatModel(), embed_model=HashingEmbeddings(), embed_code=True
+    )
+    sessions = make_dialogues(1, n_sessions=3)[0]
+
+    system.process_dialogue(sessions, "what did we fix?")
+
+    summary = system.latency_summary()
+    assert summary["update_memory"]["calls"] == 3
+    assert summary["generate_response"]["calls"] == 1
+    assert summary["llm"]["calls"] == 4
+    assert summary["llm"]["completion_tokens"] == 4 * 32
+    assert summary["memory_storage.add_memory"]["calls"] == 3
+    assert summary["memory_storage.search"]["calls"] == 1
+    assert summary["embeddings"]["calls"] == 4
+    assert summary["graph_overhead"]["total_ms"] <= summary["process_dialogue"]["total_ms"]
+
+
+def test_async_dialogue_records_llm_calls():
+    system = RecsumDialogueSystem(llm=FakeChatModel(), embed_model=HashingEmbeddings())
+    sessions = make_dialogues(1, n_sessions=2)[0]
+
+    asyncio.run(system.aprocess_dialogue(sessions, "query"))
+
+    summary = system.latency_summary()
+    assert summary["update_memory"]["calls"] == 2
+    assert summary["llm"]["calls"] == 3
+
+
+def test_baseline_records_response_latency():
+    baseline = DialogueBaseline("baseline", llm=FakeChatModel())
+
+    baseline.process_dialogue(make_dialogues(1)[0], "query")
+
+    assert set(baseline.latency_summary()) == {"build_context", "generate_response", "llm"}
@@ -0,0 +1,154 @@
+import gzip
+import json
+
+import pytest
+
+from src.benchmarking.baseline_logger import BaselineLogger
+from src.benchmarking.fake_models import FakeChatModel, HashingEmbeddings
+from src.benchmarking.jsonl_writer import BackgroundJSONLWriter, get_writer
+from src.benchmarking.memory_logger import MemoryLogger
+from src.benchmarking.throughput import make_dialogues
+from src.summarize_algorithms.memory_bank.dialogue_system import (
+    MemoryBankDialogueSystem,
+)
+
+
+def read_lines(path):
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_writer_appends_compact_jsonl(tmp_path):
+    with BackgroundJSONLWriter(tmp_path, run_id="run") as writer:
+        for i in range(5):
+            writer.write({"i": i, "text": "héllo"})
+
+    path = tmp_path / "run.jsonl"
+    assert [record["i"] for record in read_lines(path)] == list(range(5))
+    assert "\n    " not in path.read_text(encoding="utf-8")
+    assert "héllo" in path.read_text(encoding="utf-8")
+
+
+def test_writer_flush_makes_records_visible(tmp_path):
+    writer = BackgroundJSONLWriter(tmp_path, run_id="run")
+
+    writer.write({"i": 1})
+    writer.flush()
+
+    assert read_lines(writer.path) == [{"i": 1}]
+    writer.close()
+
+
+def test_writer_rotates_when_file_is_full(tmp_path):
+    with BackgroundJSONLWriter(tmp_path, run_id="run", max_bytes=40) as writer:
+        for i in range(6):
+            writer.write({"value": f"{i:020d}"})
+
+    files = [tmp_path / "run.jsonl"] + [tmp_path / f"run.{part}.jsonl" for part in range(1, 6)]
+    assert sorted(tmp_path.iterdir()) == sorted(files)
+    assert [read_lines(path)[0]["value"] for path in files] == [f"{i:020d}" for i in range(6)]
+
+
+def test_writer_compresses_output(tmp_path):
+    with BackgroundJSONLWriter(tmp_path, run_id="run", compress=True) as writer:
+        writer.write({"i": 1})
+
+    assert read_lines(tmp_path / "run.jsonl.gz") == [{"i": 1}]
+
+
+def test_closed_writer_rejects_records(tmp_path):
+    writer = BackgroundJSONLWriter(tmp_path, run_id="run")
+    writer.close()
+    writer.close()
+
+    with pytest.raises(ValueError):
+        writer.write({"i": 1})
+
+
+def test_writer_survives_unserializable_records(tmp_path):
+    with BackgroundJSONLWriter(tmp_path, run_id="run") as writer:
+        writer.write({"value": object()})
+        writer.write({"i": 2})
+
+    assert read_lines(tmp_path / "run.jsonl")[1] == {"i": 2}
+
+
+def read_payloads(path, records):
+    data = path.read_bytes()
+    return [
+        data[record["payload"]["offset"] : record["payload"]["offset"] + record["payload"]["nbytes"]]
+        for record in records
+    ]
+
+
+def test_reused_run_id_continues_payload_offsets(tmp_path):
+    for payload in (b"first", b"second"):
+        with BackgroundJSONLWriter(tmp_path, run_id="run") as writer:
+            writer.write({"payload_name": payload.decode()}, payload)
+
+    records = read_lines(tmp_path / "run.jsonl")
+    assert read_payloads(tmp_path / "run.bin", records) == [b"first", b"second"]
+
+
+class TornFile:
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, data):
+        self.file.write(data[:2])
+        raise OSError("disk full")
+
+    def close(self):
+        self.file.close()
+
+
+def test_failed_payload_write_does_not_shift_offsets(tmp_path, monkeypatch):
+    writer = BackgroundJSONLWriter(tmp_path, run_id="run")
+    open_payload = writer._open_payload
+    monkeypatch.setattr(writer, "_open_payload", lambda: TornFile(open_payload()))
+    writer.write({"i": 1}, b"lost")
+    writer.flush()
+    monkeypatch.setattr(writer, "_open_payload", open_payload)
+    writer.write({"i": 2}, b"kept")
+    writer.close()
+
+    records = read_lines(tmp_path / "run.jsonl")
+    assert [record["i"] for record in records] == [2]
+    assert read_payloads(tmp_path / "run.bin", records) == [b"kept"]
+
+
+def test_loggers_share_one_writer_per_run(tmp_path):
+    first = MemoryLogger(str(tmp_path), run_id="shared")
+    second = MemoryLogger(str(tmp_path), run_id="shared")
+
+    assert first.writer is second.writer
+    assert get_writer(tmp_path, "other") is not first.writer
+
+
+def test_memory_logger_writes_session_deltas(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    system = MemoryBankDialogueSystem(llm=FakeChatModel(), embed_model=HashingEmbeddings())
+    system.memory_logger = MemoryLogger(str(tmp_path / "memory"), run_id="run")
+    sessions = make_dialogues(1, n_sessions=3)[0]
+
+    system.process_dialogue(sessions[:2], "first")
+    system.process_dialogue(sessions, "second")
+    system.memory_logger.flush()
+
+    records = read_lines(tmp_path / "memory" / "run.jsonl")
+    assert [record["query"] for record in records] == ["first", "second"]
+    assert [(r["session_offset"], len(r["sessions"])) for r in records] == [(0, 2), (2, 1)]
+    assert "text_memory_storage" in records[1]["memory"]
+
+
+def test_baseline_logger_restarts_offsets_for_new_dialogues(tmp_path):
+    logger = BaselineLogger(str(tmp_path), run_id="run")
+    first, second = make_dialogues(2, n_sessions=2)
+
+    logger.log_iteration("baseline", "q", 1, first)
+    logger.log_iteration("baseline", "q", 2, second)
+    logger.flush()
+
+    records = read_lines(tmp_path / "run.jsonl")
+    assert [(r["session_offset"], len(r["sessions"])) for r in records] == [(0, 2), (0, 2)]
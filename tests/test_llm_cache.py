@@ -0,0 +1,153 @@
+import asyncio
+import threading
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableLambda
+
+from src.summarize_algorithms.core.llm_cache import LLMResponseCache
+from src.summarize_algorithms.core.models import BaseBlock
+from src.summarize_algorithms.memory_bank.summarizer import SessionMemory
+
+PROMPT = PromptTemplate.from_template("Summarize: {text}")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    llm_cache = LLMResponseCache(str(tmp_path / "cache.sqlite"))
+    yield llm_cache
+    llm_cache.close()
+
+
+@pytest.fixture
+def llm():
+    return MagicMock(model_name="gpt-test", temperature=0.0)
+
+
+def counting_chain(calls, output):
+    def run(params):
+        calls.append(params)
+        return output(params)
+
+    return RunnableLambda(run)
+
+
+def test_repeated_prompt_is_served_from_cache(cache, llm):
+    calls = []
+    chain = cache.wrap(counting_chain(calls, lambda p: p["text"].upper()), llm, PROMPT)
+
+    assert chain.invoke({"text": "hello"}) == "HELLO"
+    assert chain.invoke({"text": "hello"}) == "HELLO"
+    assert chain.invoke({"text": "world"}) == "WORLD"
+
+    assert len(calls) == 2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_structured_output_is_revived(cache, llm):
+    calls = []
+    output = SessionMemory(summary_messages=[BaseBlock("user", "likes tea")])
+    chain = cache.wrap(counting_chain(calls, lambda p: output), llm, PROMPT, SessionMemory)
+
+    chain.invoke({"text": "hello"})
+    cached = chain.invoke({"text": "hello"})
+
+    assert len(calls) == 1
+    assert isinstance(cached, SessionMemory)
+    assert cached.summary_messages[0].content == "likes tea"
+
+
+def test_key_depends_on_model_and_schema(cache, llm):
+    calls = []
+    chain = cache.wrap(counting_chain(calls, lambda p: "answer"), llm, PROMPT)
+    other_model = cache.wrap(
+        counting_chain(calls, lambda p: "answer"),
+        MagicMock(model_name="gpt-other", temperature=0.0),
+        PROMPT,
+    )
+
+    chain.invoke({"text": "hello"})
+    other_model.invoke({"text": "hello"})
+
+    assert len(calls) == 2
+
+
+def test_cache_persists_between_instances(tmp_path, llm):
+    path = str(tmp_path / "cache.sqlite")
+    calls = []
+
+    first = LLMResponseCache(path)
+    first.wrap(counting_chain(calls, lambda p: "answer"), llm, PROMPT).invoke({"text": "a"})
+    first.close()
+
+    second = LLMResponseCache(path)
+    result = second.wrap(counting_chain(calls, lambda p: "other"), llm, PROMPT).invoke(
+        {"text": "a"}
+    )
+    second.close()
+
+    assert result == "answer"
+    assert len(calls) == 1
+
+
+def test_disabled_cache_is_bypassed(cache, llm):
+    calls = []
+    chain = cache.wrap(counting_chain(calls, lambda p: "answer"), llm, PROMPT)
+    cache.enabled = False
+
+    chain.invoke({"text": "hello"})
+    chain.invoke({"text": "hello"})
+
+    assert len(calls) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, llm):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite"), max_size_bytes=25)
+    calls = []
+    chain = cache.wrap(counting_chain(calls, lambda p: p["text"] * 10), llm, PROMPT)
+
+    chain.invoke({"text": "a"})
+    chain.invoke({"text": "b"})
+    chain.invoke({"text": "a"})
+    chain.invoke({"text": "c"})
+    chain.invoke({"text": "a"})
+    chain.invoke({"text": "b"})
+
+    assert [call["text"] for call in calls] == ["a", "b", "c", "b"]
+    assert cache.stats()["size_bytes"] <= 25
+    cache.close()
+
+
+def test_async_invoke_uses_cache(cache, llm):
+    calls = []
+    chain = cache.wrap(counting_chain(calls, lambda p: "answer"), llm, PROMPT)
+
+    chain.invoke({"text": "hello"})
+    result = asyncio.run(chain.ainvoke({"text": "hello"}))
+
+    assert result == "answer"
+    assert len(calls) == 1
+
+
+def test_async_cache_io_runs_off_the_event_loop(cache, llm, monkeypatch):
+    threads = []
+    lookup, update = cache.lookup, cache.update
+    monkeypatch.setattr(cache, "lookup", lambda key: threads.append(threading.get_ident()) or lookup(key))
+    monkeypatch.setattr(cache, "update", lambda key, value: threads.append(threading.get_ident()) or update(key, value))
+    chain = cache.wrap(counting_chain([], lambda p: p["text"]), llm, PROMPT)
+
+    async def run():
+        loop_thread = threading.get_ident()
+        results = await chain.abatch([{"text": str(i)} for i in range(4)])
+        return loop_thread, results
+
+    loop_thread, results = asyncio.run(run())
+
+    assert results == ["0", "1", "2", "3"]
+    assert len(threads) == 8
+    assert loop_thread not in threads
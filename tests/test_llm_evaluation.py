@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+
+from unittest.mock import create_autospec
+
+import pytest
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import RunnableLambda
+
+from src.benchmarking.llm_evaluation import (
+    ComparisonResult,
+    LLMChatAgentEvaluation,
+    LLMMemoryEvaluation,
+    PairwiseChatAgentResult,
+    SingleResult,
+)
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+
+def single_chat_result(params):
+    if params["assistant_answer"] == "broken":
+        raise RuntimeError("rate limited")
+    score = int(params["assistant_answer"])
+    return {"correctness_score": score, "clarity_score": score, "context_handling_score": score}
+
+
+@pytest.fixture
+def evaluator():
+    chat_evaluation = LLMChatAgentEvaluation(llm=create_autospec(BaseChatModel))
+    chat_evaluation.single_eval_chain = RunnableLambda(single_chat_result)
+    chat_evaluation.pairwise_eval_chain = RunnableLambda(
+        lambda params: PairwiseChatAgentResult(
+            correctness=ComparisonResult.OPTION_1_BETTER,
+            clarity=ComparisonResult.DRAW,
+            context_handling=ComparisonResult.OPTION_2_BETTER,
+        )
+    )
+    return chat_evaluation
+
+
+def test_single_many_keeps_input_order_and_reports_errors_per_item(evaluator):
+    results = evaluator.evaluate_single_many(
+        [("context", "3"), ("context", "broken"), ("context", "1")]
+    )
+
+    assert results[0]["correctness_score"] == 3
+    assert isinstance(results[1], ConnectionError)
+    assert "rate limited" in str(results[1])
+    assert results[2]["correctness_score"] == 1
+
+
+def test_pairwise_many_builds_params_like_evaluate_pairwise(evaluator):
+    results = evaluator.evaluate_pairwise_many([("context", "a", "b"), ("context", "b", "a")])
+
+    assert [result.correctness for result in results] == [ComparisonResult.OPTION_1_BETTER] * 2
+
+
+def test_async_many_matches_sync(evaluator):
+    items = [("context", str(i)) for i in range(5)]
+
+    results = asyncio.run(evaluator.aevaluate_single_many(items, max_concurrency=2))
+
+    assert results == evaluator.evaluate_single_many(items)
+
+
+def test_batch_respects_max_concurrency():
+    evaluation = LLMMemoryEvaluation(llm=create_autospec(BaseChatModel))
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def judge(params):
+        with lock:
+            running.append(params)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.remove(params)
+        return SingleResult(faithfulness_score=1, informativeness_score=1, coherency_score=1)
+
+    evaluation.single_eval_chain = RunnableLambda(judge)
+
+    results = evaluation.evaluate_single_many(
+        [("ideal", f"memory {i}") for i in range(8)], max_concurrency=3
+    )
+
+    assert len(results) == 8
+    assert max(peak) <= 3
@@ -0,0 +1,67 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from datasets import Dataset
+
+from src.benchmarking import deserialize_mcp_data
+from src.benchmarking.deserialize_mcp_data import MCPDataset
+
+N_DIALOGUES = 6
+
+
+def make_rows():
+    rows: dict[str, list] = {"session_id": [], "dialogue": [], "speaker": [], "persona1": [], "persona2": []}
+    for dialogue in range(N_DIALOGUES):
+        for session in range(4):
+            rows["session_id"].append(session)
+            rows["dialogue"].append([f"d{dialogue} s{session} hi", f"d{dialogue} s{session} hello"])
+            rows["speaker"].append(["Speaker 1", "Speaker 2"])
+            rows["persona1"].append([f"d{dialogue} s{session} user fact"])
+            rows["persona2"].append([f"d{dialogue} s{session} assistant fact"])
+    return Dataset.from_dict(rows)
+
+
+@pytest.fixture
+def load_dataset(monkeypatch):
+    loader = MagicMock(return_value=make_rows())
+    monkeypatch.setattr(deserialize_mcp_data, "load_dataset", loader)
+    return loader
+
+
+def first_messages(dataset):
+    return [sessions[0].messages[0].content for sessions in dataset.sessions]
+
+
+def test_unshuffled_selection_takes_first_dialogues(load_dataset, tmp_path):
+    dataset = MCPDataset(2, shuffle=False, cache_dir=str(tmp_path))
+
+    assert first_messages(dataset) == ["d0 s0 hi", "d1 s0 hi"]
+    assert [len(sessions) for sessions in dataset.sessions] == [4, 4]
+    assert dataset.memory[1][3].memory == ["d1 s3 user fact", "d1 s3 assistant fact"]
+
+
+def test_seeded_selection_is_reproducible(load_dataset):
+    first = MCPDataset(3, seed=7, cache_dir=None)
+    second = MCPDataset(3, seed=7, cache_dir=None)
+
+    assert first_messages(first) == first_messages(second)
+
+
+def test_cached_subset_skips_download(load_dataset, tmp_path):
+    first = MCPDataset(3, seed=1, cache_dir=str(tmp_path))
+    expected = first_messages(first)
+
+    cached = MCPDataset(3, seed=1, cache_dir=str(tmp_path))
+
+    assert first_messages(cached) == expected
+    assert cached.memory == first.memory
+    assert load_dataset.call_count == 1
+
+
+def test_unseeded_shuffle_is_not_cached(load_dataset, tmp_path):
+    dataset = MCPDataset(2, cache_dir=str(tmp_path))
+
+    assert len(dataset.sessions) == 2
+    assert dataset.cache_path is None
+    assert list(tmp_path.iterdir()) == []
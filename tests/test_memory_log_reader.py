@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+
+from src.benchmarking.fake_models import FakeChatModel, HashingEmbeddings
+from src.benchmarking.memory_log_reader import MemoryLogReader
+from src.benchmarking.memory_logger import MemoryLogger
+from src.benchmarking.throughput import make_dialogues
+from src.summarize_algorithms.memory_bank.dialogue_system import (
+    MemoryBankDialogueSystem,
+)
+from src.summarize_algorithms.recsum.dialogue_system import RecsumDialogueSystem
+
+
+@pytest.fixture(autouse=True)
+def logs_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def attach_logger(system, tmp_path, **kwargs):
+    system.memory_logger = MemoryLogger(str(tmp_path / "memory"), run_id="run", **kwargs)
+    return MemoryLogReader(tmp_path / "memory", "run")
+
+
+def snapshot(system, sessions):
+    storage = system.state.text_memory_storage
+    return (
+        [session.to_dict() for session in sessions],
+        storage.to_dict()["memory_list"],
+        storage.get_vectors(),
+    )
+
+
+def run_growing_dialogue(system, sessions):
+    snapshots = []
+    for i in range(1, len(sessions) + 1):
+        system.process_dialogue(sessions[:i], f"query {i}")
+        snapshots.append(snapshot(system, sessions[:i]))
+    system.memory_logger.flush()
+    return snapshots
+
+
+@pytest.fixture
+def memory_bank():
+    return MemoryBankDialogueSystem(
+        llm=FakeChatModel(), embed_model=HashingEmbeddings(size=16), max_session_id=8
+    )
+
+
+def test_reader_reconstructs_every_iteration(memory_bank, tmp_path):
+    reader = attach_logger(memory_bank, tmp_path)
+    snapshots = run_growing_dialogue(memory_bank, make_dialogues(1, n_sessions=4)[0])
+
+    assert reader.iterations("MemoryBankDialogueSystem") == [1, 2, 3, 4]
+    for iteration, (sessions, fragments, vectors) in enumerate(snapshots, start=1):
+        state = reader.reconstruct("MemoryBankDialogueSystem", iteration)
+        storage = state.storages["text_memory_storage"]
+        assert state.query == f"query {iteration}"
+        assert state.sessions == sessions
+        assert storage.to_dict()["memory_list"] == fragments
+        np.testing.assert_allclose(storage.vectors, vectors)
+
+
+def test_records_only_contain_new_fragments(memory_bank, tmp_path):
+    reader = attach_logger(memory_bank, tmp_path)
+    snapshots = run_growing_dialogue(memory_bank, make_dialogues(1, n_sessions=3)[0])
+
+    records = list(reader.records())
+    counts = [len(fragments) for _, fragments, _ in snapshots]
+    deltas = [record["memory"]["text_memory_storage"] for record in records]
+    assert [delta["offset"] for delta in deltas] == [0] + counts[:-1]
+    assert [len(delta["fragments"]) for delta in deltas] == np.diff([0] + counts).tolist()
+    assert [len(record["sessions"]) for record in records] == [1, 1, 1]
+    assert (tmp_path / "memory" / "run.bin").stat().st_size == counts[-1] * 16 * 4
+
+
+def test_new_conversation_starts_from_scratch(memory_bank, tmp_path):
+    reader = attach_logger(memory_bank, tmp_path)
+    first, second = make_dialogues(2, n_sessions=2)
+
+    memory_bank.process_dialogue(first, "first")
+    memory_bank.process_dialogue(second, "second")
+    memory_bank.memory_logger.flush()
+
+    state = reader.reconstruct("MemoryBankDialogueSystem", 2)
+    _, fragments, vectors = snapshot(memory_bank, second)
+    assert list(reader.records())[1]["memory"]["text_memory_storage"]["offset"] == 0
+    assert state.sessions == [session.to_dict() for session in second]
+    assert state.storages["text_memory_storage"].to_dict()["memory_list"] == fragments
+    np.testing.assert_allclose(state.storages["text_memory_storage"].vectors, vectors)
+
+
+def test_reader_handles_rotated_compressed_logs(memory_bank, tmp_path):
+    reader = attach_logger(memory_bank, tmp_path, max_bytes=1, compress=True)
+    snapshots = run_growing_dialogue(memory_bank, make_dialogues(1, n_sessions=3)[0])
+
+    assert len(reader.files) == 3
+    state = reader.reconstruct("MemoryBankDialogueSystem", 3)
+    assert state.storages["text_memory_storage"].to_dict()["memory_list"] == snapshots[-1][1]
+
+
+def test_reader_reconstructs_recsum_text_memory(tmp_path):
+    system = RecsumDialogueSystem(llm=FakeChatModel(), embed_model=HashingEmbeddings())
+    reader = attach_logger(system, tmp_path)
+    sessions = make_dialogues(1, n_sessions=3)[0]
+
+    memories = []
+    for i in range(1, 4):
+        system.process_dialogue(sessions[:i], "query")
+        memories.append([list(memory) for memory in system.state.text_memory])
+    system.memory_logger.flush()
+
+    replayed = [state.text_memory for state in reader.replay("RecsumDialogueSystem")]
+    assert replayed == memories
+
+
+def test_conversations_are_tracked_separately(memory_bank, tmp_path):
+    reader = attach_logger(memory_bank, tmp_path)
+    first, second = make_dialogues(2, n_sessions=2)
+
+    memory_bank.process_dialogue(first, "a", conversation_id="a")
+    memory_bank.process_dialogue(second, "b", conversation_id="b")
+    memory_bank.memory_logger.flush()
+
+    assert reader.conversations() == [
+        ("MemoryBankDialogueSystem", "a"),
+        ("MemoryBankDialogueSystem", "b"),
+    ]
+    assert reader.reconstruct("MemoryBankDialogueSystem", 2, "b").query == "b"
+
+
+def test_missing_iteration_raises(memory_bank, tmp_path):
+    reader = attach_logger(memory_bank, tmp_path)
+    run_growing_dialogue(memory_bank, make_dialogues(1, n_sessions=1)[0])
+
+    with pytest.raises(KeyError):
+        reader.reconstruct("MemoryBankDialogueSystem", 5)
+
+
+def test_missing_base_record_raises(memory_bank, tmp_path):
+    reader = attach_logger(memory_bank, tmp_path)
+    run_growing_dialogue(memory_bank, make_dialogues(1, n_sessions=3)[0])
+    path = tmp_path / "memory" / "run.jsonl"
+    path.write_text("".join(path.read_text(encoding="utf-8").splitlines(keepends=True)[1:]), encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        MemoryLogReader(tmp_path / "memory", "run").reconstruct("MemoryBankDialogueSystem", 2)
+    assert reader.iterations("MemoryBankDialogueSystem") == [2, 3]
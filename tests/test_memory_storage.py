@@ -0,0 +1,231 @@
+import math
+
+import numpy as np
+import pytest
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.summarize_algorithms.core.memory_storage import MemoryStorage
+from src.summarize_algorithms.core.models import BaseBlock, CodeBlock
+from src.summarize_algorithms.core.recency import ExponentialRecency, NoRecency
+from src.summarize_algorithms.core.vector_index import IndexConfig
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+
+@pytest.fixture
+def embeddings():
+    return DeterministicFakeEmbedding(size=16)
+
+
+@pytest.fixture
+def storage(embeddings):
+    memory_storage = MemoryStorage(embeddings=embeddings, max_session_id=3)
+    memory_storage.add_memory(
+        [BaseBlock("user", "likes tea"), BaseBlock("user", "lives in Paris")], 0
+    )
+    memory_storage.add_memory(
+        [CodeBlock("assistant", "factorial", code="def factorial(n): ...")], 1
+    )
+    return memory_storage
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_and_load_round_trip(storage, embeddings, tmp_path, mmap):
+    storage.save(str(tmp_path / "memory"))
+
+    loaded = MemoryStorage.load(str(tmp_path / "memory"), embeddings=embeddings, mmap=mmap)
+
+    assert loaded.memory_list == storage.memory_list
+    assert loaded.max_session_id == storage.max_session_id
+    assert loaded.find_similar("likes tea", top_k=1) == ["likes tea"]
+    assert loaded.find_similar("factorial", top_k=1) == ["def factorial(n): ..."]
+
+
+def test_loaded_storage_accepts_new_memories(storage, embeddings, tmp_path):
+    storage.save(str(tmp_path / "memory"))
+
+    loaded = MemoryStorage.load(str(tmp_path / "memory"), embeddings=embeddings)
+    loaded.add_memory([BaseBlock("user", "plays chess")], 2)
+    loaded.save(str(tmp_path / "memory"))
+
+    reloaded = MemoryStorage.load(str(tmp_path / "memory"), embeddings=embeddings)
+    assert reloaded.get_memory_count() == 4
+    assert reloaded.get_session_memory(2) == ["plays chess"]
+
+
+def test_empty_storage_round_trip(embeddings, tmp_path):
+    MemoryStorage(embeddings=embeddings).save(str(tmp_path / "memory"))
+
+    loaded = MemoryStorage.load(str(tmp_path / "memory"), embeddings=embeddings)
+
+    assert loaded.index is None
+    assert loaded.find_similar("anything") == []
+
+
+def fill(storage, count):
+    storage.add_memory([BaseBlock("user", f"fact {i}") for i in range(count)], 0)
+
+
+@pytest.mark.parametrize("kind", ["flat", "hnsw", "ivf_flat", "ivf_pq"])
+def test_index_kinds_find_stored_memories(embeddings, kind):
+    storage = MemoryStorage(
+        embeddings=embeddings,
+        index_config=IndexConfig(kind=kind, min_train_size=200, nprobe=64, pq_m=16),
+    )
+    fill(storage, 300)
+
+    assert storage.to_dict()["index_info"]["kind"] == kind
+    assert storage.find_similar("fact 42", top_k=1) == ["fact 42"]
+
+
+def test_auto_index_switches_past_threshold(embeddings):
+    storage = MemoryStorage(
+        embeddings=embeddings,
+        index_config=IndexConfig(kind="auto", auto_threshold=100, auto_kind="ivf_flat", min_train_size=50),
+    )
+    fill(storage, 99)
+    assert storage.to_dict()["index_info"]["kind"] == "flat"
+
+    storage.add_memory([BaseBlock("user", "one more fact")], 1)
+
+    assert storage.to_dict()["index_info"]["kind"] == "ivf_flat"
+    assert storage.index.ntotal == 100
+    assert storage.find_similar("one more fact", top_k=1) == ["one more fact"]
+
+
+def test_trained_index_can_be_extended_after_mmap_load(embeddings, tmp_path):
+    config = IndexConfig(kind="ivf_flat", min_train_size=50)
+    storage = MemoryStorage(embeddings=embeddings, index_config=config)
+    fill(storage, 100)
+    storage.save(str(tmp_path / "memory"))
+
+    loaded = MemoryStorage.load(str(tmp_path / "memory"), embeddings=embeddings, index_config=config)
+    loaded.add_memory([BaseBlock("user", "plays chess")], 1)
+
+    assert loaded.to_dict()["index_info"]["kind"] == "ivf_flat"
+    assert loaded.get_memory_count() == 101
+
+
+def test_evaluate_index_kinds_reports_recall_and_latency(embeddings):
+    storage = MemoryStorage(embeddings=embeddings)
+    fill(storage, 300)
+
+    report = storage.evaluate_index_kinds(top_k=5, n_queries=20)
+
+    assert set(report) == {"flat", "hnsw", "ivf_flat", "ivf_pq"}
+    assert report["flat"]["recall@5"] == 1.0
+    assert all(0.0 <= result["recall@5"] <= 1.0 for result in report.values())
+    assert all(result["mean_latency_ms"] >= 0.0 for result in report.values())
+
+
+def test_unknown_index_kind_is_rejected():
+    with pytest.raises(ValueError):
+        IndexConfig(kind="lsh")
+
+
+def add_sessions(storage):
+    for session_id in range(4):
+        storage.add_memory(
+            [BaseBlock("user", f"session {session_id} fact {i}") for i in range(3)], session_id
+        )
+    storage.add_memory([BaseBlock("user", "late session 0 fact")], 0)
+
+
+@pytest.fixture
+def sessions_storage(embeddings):
+    memory_storage = MemoryStorage(embeddings=embeddings, max_session_id=4)
+    add_sessions(memory_storage)
+    return memory_storage
+
+
+def test_session_memory_uses_offset_table(sessions_storage):
+    assert sessions_storage.get_session_memory(0) == [
+        "session 0 fact 0",
+        "session 0 fact 1",
+        "session 0 fact 2",
+        "late session 0 fact",
+    ]
+    assert sessions_storage.get_session_memory(3) == [f"session 3 fact {i}" for i in range(3)]
+
+
+@pytest.mark.parametrize("kind", ["flat", "hnsw", "ivf_flat"])
+@pytest.mark.parametrize(
+    "session_ids, expected",
+    [
+        ([0], {"session 0 fact 0", "session 0 fact 1", "session 0 fact 2", "late session 0 fact"}),
+        (range(2, 4), {f"session {s} fact {i}" for s in (2, 3) for i in range(3)}),
+    ],
+)
+def test_find_similar_is_restricted_to_sessions(embeddings, kind, session_ids, expected):
+    storage = MemoryStorage(
+        embeddings=embeddings,
+        max_session_id=4,
+        index_config=IndexConfig(kind=kind, min_train_size=10, nlist=2, nprobe=2),
+    )
+    add_sessions(storage)
+
+    results = storage.find_similar("session 1 fact 1", top_k=10, session_ids=session_ids)
+
+    assert set(results) == expected
+
+
+def test_find_similar_with_unknown_sessions_is_empty(sessions_storage):
+    assert sessions_storage.find_similar("session 1 fact 1", session_ids=[7]) == []
+
+
+def test_session_offsets_survive_save_and_load(sessions_storage, embeddings, tmp_path):
+    sessions_storage.save(str(tmp_path / "memory"))
+
+    loaded = MemoryStorage.load(str(tmp_path / "memory"), embeddings=embeddings)
+
+    assert loaded.get_session_memory(0) == sessions_storage.get_session_memory(0)
+    assert loaded.find_similar("session 1 fact 1", top_k=1, session_ids=[1]) == ["session 1 fact 1"]
+
+
+def test_index_stores_unit_vectors(sessions_storage):
+    vectors = sessions_storage.index.reconstruct_n(0, sessions_storage.index.ntotal)
+
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+
+
+def test_recency_prefers_newer_sessions(embeddings):
+    storage = MemoryStorage(embeddings=embeddings, max_session_id=3)
+    storage.add_memory([CodeBlock("assistant", "sort a list", code="old")], 0)
+    storage.add_memory([CodeBlock("assistant", "sort a list", code="new")], 2)
+
+    assert storage.find_similar("sort a list", top_k=1) == ["new"]
+
+    storage.recency_policy = NoRecency()
+    assert set(storage.find_similar("sort a list", top_k=2)) == {"old", "new"}
+
+
+def test_exponential_recency_matches_baked_in_importance(embeddings):
+    storage = MemoryStorage(
+        embeddings=embeddings,
+        max_session_id=3,
+        recency_policy=ExponentialRecency(rate=0.2),
+        overfetch_factor=100,
+    )
+    add_sessions(storage)
+    query = embeddings.embed_query("session 1 fact 1")
+
+    vectors = storage.index.reconstruct_n(0, storage.index.ntotal)
+    unit_query = np.array(query) / np.linalg.norm(query)
+    importance = [
+        math.exp(-0.2 * (1 - (fragment.session_id + 1 / storage.max_session_id + 1)))
+        for fragment in storage.memory_list
+    ]
+    expected = np.argsort(-(vectors @ unit_query) * importance)[:5]
+
+    assert storage.find_similar_by_vector(query, top_k=5) == [
+        storage.memory_list[row].content for row in expected
+    ]
+
+
+def test_negative_recency_rate_is_rejected():
+    with pytest.raises(ValueError):
+        ExponentialRecency(rate=-1.0)
@@ -0,0 +1,84 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.benchmarking.llm_evaluation import ComparisonResult
+from src.benchmarking.pairwise_tournament import (
+    PairwiseTournament,
+    bradley_terry,
+    kendall_tau,
+)
+
+
+def strength_judge(seed):
+    rng = random.Random(seed)
+
+    def judge(pairs):
+        outcomes = []
+        for first, second in pairs:
+            probability = 1 / (1 + 3.0 ** (int(first[1:]) - int(second[1:])))
+            outcomes.append(
+                [
+                    ComparisonResult.OPTION_1_BETTER
+                    if rng.random() < probability
+                    else ComparisonResult.OPTION_2_BETTER
+                    for _ in range(3)
+                ]
+            )
+        return outcomes
+
+    return judge
+
+
+def test_bradley_terry_orders_by_wins():
+    wins = np.array([[0, 3, 3], [0, 0, 2], [0, 1, 0]], dtype=float)
+
+    strengths = bradley_terry(wins)
+
+    assert strengths[0] > strengths[1] > strengths[2]
+
+
+def test_kendall_tau():
+    assert kendall_tau(["a", "b", "c"], ["a", "b", "c"]) == 1.0
+    assert kendall_tau(["a", "b", "c"], ["c", "b", "a"]) == -1.0
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_tournament_uses_fewer_comparisons_than_round_robin(seed):
+    names = [f"s{i}" for i in range(10)]
+    tournament = PairwiseTournament(names, strength_judge(seed), seed=seed)
+
+    matches = tournament.run()
+
+    assert len(matches) < 45
+    assert len({frozenset((match.first, match.second)) for match in matches}) == len(matches)
+    assert all(sum(name in (m.first, m.second) for m in matches) >= 2 for name in names)
+    assert tournament.ranking()[0] in {"s0", "s1"}
+
+
+def test_each_round_pairs_a_system_at_most_once():
+    rounds = []
+
+    def judge(pairs):
+        rounds.append(pairs)
+        return [[ComparisonResult.DRAW] * 3 for _ in pairs]
+
+    PairwiseTournament([f"s{i}" for i in range(7)], judge, seed=0).run()
+
+    for pairs in rounds:
+        systems = [name for pair in pairs for name in pair]
+        assert len(systems) == len(set(systems))
+
+
+def test_comparison_budget_is_respected():
+    tournament = PairwiseTournament(
+        [f"s{i}" for i in range(8)], strength_judge(0), max_comparisons=5, seed=0
+    )
+
+    assert len(tournament.run()) == 5
+
+
+def test_duplicate_names_are_rejected():
+    with pytest.raises(ValueError):
+        PairwiseTournament(["a", "a"], strength_judge(0))
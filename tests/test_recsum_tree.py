@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from src.benchmarking.fake_models import FakeChatModel, HashingEmbeddings
+from src.benchmarking.memory_log_reader import MemoryLogReader
+from src.benchmarking.memory_logger import MemoryLogger
+from src.benchmarking.throughput import ThroughputSuite, make_dialogues
+from src.summarize_algorithms.core.graph_nodes import _merge_plan
+from src.summarize_algorithms.recsum.dialogue_system import RecsumDialogueSystem
+
+
+@pytest.fixture(autouse=True)
+def logs_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def llm():
+    return FakeChatModel()
+
+
+def make_system(llm, **kwargs):
+    return RecsumDialogueSystem(llm=llm, embed_model=HashingEmbeddings(size=16), tree_update=True, **kwargs)
+
+
+def count_merges(system, monkeypatch):
+    pairs = []
+    summarize_many = system.merger.summarize_many
+
+    def recording(batch, max_concurrency=8):
+        pairs.append(len(batch))
+        return summarize_many(batch, max_concurrency)
+
+    monkeypatch.setattr(system.merger, "summarize_many", recording)
+    return pairs
+
+
+@pytest.mark.parametrize(
+    ("children", "dirty", "expected"),
+    [
+        (5, 0, (0, 2, True)),
+        (5, 4, (2, 0, True)),
+        (6, 5, (2, 1, False)),
+        (2, 0, (0, 1, False)),
+    ],
+)
+def test_merge_plan_only_recomputes_dirty_pairs(children, dirty, expected):
+    start, pairs, promoted = _merge_plan([[str(i)] for i in range(children)], dirty)
+
+    assert (start, len(pairs), promoted is not None) == expected
+    assert pairs[:1] == ([(str(2 * start), str(2 * start + 1))] if pairs else [])
+
+
+def test_tree_is_balanced_with_root_as_latest_memory(llm):
+    system = make_system(llm)
+
+    state = system.process_dialogue(make_dialogues(1, n_sessions=5)[0], "query")
+
+    assert [len(level) for level in state.memory_tree] == [3, 2, 1]
+    assert state.memory_tree[0][-1] == state.text_memory[-1]
+    assert len(state.text_memory) == 5
+    assert state.latest_memory == "\n".join(state.memory_tree[-1][0])
+    assert llm.stats.calls == 5 + 2 + 1 + 1 + 1
+
+
+def test_single_session_has_no_tree(llm):
+    system = make_system(llm)
+
+    state = system.process_dialogue(make_dialogues(1, n_sessions=1)[0], "query")
+
+    assert state.memory_tree == []
+    assert state.latest_memory == "\n".join(state.text_memory[0])
+
+
+def test_appending_sessions_recomputes_only_the_right_spine(llm, monkeypatch):
+    system = make_system(llm)
+    merges = count_merges(system, monkeypatch)
+    sessions = make_dialogues(1, n_sessions=8)[0]
+
+    system.process_dialogue(sessions[:7], "query")
+    merges.clear()
+    incremental = system.process_dialogue(sessions, "query")
+
+    assert merges == [1, 1, 1]
+    full = make_system(FakeChatModel()).process_dialogue(sessions, "query")
+    assert incremental.memory_tree == full.memory_tree
+
+
+def test_async_tree_matches_sync_tree(llm):
+    sessions = make_dialogues(1, n_sessions=6)[0]
+
+    state = make_system(llm).process_dialogue(sessions, "query")
+    astate = asyncio.run(make_system(FakeChatModel()).aprocess_dialogue(sessions, "query"))
+
+    assert astate.memory_tree == state.memory_tree
+    assert astate.text_memory == state.text_memory
+
+
+def test_sequential_mode_is_the_default(llm):
+    system = RecsumDialogueSystem(llm=llm, embed_model=HashingEmbeddings(size=16))
+
+    state = system.process_dialogue(make_dialogues(1, n_sessions=3)[0], "query")
+
+    assert state.memory_tree == []
+    assert not hasattr(system, "merger")
+
+
+def test_invalid_concurrency_is_rejected(llm):
+    with pytest.raises(ValueError):
+        make_system(llm, max_concurrency=0)
+
+
+def test_memory_log_reader_reconstructs_tree(llm, tmp_path):
+    system = make_system(llm)
+    system.memory_logger = MemoryLogger(str(tmp_path / "memory"), run_id="run")
+    reader = MemoryLogReader(tmp_path / "memory", "run")
+    first, second = make_dialogues(2, n_sessions=5)
+
+    trees = []
+    for sessions in (first, first[:1], second[:3]):
+        trees.append(system.process_dialogue(sessions, "query").memory_tree)
+    system.memory_logger.flush()
+
+    for iteration, tree in enumerate(trees, start=1):
+        assert reader.reconstruct("RecsumDialogueSystem", iteration).memory_tree == tree
+
+
+def test_throughput_suite_has_tree_benchmark():
+    assert "recsum_tree" in ThroughputSuite(n_dialogues=1).benchmarks
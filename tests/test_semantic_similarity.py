@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+import tiktoken
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.benchmarking import semantic_similarity
+from src.benchmarking.semantic_similarity import SemanticSimilarity
+from src.summarize_algorithms.core import tokenization
+
+ENCODING_NAME = "test_byte_level"
+
+
+@pytest.fixture
+def scorer(monkeypatch):
+    ranks = {bytes([i]): i for i in range(256)}
+    for merged in [b"he", b"ll", b"hell", b"hello", b" w", b" wo"]:
+        ranks[merged] = len(ranks)
+    encoding = tiktoken.Encoding(
+        name=ENCODING_NAME,
+        pat_str=r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+""",
+        mergeable_ranks=ranks,
+        special_tokens={"<|endoftext|>": len(ranks) + 1},
+    )
+    monkeypatch.setattr(tokenization.tiktoken, "get_encoding", lambda name: encoding)
+    tokenization.get_encoding.cache_clear()
+    semantic_similarity.get_token_strings.cache_clear()
+    yield SemanticSimilarity(
+        embeddings=DeterministicFakeEmbedding(size=8), encoding_name=ENCODING_NAME
+    )
+    tokenization.get_encoding.cache_clear()
+    semantic_similarity.get_token_strings.cache_clear()
+
+
+def reference_tokenize(tokenizer, text):
+    token_ids = tokenizer.encode(text)
+    tokens = np.array([tokenizer.decode([token_id]) for token_id in token_ids])
+    return tokens[tokens != ""]
+
+
+@pytest.mark.parametrize("text", ["hello world", "héllo wörld 世界", "a\n\n  b", "hello"])
+def test_tokenize_matches_per_token_decode(scorer, text):
+    assert scorer._tokenize(text).tolist() == reference_tokenize(scorer.tokenizer, text).tolist()
+
+
+def test_blank_text_has_no_tokens(scorer):
+    assert len(scorer._tokenize("   ")) == 0
+
+
+def test_tokenize_many_matches_tokenize(scorer):
+    texts = ["hello world", "", "héllo", "  "]
+
+    tokens = scorer.tokenize_many(texts)
+
+    assert [t.tolist() for t in tokens] == [scorer._tokenize(text).tolist() for text in texts]
+
+
+def test_encoding_is_shared_between_instances(scorer):
+    other = SemanticSimilarity(
+        embeddings=DeterministicFakeEmbedding(size=8), encoding_name=ENCODING_NAME
+    )
+
+    assert other.tokenizer is scorer.tokenizer
+
+
+def test_identical_texts_are_fully_similar(scorer):
+    result = scorer.compute_similarity("hello world", "hello world")
+
+    assert result.f1 == pytest.approx(1.0)
+
+
+def test_similarity_many_matches_single_pairs(scorer):
+    pairs = [("hello world", "hello"), ("world", "hello world"), ("héllo", "hello wörld")]
+
+    results = scorer.compute_similarity_many(pairs)
+
+    for result, (candidate, reference) in zip(results, pairs):
+        expected = scorer.compute_similarity(candidate, reference)
+        assert result.precision == pytest.approx(expected.precision, abs=1e-6)
+        assert result.recall == pytest.approx(expected.recall, abs=1e-6)
+        assert result.f1 == pytest.approx(expected.f1, abs=1e-6)
+
+
+def test_similarity_many_embeds_unique_tokens_once(scorer, monkeypatch):
+    calls = []
+    embed_documents = DeterministicFakeEmbedding.embed_documents
+    monkeypatch.setattr(
+        DeterministicFakeEmbedding,
+        "embed_documents",
+        lambda self, texts: calls.append(list(texts)) or embed_documents(self, texts),
+    )
+
+    scorer.compute_similarity_many([("hello world", "hello"), ("hello", "hello world")])
+
+    assert len(calls) == 1
+    assert len(calls[0]) == len(set(calls[0]))
+
+
+def test_empty_pairs_score_zero(scorer):
+    results = scorer.compute_similarity_many([("", "hello"), ("hello", "   "), ("hello", "hello")])
+
+    assert [result.f1 for result in results[:2]] == [0.0, 0.0]
+    assert results[2].f1 == pytest.approx(1.0)
+
+
+def test_block_size_does_not_change_scores(scorer):
+    pairs = [("hello world hello world", "world hello a b c")]
+
+    tiled = scorer.compute_similarity_many(pairs, block_size=2)[0]
+    whole = scorer.compute_similarity_many(pairs)[0]
+
+    assert tiled.precision == pytest.approx(whole.precision, abs=1e-6)
+    assert tiled.recall == pytest.approx(whole.recall, abs=1e-6)
+
+
+def test_untokenized_lists_are_scored_per_item(scorer):
+    scorer.use_tokenizer = False
+
+    result = scorer.compute_similarity(["fact one", "fact two"], ["fact two", "fact one"])
+
+    assert result.f1 == pytest.approx(1.0)
@@ -1,5 +1,7 @@
+import asyncio
+
 from dataclasses import dataclass
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
@@ -55,6 +57,30 @@ def test_summarize_exception(summarizer):
     assert "API request failed: API error" in str(exc_info.value)
 
 
+def test_asummarize_success(summarizer):
+    mock_chain = MagicMock()
+    mock_chain.ainvoke = AsyncMock(return_value=FragmentMemory(["Async summary"]))
+    summarizer.chain = mock_chain
+
+    result = asyncio.run(summarizer.asummarize("Previous memory", "Dialogue context"))
+
+    assert result == ["Async summary"]
+    mock_chain.ainvoke.assert_awaited_once_with(
+        {"previous_memory": "Previous memory", "dialogue_context": "Dialogue context"}
+    )
+
+
+def test_asummarize_exception(summarizer):
+    mock_chain = MagicMock()
+    mock_chain.ainvoke = AsyncMock(side_effect=Exception("API error"))
+    summarizer.chain = mock_chain
+
+    with pytest.raises(ConnectionError) as exc_info:
+        asyncio.run(summarizer.asummarize("Mem", "Context"))
+
+    assert "API request failed: API error" in str(exc_info.value)
+
+
 @pytest.mark.parametrize(
     "memory, context",
     [
@@ -0,0 +1,143 @@
+import pytest
+import tiktoken
+
+from src.benchmarking import jsonl_writer, semantic_similarity, throughput
+from src.benchmarking.calculate_mcp_memory_metrics import CalculateMCPMemoryMetrics
+from src.benchmarking.calculate_mcp_response_metrics import CalculateMCPResponseMetrics
+from src.benchmarking.semantic_similarity import SemanticSimilarity
+from src.benchmarking.throughput import BENCHMARKS, ThroughputSuite, make_dialogues
+from src.summarize_algorithms.core import tokenization
+
+
+@pytest.fixture
+def suite(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return ThroughputSuite(
+        n_dialogues=2, n_sessions=2, n_messages=4, words_per_message=5, work_dir=str(tmp_path / "work")
+    )
+
+
+def test_make_dialogues_is_seeded():
+    first = make_dialogues(2, seed=3)
+
+    assert [str(session) for session in first[1]] == [str(session) for session in make_dialogues(2, seed=3)[1]]
+    assert len(first[0]) == 4 and len(first[0][0]) == 6
+
+
+@pytest.mark.parametrize("name", ["recsum", "recsum_tree", "memory_bank", "baseline", "mcp_memory"])
+def test_benchmarks_report_throughput(suite, name):
+    result = suite.measure(name)
+
+    assert result.sessions == 4
+    assert result.llm_calls > 0
+    assert result.sessions_per_second > 0
+    assert result.overhead_seconds <= result.seconds
+    assert result.to_dict()["name"] == name
+
+
+def test_benchmarks_do_not_mutate_dialogues(suite):
+    before = [[str(session) for session in dialogue] for dialogue in suite.dialogues]
+
+    suite.run(["baseline", "mcp_memory"])
+
+    assert [[str(session) for session in dialogue] for dialogue in suite.dialogues] == before
+
+
+def test_cli_runs_every_benchmark_by_default(monkeypatch):
+    run = []
+    monkeypatch.setattr("sys.argv", ["throughput"])
+    monkeypatch.setattr(ThroughputSuite, "__init__", lambda self, **kwargs: None)
+    monkeypatch.setattr(ThroughputSuite, "run", lambda self, names: run.extend(names) or [])
+
+    throughput.main()
+
+    assert run == BENCHMARKS
+
+
+@pytest.fixture
+def byte_encoding(monkeypatch):
+    encoding = tiktoken.Encoding(
+        name="test_byte_level",
+        pat_str=r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+""",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+    monkeypatch.setattr(tokenization.tiktoken, "get_encoding", lambda name: encoding)
+    tokenization.get_encoding.cache_clear()
+    semantic_similarity.get_token_strings.cache_clear()
+    yield encoding
+    tokenization.get_encoding.cache_clear()
+    semantic_similarity.get_token_strings.cache_clear()
+
+
+def test_benchmarks_run_offline_outside_the_working_tree(tmp_path, monkeypatch):
+    def offline(name):
+        raise OSError("network is unreachable")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tokenization.tiktoken, "get_encoding", offline)
+    tokenization.get_encoding.cache_clear()
+    suite = ThroughputSuite(n_dialogues=1, n_sessions=2, n_messages=2, words_per_message=3)
+
+    results = suite.run()
+    jsonl_writer.close_writers()
+
+    assert [result.name for result in results] == BENCHMARKS
+    assert list(tmp_path.iterdir()) == []
+    assert {path.name for path in (suite.work_dir / "logs").iterdir()} == {"memory", "baseline"}
+
+
+@pytest.mark.parametrize("name", ["mcp_response", "mcp_memory"])
+def test_semantic_scoring_is_batched_across_the_run(suite, byte_encoding, name, monkeypatch):
+    batches = []
+    compute = SemanticSimilarity.compute_similarity_many
+
+    def recording(self, pairs, *args, **kwargs):
+        batches.append(len(pairs))
+        return compute(self, pairs, *args, **kwargs)
+
+    monkeypatch.setattr(SemanticSimilarity, "compute_similarity_many", recording)
+
+    suite.measure(name)
+
+    assert len(batches) == 1
+    assert batches[0] > 2
+
+
+def test_resumed_run_scores_restored_semantic_inputs(suite, byte_encoding, tmp_path):
+    def run(resume):
+        calculator = CalculateMCPResponseMetrics(
+            llm=suite.llm,
+            embeddings=suite.embeddings,
+            dataset=suite._mcp_dataset(),
+            checkpoint_path=str(tmp_path / "checkpoint.jsonl"),
+            resume=resume,
+        )
+        calculator.calculate()
+        return calculator
+
+    first, resumed = run(False), run(True)
+
+    assert resumed._semantic_inputs == [list(item) for item in first._semantic_inputs]
+    assert resumed._recsum_semantic_data == first._recsum_semantic_data
+    assert resumed._baseline_semantic_data == first._baseline_semantic_data
+
+
+def test_resumed_run_restores_usage_counters(suite, byte_encoding, tmp_path):
+    def run(resume):
+        calculator = CalculateMCPMemoryMetrics(
+            llm=suite.llm,
+            embeddings=suite.embeddings,
+            dataset=suite._mcp_dataset(),
+            checkpoint_path=str(tmp_path / "checkpoint.jsonl"),
+            resume=resume,
+        )
+        calculator.calculate()
+        return calculator
+
+    first, resumed = run(False), run(True)
+
+    assert first.memory_bank.embedding_tokens > 0
+    for system in ["recsum", "memory_bank"]:
+        for counter in ["prompt_tokens", "completion_tokens", "embedding_tokens", "total_cost"]:
+            assert getattr(getattr(resumed, system), counter) == getattr(getattr(first, system), counter)
@@ -0,0 +1,191 @@
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.benchmarking import fake_models
+from src.benchmarking.baseline import DialogueBaseline
+from src.benchmarking.fake_models import FakeChatModel, HashingEmbeddings
+from src.benchmarking.llm_evaluation import LLMResponseEvaluation
+from src.benchmarking.semantic_similarity import SemanticSimilarity
+from src.benchmarking.throughput import make_dialogues
+from src.summarize_algorithms.core import usage as usage_module
+from src.summarize_algorithms.core.embedding_cache import CachedEmbeddings
+from src.summarize_algorithms.core.usage import (
+    EMBEDDINGS_NODE,
+    JUDGE_NODE,
+    RESPONSE_NODE,
+    SUMMARIZER_NODE,
+    Usage,
+    UsageCallbackHandler,
+    UsageLedger,
+    count_embedding_tokens,
+    dialogue_scope,
+    record_embedding_usage,
+    track_usage,
+)
+from src.summarize_algorithms.memory_bank.dialogue_system import (
+    MemoryBankDialogueSystem,
+)
+from src.summarize_algorithms.recsum.dialogue_system import RecsumDialogueSystem
+
+
+@pytest.fixture(autouse=True)
+def logs_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def ledger():
+    return UsageLedger()
+
+
+def make_system(ledger, system_class=RecsumDialogueSystem, **kwargs):
+    return system_class(
+        llm=FakeChatModel(prompt_tokens=5, completion_tokens=3),
+        embed_model=HashingEmbeddings(),
+        system_name="recsum",
+        usage_ledger=ledger,
+        **kwargs,
+    )
+
+
+def test_usage_adds_and_serializes():
+    usage = Usage(calls=1, prompt_tokens=2, completion_tokens=3)
+    usage.add(Usage(calls=1, embedding_tokens=4, cost=0.5))
+
+    assert usage.to_dict() == {
+        "calls": 2,
+        "prompt_tokens": 2,
+        "completion_tokens": 3,
+        "embedding_tokens": 4,
+        "cost": 0.5,
+        "total_tokens": 9,
+    }
+
+
+def test_ledger_reports_group_by_keys(ledger):
+    ledger.record("recsum", "0", SUMMARIZER_NODE, Usage(calls=1, prompt_tokens=10))
+    ledger.record("recsum", "1", RESPONSE_NODE, Usage(calls=1, prompt_tokens=20))
+    ledger.record("baseline", "0", RESPONSE_NODE, Usage(calls=2, prompt_tokens=5))
+
+    assert ledger.report(["system"])["recsum"].prompt_tokens == 30
+    assert ledger.report(["dialogue"])["0"].calls == 3
+    assert ledger.report(["system", "node"])["baseline/response"].prompt_tokens == 5
+    assert ledger.total().calls == 4
+    assert ledger.to_dict()["by_node"][RESPONSE_NODE]["prompt_tokens"] == 25
+    assert len(ledger.entries()) == 3
+
+
+def test_embedding_usage_is_routed_to_the_active_handler():
+    handler = UsageCallbackHandler(RESPONSE_NODE)
+    embeddings = HashingEmbeddings()
+
+    record_embedding_usage(embeddings, ["ignored"])
+    with track_usage(handler):
+        record_embedding_usage(embeddings, ["hello world"])
+
+    assert handler.usage_by_node()[EMBEDDINGS_NODE].calls == 1
+
+
+def test_cached_embeddings_only_record_misses(tmp_path):
+    handler = UsageCallbackHandler(RESPONSE_NODE)
+    embeddings = CachedEmbeddings(HashingEmbeddings(), cache_dir=str(tmp_path))
+
+    with track_usage(handler):
+        record_embedding_usage(embeddings, ["a", "b"])
+        embeddings.embed_documents(["a", "b"])
+        embeddings.embed_documents(["b", "a"])
+        embeddings.embed_query("a")
+        embeddings.embed_query("a")
+
+    usage = handler.usage_by_node()[EMBEDDINGS_NODE]
+    assert usage.calls == 2
+    assert usage.embedding_tokens == count_embedding_tokens(["a", "b", "a"])
+
+
+def test_semantic_similarity_records_embedding_usage(ledger):
+    scorer = SemanticSimilarity(
+        use_tokenizer=False, embeddings=HashingEmbeddings(), usage_ledger=ledger, system_name="scorer"
+    )
+
+    with dialogue_scope("3"):
+        scorer.compute_similarity_many([(["a", "b"], ["b", "c"])])
+
+    assert list(ledger.report(["system", "dialogue", "node"])) == [f"scorer/3/{EMBEDDINGS_NODE}"]
+    assert ledger.total().embedding_tokens == count_embedding_tokens(["a", "b", "c"])
+
+
+def test_embedding_tokens_fall_back_to_estimate(monkeypatch):
+    monkeypatch.setattr(usage_module, "_embedding_encoding", lambda: None)
+
+    assert count_embedding_tokens(["a" * 40, ""]) == 11
+
+
+def test_dialogue_system_attributes_usage_to_nodes(ledger):
+    system = make_system(ledger, MemoryBankDialogueSystem, embed_code=True)
+    sessions = make_dialogues(1, n_sessions=3)[0]
+
+    with dialogue_scope("7"):
+        system.process_dialogue(sessions, "query")
+
+    by_node = ledger.report(["node"])
+    assert by_node[SUMMARIZER_NODE].calls == 3
+    assert by_node[SUMMARIZER_NODE].prompt_tokens == 15
+    assert by_node[RESPONSE_NODE].calls == 1
+    assert by_node[RESPONSE_NODE].completion_tokens == 3
+    assert by_node[EMBEDDINGS_NODE].embedding_tokens > 0
+    assert list(ledger.report(["dialogue"])) == ["7"]
+    assert system.prompt_tokens == ledger.total().prompt_tokens
+    assert system.embedding_tokens == ledger.total().embedding_tokens
+
+
+def test_concurrent_dialogues_do_not_share_usage(ledger):
+    system = make_system(ledger)
+    dialogues = [(sessions, "query") for sessions in make_dialogues(4, n_sessions=2)]
+
+    asyncio.run(system.aprocess_many(dialogues, concurrency=4))
+
+    by_dialogue = ledger.report(["dialogue"])
+    assert sorted(by_dialogue) == ["0", "1", "2", "3"]
+    assert {usage.calls for usage in by_dialogue.values()} == {3}
+    assert system.prompt_tokens == 4 * 3 * 5
+
+
+def test_threaded_baselines_record_per_dialogue(ledger):
+    baseline = DialogueBaseline("baseline", llm=FakeChatModel(prompt_tokens=7), usage_ledger=ledger)
+    dialogues = make_dialogues(6, n_sessions=1)
+
+    def run(index):
+        with dialogue_scope(str(index)):
+            baseline.process_dialogue(dialogues[index], "query")
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(run, range(6)))
+
+    by_dialogue = ledger.report(["dialogue"])
+    assert len(by_dialogue) == 6
+    assert all(usage.prompt_tokens == 7 for usage in by_dialogue.values())
+    assert baseline.prompt_tokens == 42
+
+
+def test_judge_usage_is_recorded(ledger):
+    scorer = LLMResponseEvaluation(llm=FakeChatModel(prompt_tokens=4), usage_ledger=ledger)
+
+    with dialogue_scope("3"):
+        scorer.evaluate_single(context="c", memory="m", response="r")
+        scorer.evaluate_single_many([("c", "m", "r"), ("c", "m", "r")])
+
+    usage = ledger.report(["system", "dialogue", "node"])[f"{JUDGE_NODE}/3/{JUDGE_NODE}"]
+    assert (usage.calls, usage.prompt_tokens) == (3, 12)
+
+
+def test_failed_judge_call_records_no_usage(ledger, monkeypatch):
+    monkeypatch.setattr(fake_models.FakeChatModel, "_generate", lambda *args, **kwargs: 1 / 0)
+    scorer = LLMResponseEvaluation(llm=FakeChatModel(), usage_ledger=ledger)
+
+    with pytest.raises(ConnectionError):
+        scorer.evaluate_single(context="c", memory="m", response="r")
+
+    assert ledger.total().calls == 0